@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Reservation, Resource, ServiceType, BusinessHours, Holiday, Location
+from .models import User, Reservation, ArchivedReservation, Resource, ServiceType, BusinessHours, Holiday, Location, OutboundEmail, CalendarFeed
 from .forms import CustomUserCreationForm
 
 # This is the new, clean, from-scratch configuration.
@@ -44,4 +44,29 @@ admin.site.register(Resource)
 admin.site.register(ServiceType)
 admin.site.register(BusinessHours)
 admin.site.register(Holiday)
-admin.site.register(Location)
\ No newline at end of file
+admin.site.register(Location)
+admin.site.register(OutboundEmail)
+
+
+class CalendarFeedAdmin(admin.ModelAdmin):
+    # Token je dio URL-a (/api/calendar/<token>.ics); za novi URL obriši feed i napravi novi
+    list_display = ('name', 'resource', 'location', 'created_at')
+    readonly_fields = ('token',)
+
+
+admin.site.register(CalendarFeed, CalendarFeedAdmin)
+
+
+class ArchivedReservationAdmin(admin.ModelAdmin):
+    # Arhiva se puni samo preko `manage.py archive_reservations`
+    list_display = ('full_name', 'service', 'resource', 'start_time', 'is_approved')
+    list_select_related = ('service', 'resource')
+    search_fields = ('search_name', 'email', 'search_plate')
+    ordering = ('-start_time', '-id')
+    date_hierarchy = 'start_time'
+
+    def has_add_permission(self, request):
+        return False
+
+
+admin.site.register(ArchivedReservation, ArchivedReservationAdmin)
@@ -0,0 +1,137 @@
+# booking/allocation.py
+"""
+Race-free assignment of a resource to a new reservation.
+
+'optimistic' (default): the database itself rejects overlapping reservations
+on one resource (exclusion constraint on PostgreSQL, triggers on SQLite,
+migration 0009). Candidate resources that a plain read shows as free are
+tried in order with a bare INSERT in a savepoint; a constraint violation
+means someone else got there first and we fall through to the next one.
+
+'locking': every candidate resource is checked while holding row locks on
+its `ResourceDayLock` rows for the days the slot touches (PostgreSQL). A
+first pass skips resources another transaction is booking right now; only
+if none of the others is free does a second pass wait for them. A resource
+that turns out to be busy is checked inside a savepoint that is rolled back,
+releasing its lock, so a transaction never holds more than the lock of the
+bay it books and lock waits cannot deadlock. SQLite has no row locks: there
+the whole check-and-insert runs in a `BEGIN IMMEDIATE` transaction (one
+writer at a time).
+
+On SQLite both strategies retry with backoff when the database is locked.
+"""
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+
+from .db import immediate_atomic, retry_on_lock
+from .models import ResourceDayLock
+from .queries import overlapping_reservations
+from .signals import slot_dates
+
+OPTIMISTIC = 'optimistic'
+LOCKING = 'locking'
+STRATEGIES = (OPTIMISTIC, LOCKING)
+
+# Migracija 0009: ime exclusion constrainta (Postgres) i poruka triggera (SQLite)
+OVERLAP_CONSTRAINT = 'reservation_no_overlap'
+
+BOOKED = 'booked'
+LOCKED = 'locked'
+
+
+class _Unavailable(Exception):
+    def __init__(self, reason):
+        self.reason = reason
+
+
+def is_overlap_violation(error):
+    return isinstance(error, IntegrityError) and OVERLAP_CONSTRAINT in str(error)
+
+
+def allocate(resources, start_time, end_time, create, strategy=None):
+    """
+    Calls `create(resource)` for the first resource from `resources` (in the
+    given order) that is free for `[start_time, end_time)` and returns its
+    result, or returns None when all of them are booked. Resources only need
+    an `id` (model instances or `config_snapshot.Service.resources`). `create` runs inside
+    the allocating transaction and may be called again after a lock retry.
+    """
+    strategy = strategy or settings.BOOKY_ALLOCATION_STRATEGY
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown allocation strategy {strategy!r}, use one of {', '.join(STRATEGIES)}.")
+
+    resources = list(resources)
+    if not resources:
+        return None
+    if strategy == OPTIMISTIC:
+        return retry_on_lock(lambda: _allocate_optimistic(resources, start_time, end_time, create))
+    if connection.features.has_select_for_update:
+        with transaction.atomic():
+            return _allocate_with_row_locks(resources, start_time, end_time, create)
+    return retry_on_lock(lambda: _allocate_serialized(resources, start_time, end_time, create))
+
+
+def _allocate_optimistic(resources, start_time, end_time, create):
+    # Čitanje bez zaključavanja samo preskače resurse za koje već znamo da su zauzeti
+    booked = set(
+        overlapping_reservations([r.id for r in resources], start_time, end_time)
+        .values_list('resource_id', flat=True)
+    )
+    for resource in resources:
+        if resource.id in booked:
+            continue
+        try:
+            with transaction.atomic():
+                return create(resource)
+        except IntegrityError as error:
+            if not is_overlap_violation(error):
+                raise
+    return None
+
+
+def _allocate_serialized(resources, start_time, end_time, create):
+    with immediate_atomic():
+        booked = set(
+            overlapping_reservations([r.id for r in resources], start_time, end_time)
+            .values_list('resource_id', flat=True)
+        )
+        for resource in resources:
+            if resource.id not in booked:
+                return create(resource)
+    return None
+
+
+def _allocate_with_row_locks(resources, start_time, end_time, create):
+    dates = list(slot_dates(start_time, end_time))
+    ResourceDayLock.objects.bulk_create(
+        [ResourceDayLock(resource_id=resource.id, date=day) for resource in resources for day in dates],
+        ignore_conflicts=True,
+    )
+
+    waiting = []
+    for resource in resources:
+        try:
+            return _book_locked(resource, dates, start_time, end_time, create, skip_locked=True)
+        except _Unavailable as unavailable:
+            if unavailable.reason == LOCKED:
+                waiting.append(resource)
+
+    for resource in waiting:
+        try:
+            return _book_locked(resource, dates, start_time, end_time, create, skip_locked=False)
+        except _Unavailable:
+            pass
+    return None
+
+
+def _book_locked(resource, dates, start_time, end_time, create, skip_locked):
+    # Savepoint: rollback (iznimka) oslobađa zaključane redove zauzetog resursa
+    with transaction.atomic():
+        locked = ResourceDayLock.objects.select_for_update(skip_locked=skip_locked).filter(
+            resource_id=resource.id, date__in=dates
+        ).order_by('date').values_list('id', flat=True)
+        if len(locked) < len(dates):
+            raise _Unavailable(LOCKED)
+        if overlapping_reservations([resource.id], start_time, end_time).exists():
+            raise _Unavailable(BOOKED)
+        return create(resource)
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class BookingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'booking'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_migrate
+
+        from . import signals  # noqa: F401
+        from .db import configure_sqlite, create_cache_table
+
+        connection_created.connect(configure_sqlite, dispatch_uid='booking.configure_sqlite')
+        post_migrate.connect(create_cache_table, sender=self, dispatch_uid='booking.create_cache_table')
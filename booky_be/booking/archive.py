@@ -0,0 +1,126 @@
+# booking/archive.py
+"""
+Hot/cold split of reservations.
+
+`archive_batch()` (run by `manage.py archive_reservations`) moves the
+oldest reservations that ended before a cutoff from `Reservation` into
+`ArchivedReservation`, keeping their ids. Every batch is one transaction
+(BEGIN IMMEDIATE on SQLite): copy, drop the occupancy rows, detach outbox
+emails, delete. An interrupted run leaves no half-moved batch, and the next
+run simply continues with the oldest rows left.
+
+History reads go through `HotColdQuerySet`: the same query on both tables,
+each using its own indexes, merged on `(start_time, id)`. Only the 'past'
+period (and search within it) reads the archive; every other period starts
+today, long after the cutoff.
+"""
+import heapq
+from itertools import islice
+
+from django.db import connection
+
+from .db import immediate_atomic, retry_on_lock
+from .models import ArchivedReservation, OutboundEmail, Reservation, ResourceSlotOccupancy
+
+ARCHIVE_PERIODS = ('past',)
+DEFAULT_BATCH_SIZE = 1000
+
+
+# --- PREMJEŠTANJE --- #
+
+def copy_fields():
+    return [field.attname for field in ArchivedReservation._meta.concrete_fields]
+
+
+def archive_batch(cutoff, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Moves up to `batch_size` of the oldest reservations with `end_time` before
+    `cutoff` into the archive, in one transaction. Returns how many moved.
+    """
+    def move():
+        with immediate_atomic():
+            rows = list(
+                Reservation.objects
+                .filter(end_time__lt=cutoff)
+                .order_by('start_time', 'id')
+                .values(*copy_fields())[:batch_size]
+            )
+            if not rows:
+                return 0
+            ids = [row['id'] for row in rows]
+            # ignore_conflicts: red koji je već u arhivi (ručni import) se samo briše iz žive tabele
+            ArchivedReservation.objects.bulk_create([ArchivedReservation(**row) for row in rows], ignore_conflicts=True)
+            ResourceSlotOccupancy.objects.filter(reservation_id__in=ids).delete()
+            OutboundEmail.objects.filter(reservation_id__in=ids).update(reservation=None)
+            # Bez Collectora i post_delete signala po redu: prošli termini ne diraju
+            # dostupnost, a feedovi ih ne sadrže (cutoff je iza BOOKY_CALENDAR_PAST_DAYS)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {connection.ops.quote_name(Reservation._meta.db_table)} "
+                    f"WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                    ids,
+                )
+            return len(rows)
+
+    return retry_on_lock(move)
+
+
+# --- ČITANJE OBJE TABELE --- #
+
+def counterpart(queryset):
+    """The same selection (`.values()` fields, if any) on ArchivedReservation, unfiltered."""
+    fields = queryset.query.values_select
+    return ArchivedReservation.objects.values(*fields) if fields else ArchivedReservation.objects.all()
+
+
+def _sort_key(row):
+    # Redovi su dictovi iz .values() ili instance, kao u KeysetPagination
+    return (row['start_time'], row['id']) if isinstance(row, dict) else (row.start_time, row.pk)
+
+
+class HotColdQuerySet:
+    """
+    Read-only union of one query over the live table and the archive.
+
+    Supports what the list, pagination and export use: filter(), order_by()
+    on `(start_time, id)`, `[:n]` (n rows from each side, merged, cut to n),
+    iteration and iterator(). Both sides are ordered by the database, so
+    merging is a single pass.
+    """
+
+    def __init__(self, parts):
+        self.parts = list(parts)
+
+    @property
+    def query(self):
+        # KeysetPagination čita smjer sortiranja iz query.order_by
+        return self.parts[0].query
+
+    def filter(self, *args, **kwargs):
+        return HotColdQuerySet(part.filter(*args, **kwargs) for part in self.parts)
+
+    def order_by(self, *fields):
+        return HotColdQuerySet(part.order_by(*fields) for part in self.parts)
+
+    def _merge(self, iterables):
+        descending = self.query.order_by[:1] == ('-start_time',)
+        return heapq.merge(*iterables, key=_sort_key, reverse=descending)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.start or index.step or index.stop is None:
+            raise TypeError('HotColdQuerySet only supports [:n] slices.')
+        return list(islice(self._merge([part[:index.stop] for part in self.parts]), index.stop))
+
+    def __iter__(self):
+        return self._merge(self.parts)
+
+    def iterator(self, chunk_size=None):
+        return self._merge([part.iterator(chunk_size=chunk_size) for part in self.parts])
+
+
+def with_archive(queryset, apply=None):
+    """`queryset` plus its archive counterpart, with `apply(part)` (e.g. search) run on each side."""
+    parts = [queryset, counterpart(queryset)]
+    if apply is not None:
+        parts = [apply(part) for part in parts]
+    return HotColdQuerySet(parts)
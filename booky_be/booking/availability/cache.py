@@ -0,0 +1,135 @@
+# availability/cache.py
+"""
+Per-(service, date) cache for the public availability endpoint.
+
+Keys are versioned twice: `CACHE_VERSION` (Django's cache `version=`) covers
+payload format changes, and generation counters stored in the cache itself
+cover invalidation:
+
+    availability:slots:<global gen>:<service id>:<service gen>:<date>
+
+- a reservation or holiday change deletes just the affected (service, date) keys,
+- resource / M2M / service changes bump that service's generation,
+- business hours changes bump the global generation.
+
+All state lives in the configured cache backend. The default backend is the
+database cache (settings.CACHES), shared by all gunicorn workers, so a booking
+made in one worker invalidates the slots every other worker serves. Every
+invalidation is a cache write, so it runs after commit only, never inside the
+booking transaction. Reads never write: hits and misses are counted in the
+request metrics (booking/metrics.py).
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from booking import metrics
+
+CACHE_VERSION = 1
+GLOBAL_GENERATION_KEY = 'availability:gen'
+SERVICE_GENERATION_KEY = 'availability:gen:service:{}'
+SLOTS_KEY = 'availability:slots:{}:{}:{}:{}'
+
+
+def _timeout():
+    return getattr(settings, 'BOOKY_AVAILABILITY_CACHE_TIMEOUT', 300)
+
+
+def _initial_generation():
+    # Ako je brojač izbačen iz cachea, novi mora biti veći od svih prethodnih,
+    # inače bi stari unosi opet postali vidljivi.
+    return int(time.time() * 1000)
+
+
+def _incr(key, initial):
+    """Atomic increment on backends that support it; creates the key if missing."""
+    try:
+        return cache.incr(key, version=CACHE_VERSION)
+    except ValueError:
+        if cache.add(key, initial, None, version=CACHE_VERSION):
+            return initial
+        return cache.incr(key, version=CACHE_VERSION)
+
+
+def _generations(service_ids):
+    """Returns (global generation, {service_id: service generation})."""
+    keys = [GLOBAL_GENERATION_KEY] + [SERVICE_GENERATION_KEY.format(sid) for sid in service_ids]
+    found = cache.get_many(keys, version=CACHE_VERSION)
+    missing = {key: _initial_generation() for key in keys if key not in found}
+    if missing:
+        for key, value in missing.items():
+            cache.add(key, value, None, version=CACHE_VERSION)
+        found.update(cache.get_many(list(missing), version=CACHE_VERSION))
+    return found[GLOBAL_GENERATION_KEY], {
+        sid: found[SERVICE_GENERATION_KEY.format(sid)] for sid in service_ids
+    }
+
+
+def _slots_keys(service_ids, dates):
+    generation, service_generations = _generations(service_ids)
+    return {
+        (sid, day): SLOTS_KEY.format(generation, sid, service_generations[sid], day.isoformat())
+        for sid in service_ids
+        for day in dates
+    }
+
+
+def get_slots(service_id, day):
+    """Cached slots or None. Every call counts as a hit or a miss."""
+    key = _slots_keys([service_id], [day])[(service_id, day)]
+    slots = cache.get(key, version=CACHE_VERSION)
+    metrics.record_cache('availability', hits=slots is not None, misses=slots is None)
+    return slots
+
+
+def set_slots(service_id, day, slots):
+    key = _slots_keys([service_id], [day])[(service_id, day)]
+    cache.set(key, slots, _timeout(), version=CACHE_VERSION)
+
+
+def invalidate_dates(service_ids, dates):
+    service_ids, dates = list(set(service_ids)), list(set(dates))
+    if not service_ids or not dates:
+        return
+
+    def delete():
+        cache.delete_many(list(_slots_keys(service_ids, dates).values()), version=CACHE_VERSION)
+
+    # Tek nakon commita (izvan transakcije odmah): paralelni čitač ne može vratiti
+    # stari rezultat u cache, a transakcija rezervacije ne piše u (database) cache
+    transaction.on_commit(delete)
+
+
+def invalidate_services(service_ids):
+    service_ids = list(set(service_ids))
+
+    def bump():
+        for sid in service_ids:
+            _incr(SERVICE_GENERATION_KEY.format(sid), _initial_generation())
+
+    if service_ids:
+        transaction.on_commit(bump)
+
+
+def invalidate_all():
+    transaction.on_commit(lambda: _incr(GLOBAL_GENERATION_KEY, _initial_generation()))
+
+
+def stats():
+    """Hits and misses of all workers, summed from the request metrics."""
+    hits = misses = 0
+    for (sample, labels), value in metrics.collect().items():
+        labels = dict(labels)
+        if sample == 'booky_cache_requests_total' and labels.get('cache') == 'availability':
+            if labels['result'] == 'hit':
+                hits += int(value)
+            else:
+                misses += int(value)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
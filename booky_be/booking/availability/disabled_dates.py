@@ -0,0 +1,142 @@
+# availability/disabled_dates.py
+"""
+Disabled dates (holidays and weekdays without business hours) for the
+booking widget's date picker.
+
+The horizon is capped (BOOKY_DISABLED_DATES_MAX_DAYS), closed weekdays are
+enumerated with a 7-day step instead of testing every day, and holidays and
+business hours come from the configuration snapshot (booking.config_snapshot).
+Results are cached per (start, horizon, config version), so any
+configuration change (booking.config_version) makes old entries unreachable.
+
+With a service, days on which none of its resources has room for one more
+booking are disabled too (`fully_booked_dates`). They depend on reservations,
+so those responses are computed per request: one aggregate query over the
+occupancy table plus a per-day capacity check, no slot computation.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+
+from booking import config_snapshot, config_version, metrics
+from .occupancy import BUCKET_MINUTES, busy_buckets_per_day
+from .window import iter_days
+
+CACHE_KEY = 'disabled-dates:{}:{}:{}:{}'  # config version, start, days, compact
+CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def max_days():
+    return settings.BOOKY_DISABLED_DATES_MAX_DAYS
+
+
+def clamp_days(days):
+    return min(max(days, 0), max_days())
+
+
+def weekday_mask(weekdays):
+    """Bit i set <=> weekday i (0 = Monday) is closed."""
+    mask = 0
+    for weekday in weekdays:
+        mask |= 1 << weekday
+    return mask
+
+
+def dates_on_weekdays(start, end, weekdays):
+    """All dates in [start, end] falling on `weekdays`, one 7-day stride per weekday."""
+    dates = []
+    for weekday in weekdays:
+        day = start + timedelta(days=(weekday - start.weekday()) % 7)
+        while day <= end:
+            dates.append(day)
+            day += timedelta(days=7)
+    return dates
+
+
+def runs(dates):
+    """Sorted dates -> [[from, to], ...] of consecutive days."""
+    periods = []
+    for day in dates:
+        if periods and day - periods[-1][1] == timedelta(days=1):
+            periods[-1][1] = day
+        else:
+            periods.append([day, day])
+    return periods
+
+
+def fully_booked_dates(snapshot, service, start, end, skip=()):
+    """
+    Working days in [start, end] (minus `skip`) on which no resource of
+    `service` (a `config_snapshot.Service`) has `duration_minutes` free minutes left in any period long
+    enough for the service. Fragmented free time is not detected, so a day is
+    never disabled while a slot is still bookable.
+    """
+    duration = service.duration_minutes
+    usable = {
+        weekday: [(lo, hi) for lo, hi in periods if hi - lo >= duration]
+        for weekday, periods in enumerate(snapshot.periods)
+        if periods
+    }
+
+    days = [day for day in iter_days(start, end) if day not in skip and day.weekday() in usable]
+    resource_ids = service.resource_ids
+    if not days or not resource_ids:
+        return days
+
+    # Busy minutes po (dan, resurs) samo unutar perioda u koje servis stane
+    busy = {
+        (day, resource_id): buckets * BUCKET_MINUTES
+        for day, resource_id, buckets in busy_buckets_per_day(resource_ids, days[0], days[-1], usable)
+    }
+    full = []
+    for day in days:
+        capacity = sum(hi - lo for lo, hi in usable[day.weekday()])
+        if all(capacity - busy.get((day, resource_id), 0) < duration for resource_id in resource_ids):
+            full.append(day)
+    return full
+
+
+def compute(snapshot, start, end, compact=False, service=None):
+    weekdays = snapshot.closed_weekdays()
+    holidays = set(snapshot.holidays_between(start, end))
+    closed = holidays.union(dates_on_weekdays(start, end, weekdays))
+    full = fully_booked_dates(snapshot, service, start, end, skip=closed) if service else []
+    disabled = sorted(closed.union(full))
+
+    result = {'start_date': start, 'end_date': end}
+    if service:
+        result['fully_booked_dates'] = full
+    if not compact:
+        result['disabled_dates'] = disabled
+        return result
+
+    # Kompaktno: zatvoreni dani u tjednu kao maska, a kao periodi samo nizovi
+    # koji sadrže praznik ili popunjen dan (npr. praznik u petak + vikend = jedan period)
+    explicit = holidays.union(full)
+    result.update(
+        weekday_mask=weekday_mask(weekdays),
+        closed_weekdays=weekdays,
+        periods=[period for period in runs(disabled) if explicit.intersection(_days(period))],
+    )
+    return result
+
+
+def _days(period):
+    first, last = period
+    return (first + timedelta(days=offset) for offset in range((last - first).days + 1))
+
+
+def cached(start, days, compact, serialize):
+    """
+    `serialize(compute(...))` for `days` days after `start`, with `days`
+    clamped to [0, max_days()]. The serialized data is what gets cached.
+    """
+    days = clamp_days(days)
+    key = CACHE_KEY.format(config_version.current(), start.isoformat(), days, int(compact))
+    data = cache.get(key)
+    metrics.record_cache('disabled_dates', hits=data is not None, misses=data is None)
+    if data is None:
+        data = serialize(compute(config_snapshot.get(), start, start + timedelta(days=days), compact))
+        cache.set(key, data, CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,160 @@
+# availability/engine.py
+"""
+Pure-Python slot engine used by the availability endpoints.
+
+Everything is expressed in integer minutes relative to local midnight of the
+requested day, so the engine has no Django or database dependencies and can
+be tested and benchmarked in isolation.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+SLOT_STEP_MINUTES = 30  # Svaki slot počinje na 30min razmaka
+MINUTES_PER_DAY = 24 * 60
+ONE_MINUTE = timedelta(minutes=1)
+
+
+def time_to_minutes(value):
+    """Converts a `datetime.time` to minutes after midnight (seconds are ignored)."""
+    return value.hour * 60 + value.minute
+
+
+def to_minutes(value, day, tz, round_up=False):
+    """
+    Converts an aware datetime to minutes relative to local midnight of `day`.
+
+    Sub-minute precision is floored by default and ceiled with `round_up`, which
+    keeps the strict overlap comparisons exact for integer slot boundaries
+    (floor for interval starts, ceil for interval ends).
+    """
+    local = value.astimezone(tz)
+    minutes = (local.date() - day).days * MINUTES_PER_DAY + local.hour * 60 + local.minute
+    if round_up and (local.second or local.microsecond):
+        minutes += 1
+    return minutes
+
+
+def format_minutes(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def candidate_starts(periods, duration, step=SLOT_STEP_MINUTES, not_before=None):
+    """Yields every slot start of every working period, in period order."""
+    for open_minute, close_minute in periods:
+        start = open_minute
+        while start + duration <= close_minute:
+            if not_before is None or start >= not_before:
+                yield start
+            start += step
+
+
+def blocked_windows(intervals, duration):
+    """
+    Returns merged, sorted `[lo, hi)` ranges of slot starts blocked by the busy
+    `intervals` of a single resource.
+
+    A slot `[s, s + duration)` overlaps a busy interval `[a, b)` exactly when
+    `a - duration < s < b`, i.e. for integer starts `s` in `[a - duration + 1, b)`.
+    """
+    windows = sorted(
+        (start - duration + 1, end)
+        for start, end in intervals
+        if end > start - duration + 1
+    )
+    merged = []
+    for lo, hi in windows:
+        if merged and lo <= merged[-1][1]:
+            if hi > merged[-1][1]:
+                merged[-1][1] = hi
+        else:
+            merged.append([lo, hi])
+    return merged
+
+
+def available_slots(periods, busy, total_resources, duration, step=SLOT_STEP_MINUTES, not_before=None):
+    """
+    Sweep-line availability for a single day.
+
+    `periods` are `(open, close)` minute pairs, `busy` maps a resource id to its
+    `(start, end)` minute intervals. Intervals are sorted once per resource and
+    all candidate starts are answered in a single pass over the merged events,
+    so the cost is O(R log R + S) instead of O(S * R).
+
+    Returns `(start_minute, available_count)` pairs for slots with at least one
+    free resource, in the same order the periods produce them.
+    """
+    events = []
+    for intervals in busy.values():
+        for lo, hi in blocked_windows(intervals, duration):
+            events.append((lo, 1))
+            events.append((hi, -1))
+    events.sort()
+
+    starts = list(candidate_starts(periods, duration, step, not_before))
+    free_at = {}
+    blocked = 0
+    position = 0
+    for start in sorted(set(starts)):
+        while position < len(events) and events[position][0] <= start:
+            blocked += events[position][1]
+            position += 1
+        free_at[start] = total_resources - blocked
+
+    return [(start, free_at[start]) for start in starts if free_at[start] > 0]
+
+
+def busy_minutes(day, reservations, tz):
+    """Maps resource id -> `(start, end)` minute intervals for `(resource_id, start_time, end_time)` rows."""
+    busy = defaultdict(list)
+    midnight = datetime.combine(day, time.min, tzinfo=tz)
+    if midnight.utcoffset() == (midnight + timedelta(days=1)).utcoffset():
+        # Obični dan (bez DST prelaza): wall-clock minute = stvarne minute od ponoći,
+        # pa je dovoljna timedelta aritmetika bez astimezone() po rezervaciji.
+        for resource_id, start_time, end_time in reservations:
+            busy[resource_id].append((
+                (start_time - midnight) // ONE_MINUTE,
+                -((midnight - end_time) // ONE_MINUTE),
+            ))
+    else:
+        for resource_id, start_time, end_time in reservations:
+            busy[resource_id].append((
+                to_minutes(start_time, day, tz),
+                to_minutes(end_time, day, tz, round_up=True),
+            ))
+    return busy
+
+
+def slots_for_busy(day, periods, total_resources, busy, duration_minutes, tz, now=None, step=SLOT_STEP_MINUTES):
+    """
+    Builds the public `{"time", "available_count"}` payload for one day from
+    busy minute intervals (see `busy_minutes`).
+
+    `periods` are `(open_time, close_time)` pairs in working order. When `day`
+    is the local "today" of `now`, slots starting before now + 1h are skipped.
+    """
+    minute_periods = [(time_to_minutes(open_time), time_to_minutes(close_time)) for open_time, close_time in periods]
+    return slots_for_minute_periods(day, minute_periods, total_resources, busy, duration_minutes, tz, now, step)
+
+
+def slots_for_minute_periods(day, periods, total_resources, busy, duration_minutes, tz, now=None, step=SLOT_STEP_MINUTES):
+    """Same as `slots_for_busy`, with `periods` already as `(open, close)` minutes."""
+    not_before = None
+    if now is not None:
+        local_now = now.astimezone(tz)
+        if local_now.date() == day:
+            not_before = to_minutes(local_now + timedelta(hours=1), day, tz, round_up=True)
+
+    return [
+        {"time": format_minutes(start), "available_count": count}
+        for start, count in available_slots(periods, busy, total_resources, duration_minutes, step, not_before)
+    ]
+
+
+def slots_for_day(day, periods, total_resources, reservations, duration_minutes, tz, now=None, step=SLOT_STEP_MINUTES):
+    """
+    Same as `slots_for_busy`, but takes `(resource_id, start_time, end_time)`
+    reservation tuples with aware datetimes.
+    """
+    return slots_for_busy(
+        day, periods, total_resources, busy_minutes(day, reservations, tz), duration_minutes, tz, now, step
+    )
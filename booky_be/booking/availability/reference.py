@@ -0,0 +1,46 @@
+# availability/reference.py
+"""
+The original per-slot scan from `AvailabilityAPIView`, kept verbatim (minus the
+database access) as the oracle for equivalence tests and as the baseline for
+`bench_availability`. Do not use it in request handling: it is O(slots x reservations).
+"""
+from datetime import datetime, timedelta
+
+from .engine import SLOT_STEP_MINUTES
+
+
+def scan_slots_for_day(day, periods, total_resources, reservations, duration_minutes, tz, now=None, step=SLOT_STEP_MINUTES):
+    """Same contract as `engine.slots_for_day`, computed the old way."""
+    service_duration = timedelta(minutes=duration_minutes)
+    step = timedelta(minutes=step)
+    available_slots = []
+
+    for open_time, close_time in periods:
+        start_work_time = datetime.combine(day, open_time, tzinfo=tz)
+        end_work_time = datetime.combine(day, close_time, tzinfo=tz)
+        current_time = start_work_time
+
+        while current_time + service_duration <= end_work_time:
+            if now is not None and day == now.astimezone(tz).date():
+                now_plus_1h = now.astimezone(tz) + timedelta(hours=1)
+                if current_time < now_plus_1h:
+                    current_time += step
+                    continue
+
+            slot_end_time = current_time + service_duration
+            overlapping_reservations = [
+                res for res in reservations
+                if res[1] < slot_end_time and res[2] > current_time
+            ]
+            occupied_resource_ids = {res[0] for res in overlapping_reservations}
+            available_count = total_resources - len(occupied_resource_ids)
+
+            if available_count > 0:
+                available_slots.append({
+                    "time": current_time.strftime('%H:%M'),
+                    "available_count": available_count
+                })
+
+            current_time += step
+
+    return available_slots
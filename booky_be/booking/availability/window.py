@@ -0,0 +1,51 @@
+# availability/window.py
+"""
+Multi-day availability: takes holidays and business hours from the
+configuration snapshot, loads resource occupancy for the whole date window in
+one query and runs the slot engine per day.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .engine import slots_for_minute_periods
+from .occupancy import busy_by_day
+
+MAX_RANGE_DAYS = 31
+
+
+def iter_days(start_date, end_date):
+    day = start_date
+    while day <= end_date:
+        yield day
+        day += timedelta(days=1)
+
+
+def availability_for_range(snapshot, service, start_date, end_date, now=None):
+    """
+    Returns `{date: [{"time", "available_count"}, ...]}` for every day of the
+    window, using the same per-day rules as `AvailabilityAPIView`. `service`
+    is a `config_snapshot.Service` of `snapshot`.
+    """
+    tz = timezone.get_current_timezone()
+    now = now or timezone.now()
+
+    holidays = set(snapshot.holidays_between(start_date, end_date))
+    busy = busy_by_day(service.resource_ids, start_date, end_date)
+
+    result = {}
+    for day in iter_days(start_date, end_date):
+        day_periods = snapshot.periods[day.weekday()]
+        if day in holidays or not day_periods:
+            result[day] = []
+            continue
+        result[day] = slots_for_minute_periods(
+            day,
+            day_periods,
+            len(service.resource_ids),
+            busy.get(day, {}),
+            service.duration_minutes,
+            tz,
+            now=now,
+        )
+    return result
@@ -0,0 +1,69 @@
+# booking/conditional.py
+"""
+Conditional GET for public reference endpoints (services, holidays,
+disabled dates) that only change when configuration changes.
+"""
+import hashlib
+
+from django.conf import settings
+from django.utils import timezone, translation
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from . import config_version
+from .queries import local_midnight
+
+
+class ConfigConditionalGetMixin:
+    """
+    ETag / Last-Modified from the global config version (booking.config_version)
+    plus `Cache-Control: public, max-age, stale-while-revalidate`.
+
+    The check runs in dispatch(), before DRF authentication and before the
+    view, so a matching If-None-Match / If-Modified-Since is answered with a
+    304 without a single database query. Only GET/HEAD are affected, and
+    only when `is_config_only()` says the response derives from configuration.
+    """
+
+    def is_config_only(self, request):
+        return True
+
+    def config_etag(self, request, version):
+        # Isti URL (query parametri), jezik i Accept daju iste bajtove; datum jer
+        # disabled-dates ovisi o današnjem danu
+        variant = ':'.join([
+            str(version),
+            request.get_full_path(),
+            translation.get_language() or '',
+            request.META.get('HTTP_ACCEPT', ''),
+            timezone.localdate().isoformat(),
+        ])
+        return f'"{hashlib.sha256(variant.encode()).hexdigest()[:32]}"'
+
+    def config_last_modified(self, version):
+        midnight = int(local_midnight(timezone.localdate()).timestamp())
+        return max(config_version.last_modified(version), midnight)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or not self.is_config_only(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        version = config_version.current()
+        etag = self.config_etag(request, version)
+        last_modified = self.config_last_modified(version)
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.BOOKY_CONFIG_MAX_AGE,
+            stale_while_revalidate=settings.BOOKY_CONFIG_STALE_WHILE_REVALIDATE,
+        )
+        patch_vary_headers(response, ['Accept', 'Accept-Language'])
+        return response
@@ -0,0 +1,110 @@
+# booking/config_snapshot.py
+"""
+Process-wide, read-only snapshot of the scheduling configuration: services
+with their resource ids, business hours per weekday as minute offsets and
+holidays as a sorted tuple of dates.
+
+The snapshot remembers the global configuration version (booking.config_version)
+it was built for. `get()` compares that with the current version and
+rebuilds lazily on a mismatch, so after staff edit something every gunicorn
+worker reloads within BOOKY_CONFIG_VERSION_CHECK_INTERVAL seconds. As a
+backstop (a lost or misconfigured cache) a snapshot is also rebuilt once it
+is older than BOOKY_CONFIG_SNAPSHOT_TTL seconds. Otherwise a read costs no
+queries, and at most one cache get per check interval.
+"""
+import bisect
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+from django.conf import settings
+from django.db import connection
+
+from . import config_version
+from .availability.engine import time_to_minutes
+from .models import BusinessHours, Holiday, ServiceType
+
+ResourceRef = namedtuple('ResourceRef', ['id'])
+
+
+class Service(namedtuple('Service', ['id', 'duration_minutes', 'resource_ids'])):
+    """A service and the ids of its resources (sorted tuple)."""
+    __slots__ = ()
+
+    @property
+    def resources(self):
+        """`resource_ids` as objects with an `id`, the way allocation.allocate takes them."""
+        return [ResourceRef(resource_id) for resource_id in self.resource_ids]
+
+
+class ConfigSnapshot:
+    """
+    - `services`: read-only mapping id -> `Service`
+    - `periods`: 7 tuples (0 = Monday) of `(open_minute, close_minute)` in working order
+    - `holidays`: sorted tuple of dates
+    """
+    __slots__ = ('version', 'services', 'periods', 'holidays')
+
+    def __init__(self, version, services, periods, holidays):
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'services', MappingProxyType(dict(services)))
+        object.__setattr__(self, 'periods', tuple(tuple(day) for day in periods))
+        object.__setattr__(self, 'holidays', tuple(sorted(holidays)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('ConfigSnapshot is read-only')
+
+    def is_holiday(self, day):
+        position = bisect.bisect_left(self.holidays, day)
+        return position < len(self.holidays) and self.holidays[position] == day
+
+    def holidays_between(self, start, end):
+        """Holidays in [start, end], sorted."""
+        return self.holidays[bisect.bisect_left(self.holidays, start):bisect.bisect_right(self.holidays, end)]
+
+    def closed_weekdays(self):
+        """Weekdays (0 = Monday) without business hours."""
+        return [weekday for weekday, periods in enumerate(self.periods) if not periods]
+
+
+def load(version):
+    """Builds a snapshot from the database (four queries)."""
+    resource_ids = {}
+    for service_id, resource_id in ServiceType.resources.through.objects.order_by('resource_id').values_list(
+        'servicetype_id', 'resource_id'
+    ):
+        resource_ids.setdefault(service_id, []).append(resource_id)
+    services = {
+        service_id: Service(service_id, duration, tuple(resource_ids.get(service_id, ())))
+        for service_id, duration in ServiceType.objects.values_list('id', 'duration_minutes')
+    }
+
+    periods = [[] for _ in range(7)]
+    for day_of_week, open_time, close_time in (
+        BusinessHours.objects.order_by('day_of_week', 'open_time')
+                             .values_list('day_of_week', 'open_time', 'close_time')
+    ):
+        periods[day_of_week].append((time_to_minutes(open_time), time_to_minutes(close_time)))
+
+    holidays = Holiday.objects.order_by('date').values_list('date', flat=True)
+    return ConfigSnapshot(version, services, periods, holidays)
+
+
+_snapshot = None
+_expires_at = 0.0  # time.monotonic()
+
+
+def get():
+    """The current snapshot, rebuilt if the configuration version moved on or the TTL ran out."""
+    global _snapshot, _expires_at
+    version = config_version.current()  # prije čitanja baze: promjena u međuvremenu = novi reload
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version and time.monotonic() < _expires_at:
+        return snapshot
+
+    snapshot = load(version)
+    # Transakcija s on_commit hookovima možda sadrži nepotvrđene izmjene
+    # konfiguracije; takav snapshot ne dijelimo s ostatkom procesa
+    if not (connection.in_atomic_block and connection.run_on_commit):
+        _snapshot, _expires_at = snapshot, time.monotonic() + settings.BOOKY_CONFIG_SNAPSHOT_TTL
+    return snapshot
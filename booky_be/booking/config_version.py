@@ -0,0 +1,66 @@
+# booking/config_version.py
+"""
+Global configuration version: one counter in the cache, bumped by signals
+(booking/signals.py) whenever staff change services, resources, business
+hours, holidays or locations. The cache is shared by all gunicorn workers
+(database cache by default), so an edit in one worker moves the version,
+ETags and config snapshot of every other worker as well.
+
+Each process remembers the version it last read for
+BOOKY_CONFIG_VERSION_CHECK_INTERVAL seconds, so 304 answers and snapshot
+reads cost no query at all; an edit in another worker shows up here after
+at most that long, an edit in this worker immediately.
+
+The value is a millisecond timestamp that only grows, so it doubles as the
+Last-Modified time of everything derived from configuration. A missing key
+(eviction, cleared cache table) is recreated with the current time, which
+makes clients refetch once instead of trusting stale copies.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'config:version'
+
+_version = None
+_expires_at = 0.0  # time.monotonic()
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def _remember(version):
+    global _version, _expires_at
+    _version, _expires_at = version, time.monotonic() + settings.BOOKY_CONFIG_VERSION_CHECK_INTERVAL
+
+
+def current():
+    """The current version (creates it if the cache lost it); read from the cache at most once per interval."""
+    if _version is not None and time.monotonic() < _expires_at:
+        return _version
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _now_ms(), None)
+        version = cache.get(VERSION_KEY)
+    _remember(version)
+    return version
+
+
+def bump():
+    def set_next():
+        # Strogo rastuće i kad dvije promjene padnu u istu milisekundu
+        version = max(_now_ms(), (cache.get(VERSION_KEY) or 0) + 1)
+        cache.set(VERSION_KEY, version, None)
+        _remember(version)
+
+    # Nakon commita, kao availability cache
+    transaction.on_commit(set_next)
+
+
+def last_modified(version):
+    """UNIX timestamp (whole seconds, rounded up) for a Last-Modified header."""
+    return math.ceil(version / 1000)
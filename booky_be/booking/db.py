@@ -0,0 +1,109 @@
+# booking/db.py
+"""
+Small database helpers for write paths that must serialize on SQLite.
+
+`configure_sqlite` (connected to `connection_created` in BookingConfig.ready())
+tunes every new SQLite connection for concurrent use: the PRAGMAs from
+BOOKY_SQLITE_PRAGMAS (WAL, busy timeout, ...) and BOOKY_SQLITE_TRANSACTION_MODE
+for `transaction.atomic()` blocks. `manage.py bench_sqlite_concurrency`
+measures the difference.
+
+`create_cache_table` (connected to `post_migrate`) creates the DatabaseCache
+table of settings.CACHES, so `migrate` alone leaves a working database.
+"""
+import random
+import re
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import OperationalError, connection, transaction
+
+LOCK_RETRY_ATTEMPTS = 20
+LOCK_RETRY_BASE_DELAY = 0.01  # sekunde; udvostručuje se svakim pokušajem
+LOCK_RETRY_MAX_DELAY = 0.25
+
+
+# PRAGMA ime i vrijednost idu direktno u SQL (PRAGMA ne prima parametre)
+PRAGMA_NAME = re.compile(r'^[a-z_]+$')
+PRAGMA_VALUE = re.compile(r'^-?\w+$')
+
+# FTS5 (pretraga, migracija 0011) prijavljuje zaključan shadow table kao grešku konstruktora
+LOCK_ERROR_MESSAGES = ('locked', 'vtable constructor failed')
+
+
+def is_lock_error(error):
+    """SQLite 'database is locked' / 'database table is locked' (shared cache)."""
+    return isinstance(error, OperationalError) and any(message in str(error) for message in LOCK_ERROR_MESSAGES)
+
+
+def create_cache_table(sender, using, verbosity=1, **kwargs):
+    """`post_migrate` receiver: `createcachetable` (a no-op when the table exists or no cache uses the database)."""
+    call_command('createcachetable', database=using, verbosity=verbosity)
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    `connection_created` receiver: applies BOOKY_SQLITE_PRAGMAS (in order,
+    empty values skipped) and BOOKY_SQLITE_TRANSACTION_MODE to a new SQLite
+    connection. Other backends are left alone.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in settings.BOOKY_SQLITE_PRAGMAS.items():
+        value = str(value).strip()
+        if not value:
+            continue
+        if not PRAGMA_NAME.match(name) or not PRAGMA_VALUE.match(value):
+            raise ImproperlyConfigured(f"Invalid SQLite PRAGMA {name}={value!r} in BOOKY_SQLITE_PRAGMAS.")
+        # Direktno na sqlite3 konekciji: bez execute_wrappera (metrike, profiler) i debug loga
+        connection.connection.execute(f'PRAGMA {name} = {value}').fetchall()
+
+    mode = settings.BOOKY_SQLITE_TRANSACTION_MODE
+    if mode:
+        if mode not in connection.transaction_modes:
+            raise ImproperlyConfigured(
+                f"BOOKY_SQLITE_TRANSACTION_MODE must be one of {', '.join(sorted(connection.transaction_modes))}."
+            )
+        connection.transaction_mode = mode
+
+
+@contextmanager
+def immediate_atomic():
+    """
+    `transaction.atomic()` that opens the outermost transaction with
+    `BEGIN IMMEDIATE` on SQLite, so the write lock is taken before the first
+    read instead of at the first write. Nested blocks and other backends
+    behave exactly like `transaction.atomic()`.
+    """
+    if connection.vendor != 'sqlite' or connection.in_atomic_block:
+        with transaction.atomic():
+            yield
+        return
+
+    connection.ensure_connection()  # transaction_mode se postavlja kod spajanja
+    previous_mode = connection.transaction_mode
+    connection.transaction_mode = 'IMMEDIATE'
+    try:
+        with transaction.atomic():
+            connection.transaction_mode = previous_mode
+            yield
+    finally:
+        connection.transaction_mode = previous_mode
+
+
+def retry_on_lock(func, attempts=LOCK_RETRY_ATTEMPTS, base_delay=LOCK_RETRY_BASE_DELAY):
+    """
+    Calls `func()` and retries it with exponential backoff (plus jitter) while
+    it fails with a lock error. `func` must run its own transaction, so every
+    attempt starts from a clean rollback.
+    """
+    for attempt in range(attempts):
+        try:
+            return func()
+        except OperationalError as error:
+            if not is_lock_error(error) or attempt == attempts - 1 or connection.in_atomic_block:
+                raise
+        time.sleep(min(base_delay * (2 ** attempt), LOCK_RETRY_MAX_DELAY) * (1 + random.random()))
@@ -0,0 +1,60 @@
+# booking/emails.py
+"""
+Builds the reservation emails as unsent `EmailMessage` objects. Views hand
+them to `booking.outbox.enqueue`, the `run_outbox` worker sends them.
+"""
+from django.conf import settings
+from django.core.mail import EmailMessage
+
+from booking.utils.calendar_utils import generate_ics_file
+from booking.utils.email_templates import email_templates
+
+
+def owner_notification(instance):
+    """Plain-text notice to the owner that a new reservation awaits approval."""
+    subject = f"New reservation for {instance.service.name}"
+    message = f"""
+            A new reservation has been created.
+
+            Details:
+            Name: {instance.full_name}
+            Phone: {instance.phone}
+            Email: {instance.email}
+            Plates: {instance.license_plate}
+            Service: {instance.service.name}
+            Time Slot: {instance.start_time.strftime('%d.%m.%Y at %H:%M')}
+
+            Please approve it in the administration/dashboard panel.
+            """
+    return EmailMessage(
+        subject=subject,
+        body=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[settings.BOOKY_OWNER_EMAIL],
+    )
+
+
+def _html_email(template_name, instance):
+    template = email_templates[template_name]
+    email = EmailMessage(
+        subject=template["subject"],
+        body=template["html"](instance),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[instance.email],
+    )
+    email.content_subtype = "html"
+    return email
+
+
+def pending_confirmation(instance):
+    """Confirmation to the customer that the reservation is pending approval."""
+    # no need for ics icon during the approval proccess
+    return _html_email("confirmation", instance)
+
+
+def approval(instance):
+    """Approval email to the customer with the reservation as .ics attachment."""
+    email = _html_email("approved", instance)
+    ics_file = generate_ics_file(instance)
+    email.attach('reservation.ics', ics_file.read(), 'text/calendar')
+    return email
@@ -0,0 +1,164 @@
+# booking/feeds.py
+"""
+Subscribable iCalendar feeds (CalendarFeed, GET /api/calendar/<token>.ics).
+
+Calendar apps poll every few minutes, so the common request must be cheap:
+
+- every resource has a "last changed" stamp in the cache, set by the signals
+  in booking/signals.py on reservation, service, resource and location changes
+  (and by the bulk approve, which bypasses signals),
+- ETag and Last-Modified are derived from those stamps only, so a matching
+  If-None-Match / If-Modified-Since is answered with 304 without reading the
+  reservation table,
+- on a miss every reservation's VEVENT is cached under a key containing a
+  digest of its fields, so only new or changed reservations are formatted.
+
+Stamps missing from the cache (eviction, cleared cache table) are recreated
+with the current time: clients then download the feed once more, but never
+get a stale 304.
+"""
+import hashlib
+import math
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone, translation
+
+from . import metrics
+from .models import Reservation
+from .queries import local_midnight
+from .utils.calendar_utils import PRODID, content_lines, escape_text, reservation_uid, vevent
+
+CHANGED_KEY = 'calendar:changed:{}'  # resource id
+GLOBAL_CHANGED_KEY = 'calendar:changed'
+VEVENT_KEY = 'calendar:vevent:{}:{}'  # reservation id, digest polja
+VEVENT_TIMEOUT = 24 * 60 * 60
+
+EVENT_FIELDS = (
+    'id', 'full_name', 'phone', 'email', 'license_plate', 'start_time', 'end_time', 'is_approved',
+    'created_at', 'service__name', 'service__name_en', 'resource__name', 'resource__location__name',
+)
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def _set_now(keys):
+    def stamp():
+        # Strogo rastuće i kad dvije promjene padnu u istu milisekundu
+        now, previous = _now_ms(), cache.get_many(keys)
+        cache.set_many({key: max(now, previous.get(key, 0) + 1) for key in keys}, None)
+
+    # Nakon commita, kao availability cache: nema upisa u cache unutar transakcije
+    # rezervacije, a klijent ne može dobiti stari sadržaj s novim stampom
+    transaction.on_commit(stamp)
+
+
+def touch(resource_ids):
+    """Marks the feeds of `resource_ids` (and of their locations) as changed."""
+    keys = [CHANGED_KEY.format(resource_id) for resource_id in set(resource_ids)]
+    if keys:
+        _set_now(keys)
+
+
+def touch_all():
+    """Marks every feed as changed (service, resource or location edits)."""
+    _set_now([GLOBAL_CHANGED_KEY])
+
+
+def _stamps(resource_ids):
+    keys = [GLOBAL_CHANGED_KEY] + [CHANGED_KEY.format(resource_id) for resource_id in resource_ids]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        now = _now_ms()
+        for key in missing:
+            cache.add(key, now, None)
+        found.update(cache.get_many(missing))
+    return [found[key] for key in keys]
+
+
+def feed_state(feed):
+    """
+    (resource ids, strong ETag, Last-Modified as a UNIX timestamp) of `feed`,
+    computed from cache stamps and the resource table only.
+    """
+    resource_ids = feed.resource_ids()
+    stamps = _stamps(resource_ids)
+    today = timezone.localdate()
+
+    # Prozor feeda se pomiče svake ponoći, pa je i današnji datum dio verzije
+    version = f'{feed.pk}:{feed.name}:{today}:{settings.BOOKY_CALENDAR_PAST_DAYS}:{resource_ids}:{stamps}'
+    etag = f'"{hashlib.sha256(version.encode()).hexdigest()[:32]}"'
+    # HTTP datumi imaju sekunde: zaokruži naviše da promjena nikad ne izgleda starija
+    last_modified = max(math.ceil(max(stamps) / 1000), int(local_midnight(today).timestamp()))
+    return resource_ids, etag, last_modified
+
+
+def _digest(row):
+    return hashlib.sha1(repr(tuple(row.values())).encode()).hexdigest()
+
+
+def _event(row):
+    service = row['service__name_en'] or row['service__name']
+    location = row['resource__name']
+    if row['resource__location__name']:
+        location = f"{location}, {row['resource__location__name']}"
+    description = '\n'.join(filter(None, [
+        row['full_name'], row['phone'], row['email'], row['license_plate'],
+        'Approved' if row['is_approved'] else 'Pending approval',
+    ]))
+    return vevent(
+        uid=reservation_uid(row['id']),
+        dtstamp=row['created_at'] or row['start_time'],
+        start=row['start_time'],
+        end=row['end_time'],
+        summary=f"{service}: {row['full_name']}",
+        description=description,
+        location=location,
+        status='CONFIRMED' if row['is_approved'] else 'TENTATIVE',
+    )
+
+
+def render_feed(feed, resource_ids):
+    """The complete .ics body; VEVENTs come from the cache where unchanged."""
+    since = local_midnight(timezone.localdate() - timedelta(days=settings.BOOKY_CALENDAR_PAST_DAYS))
+    # Isti jezik za svaki request, jer ETag ne ovisi o Accept-Language
+    with translation.override(settings.LANGUAGE_CODE):
+        rows = list(
+            Reservation.objects
+            .filter(resource_id__in=resource_ids, start_time__gte=since)
+            .order_by('start_time', 'id')
+            .values(*EVENT_FIELDS)
+        )
+
+    keys = {row['id']: VEVENT_KEY.format(row['id'], _digest(row)) for row in rows}
+    cached = cache.get_many(list(keys.values()))
+    built = {}
+    parts = [content_lines([
+        ('BEGIN', 'VCALENDAR'),
+        ('VERSION', '2.0'),
+        ('PRODID', PRODID),
+        ('CALSCALE', 'GREGORIAN'),
+        ('METHOD', 'PUBLISH'),
+        ('X-WR-CALNAME', escape_text(feed.name)),
+        ('X-WR-TIMEZONE', settings.TIME_ZONE),
+        ('REFRESH-INTERVAL;VALUE=DURATION', f'PT{max(settings.BOOKY_CALENDAR_MAX_AGE // 60, 1)}M'),
+    ])]
+    for row in rows:
+        key = keys[row['id']]
+        fragment = cached.get(key)
+        if fragment is None:
+            fragment = built[key] = _event(row)
+        parts.append(fragment)
+    parts.append(content_lines([('END', 'VCALENDAR')]))
+
+    metrics.record_cache('calendar_events', hits=len(rows) - len(built), misses=len(built))
+    if built:
+        cache.set_many(built, VEVENT_TIMEOUT)
+    return ''.join(parts).encode('utf-8')
+
@@ -0,0 +1,143 @@
+# booking/listing.py
+"""
+Lean read path for reservation lists.
+
+`ReservationListSerializer` nests `ServiceTypeSerializer`/`ResourceSerializer`
+for every row, so a few hundred rows spend most of the request building
+serializer fields. `reservation_rows()` produces the exact same JSON shape
+from a single `.values()` query:
+
+- service and resource dicts are serialized once (with the real serializers,
+  so the shape cannot drift) and kept in the cache per language,
+- rows only look them up by id and format their own scalar fields.
+
+The catalog cache is cleared by signals (booking/signals.py) whenever a
+service, resource or their M2M link changes; `CATALOG_TIMEOUT` bounds any
+leftover staleness from concurrent writers.
+
+tests/test_listing.py checks byte-for-byte equality with the serializer.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone, translation
+
+from . import metrics
+from .models import Resource, ServiceType
+
+CATALOG_KEY = 'listing:catalog:{}'
+CATALOG_TIMEOUT = 300
+
+# Redoslijed polja kao u ReservationListSerializer.Meta.fields
+ROW_FIELDS = (
+    'id', 'full_name', 'phone', 'email', 'license_plate', 'service_id', 'resource_id',
+    'start_time', 'end_time', 'is_stored', 'is_approved', 'created_at',
+)
+
+
+def _build_catalog():
+    from .serializers import ResourceSerializer, ServiceTypeSerializer
+
+    services = ServiceTypeSerializer(ServiceType.objects.prefetch_related('resources'), many=True).data
+    resources = ResourceSerializer(Resource.objects.all(), many=True).data
+    return (
+        {service['id']: dict(service) for service in services},
+        {resource['id']: dict(resource) for resource in resources},
+    )
+
+
+def catalog(refresh=False):
+    """({service id: serialized service}, {resource id: serialized resource}) for the active language."""
+    key = CATALOG_KEY.format(translation.get_language())
+    cached = None if refresh else cache.get(key)
+    if not refresh:
+        metrics.record_cache('catalog', hits=cached is not None, misses=cached is None)
+    if cached is None:
+        cached = _build_catalog()
+        cache.set(key, cached, CATALOG_TIMEOUT)
+    return cached
+
+
+def invalidate_catalog():
+    keys = [CATALOG_KEY.format(code) for code, _ in settings.LANGUAGES]
+    keys.append(CATALOG_KEY.format(translation.get_language()))
+
+    def delete():
+        cache.delete_many(keys)
+
+    # Nakon commita, kao availability cache
+    transaction.on_commit(delete)
+
+
+def format_datetime(value, tz):
+    """Same output as DRF's DateTimeField in timezone `tz` (ISO 8601, 'Z' for UTC)."""
+    if value is None:
+        return None
+    value = value.astimezone(tz).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def reservation_rows(rows):
+    """
+    Turns `.values(*ROW_FIELDS)` dicts into ReservationListSerializer output.
+    Accepts any iterable, so a paginated page works the same as a full list.
+    """
+    services, resources = catalog()
+    tz = timezone.get_current_timezone()  # jednom, ne za svaki datum (asgiref Local je skup)
+    data = []
+    for row in rows:
+        if row['service_id'] not in services or row['resource_id'] not in resources:
+            # Npr. bulk_create servisa/resursa (bez signala): jednom ponovo izgradi
+            services, resources = catalog(refresh=True)
+        service = services[row['service_id']]
+        data.append({
+            'id': row['id'],
+            'full_name': row['full_name'],
+            'phone': row['phone'],
+            'email': row['email'],
+            'license_plate': row['license_plate'],
+            'service': service,
+            'resource': resources[row['resource_id']],
+            'start_time': format_datetime(row['start_time'], tz),
+            'end_time': format_datetime(row['end_time'], tz),
+            'is_stored': row['is_stored'],
+            'is_approved': row['is_approved'],
+            'created_at': format_datetime(row['created_at'], tz),
+            'service_name': service['name'],
+        })
+    return data
+
+
+# Ravne kolone za CSV/NDJSON export (servis i resurs po imenu)
+EXPORT_FIELDS = (
+    'id', 'full_name', 'phone', 'email', 'license_plate', 'service', 'resource',
+    'start_time', 'end_time', 'is_stored', 'is_approved', 'created_at',
+)
+
+
+def export_rows(rows):
+    """
+    Lazily turns `.values(*ROW_FIELDS)` dicts into flat export dicts, so a
+    `queryset.iterator()` is never materialized as a whole.
+    """
+    services, resources = catalog()
+    tz = timezone.get_current_timezone()
+    for row in rows:
+        if row['service_id'] not in services or row['resource_id'] not in resources:
+            services, resources = catalog(refresh=True)
+        yield {
+            'id': row['id'],
+            'full_name': row['full_name'],
+            'phone': row['phone'],
+            'email': row['email'],
+            'license_plate': row['license_plate'],
+            'service': services[row['service_id']]['name'],
+            'resource': resources[row['resource_id']]['name'],
+            'start_time': format_datetime(row['start_time'], tz),
+            'end_time': format_datetime(row['end_time'], tz),
+            'is_stored': row['is_stored'],
+            'is_approved': row['is_approved'],
+            'created_at': format_datetime(row['created_at'], tz),
+        }
@@ -0,0 +1,59 @@
+# Shared helpers for the bench_* / loadtest management commands.
+# The leading underscore keeps Django from treating this module as a command.
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def throwaway_database(verbosity=0, test_name=None):
+    """
+    Runs the block against a freshly migrated test database (exactly like the
+    test runner does), so benchmarks never touch the real data. `test_name`
+    overrides TEST['NAME'], e.g. a file instead of SQLite's in-memory default.
+    """
+    old_name = connection.settings_dict['NAME']
+    test_settings = connection.settings_dict['TEST']
+    old_test_name = test_settings.get('NAME')
+    if test_name is not None:
+        test_settings['NAME'] = test_name
+    setup_test_environment()
+    try:
+        connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+    finally:
+        teardown_test_environment()
+        test_settings['NAME'] = old_test_name
+
+
+def timed(func, repeat):
+    """Calls `func` `repeat` times and returns the individual durations in seconds."""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(durations):
+    """p50/p95/mean in milliseconds."""
+    return {
+        'p50_ms': round(percentile(durations, 50) * 1000, 3),
+        'p95_ms': round(percentile(durations, 95) * 1000, 3),
+        'mean_ms': round(statistics.fmean(durations) * 1000, 3) if durations else 0.0,
+    }
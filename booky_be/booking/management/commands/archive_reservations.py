@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from booking import archive
+from booking.models import Reservation
+from booking.queries import local_midnight
+
+
+class Command(BaseCommand):
+    help = (
+        'Move reservations that ended more than --older-than days ago into ArchivedReservation, '
+        'in batches (one transaction each); safe to interrupt and re-run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            default=settings.BOOKY_ARCHIVE_AFTER_DAYS,
+            help=f'Arhiviraj rezervacije završene prije više od toliko dana (default {settings.BOOKY_ARCHIVE_AFTER_DAYS})'
+        )
+        parser.add_argument(
+            '-b', '--batch-size',
+            type=int,
+            default=archive.DEFAULT_BATCH_SIZE,
+            help=f'Broj rezervacija po batchu/transakciji (default {archive.DEFAULT_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Ništa ne premješta, samo ispiše koliko bi rezervacija bilo arhivirano'
+        )
+
+    def handle(self, *args, **options):
+        older_than = options['older_than']
+        # Kalendarski feedovi (booking/feeds.py) čitaju samo živu tabelu
+        if older_than < settings.BOOKY_CALENDAR_PAST_DAYS:
+            raise CommandError(
+                f"--older-than must be at least BOOKY_CALENDAR_PAST_DAYS ({settings.BOOKY_CALENDAR_PAST_DAYS}), "
+                "otherwise archived reservations would disappear from calendar feeds."
+            )
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        cutoff = local_midnight(timezone.localdate() - timedelta(days=older_than))
+        if options['dry_run']:
+            count = Reservation.objects.filter(end_time__lt=cutoff).count()
+            self.stdout.write(f"{count} reservation(s) ended before {cutoff.date()} and would be archived.")
+            return
+
+        total = 0
+        while True:
+            moved = archive.archive_batch(cutoff, batch_size=options['batch_size'])
+            if not moved:
+                break
+            total += moved
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  {total} reservations archived...")
+        self.stdout.write(self.style.SUCCESS(f"Gotovo! {total} reservation(s) ended before {cutoff.date()} archived."))
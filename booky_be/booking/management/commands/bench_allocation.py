@@ -0,0 +1,65 @@
+import time as clock
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from booking.allocation import STRATEGIES, allocate
+from booking.models import Reservation, Resource, ServiceType
+from ._bench import throwaway_database
+
+
+class Command(BaseCommand):
+    help = 'Benchmark: bookings/s under contention for each allocation strategy (uses a throwaway database).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=600, help='Broj pokušaja rezervacije po strategiji (default 600)')
+        parser.add_argument('--threads', type=int, default=16, help='Broj paralelnih threadova (default 16)')
+        parser.add_argument('--resources', type=int, default=3, help='Broj resursa (default 3)')
+        parser.add_argument('--slots', type=int, default=10, help='Broj različitih termina (default 10)')
+        parser.add_argument('--strategy', choices=STRATEGIES, nargs='+', default=list(STRATEGIES))
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            service = ServiceType.objects.create(name='Bench Service', duration_minutes=60)
+            resources = [Resource.objects.create(name=f'Bench Lift {i}') for i in range(options['resources'])]
+            service.resources.add(*resources)
+
+            tz = timezone.get_current_timezone()
+            first_day = timezone.localdate() + timedelta(days=1)
+            # 10 termina po danu (08-17h), pa dalje na sljedeće dane
+            starts = [
+                datetime.combine(first_day + timedelta(days=i // 10), time(8 + i % 10, 0), tzinfo=tz)
+                for i in range(options['slots'])
+            ]
+
+            self.stdout.write(f"{'strategy':>12} {'booked':>7} {'full':>6} {'seconds':>8} {'attempts/s':>11} {'bookings/s':>11}")
+            for strategy in options['strategy']:
+                Reservation.objects.all().delete()
+                booked, elapsed = self.run(strategy, service, starts, options)
+                self.stdout.write(
+                    f"{strategy:>12} {booked:>7} {options['bookings'] - booked:>6} {elapsed:>8.2f} "
+                    f"{options['bookings'] / elapsed:>11.1f} {booked / elapsed:>11.1f}"
+                )
+
+    def run(self, strategy, service, starts, options):
+        def book(index):
+            start_time = starts[index % len(starts)]
+            end_time = start_time + timedelta(minutes=service.duration_minutes)
+
+            def create(resource):
+                return Reservation.objects.create(
+                    full_name='Bench User', phone='000', email='bench@example.com',
+                    service=service, resource=resource, start_time=start_time, end_time=end_time,
+                )
+            try:
+                return allocate(service.resources.order_by('id'), start_time, end_time, create, strategy=strategy) is not None
+            finally:
+                connections.close_all()
+
+        started = clock.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            booked = sum(pool.map(book, range(options['bookings'])))
+        return booked, clock.perf_counter() - started
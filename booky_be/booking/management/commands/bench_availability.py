@@ -0,0 +1,49 @@
+import random
+import timeit
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from booking.availability.engine import slots_for_day
+from booking.availability.reference import scan_slots_for_day
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark: legacy per-slot scan vs sweep-line engine for one busy day (no database needed).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reservations',
+            type=int,
+            nargs='+',
+            default=[10, 100, 1000],
+            help='Broj rezervacija po danu (default 10 100 1000)'
+        )
+        parser.add_argument('--resources', type=int, default=20, help='Broj resursa (default 20)')
+        parser.add_argument('--duration', type=int, default=30, help='Trajanje servisa u minutama (default 30)')
+        parser.add_argument('--repeat', type=int, default=5, help='Broj ponavljanja, uzima se najbolje (default 5)')
+
+    def handle(self, *args, **options):
+        tz = timezone.get_current_timezone()
+        day = date.today() + timedelta(days=1)
+        periods = [(time(8, 0), time(12, 0)), (time(13, 0), time(18, 0))]
+        rng = random.Random(42)
+
+        self.stdout.write(f"{'reservations':>12} {'scan ms':>10} {'sweep ms':>10} {'speedup':>8}")
+        for count in options['reservations']:
+            opening = datetime.combine(day, time(8, 0), tzinfo=tz)
+            reservations = []
+            for _ in range(count):
+                start = opening + timedelta(minutes=rng.randrange(0, 10 * 60, 15))
+                end = start + timedelta(minutes=rng.choice([30, 60, 90]))
+                # Kao iz baze: aware datetime u UTC-u
+                reservations.append((rng.randint(1, options['resources']), start.astimezone(dt_timezone.utc), end.astimezone(dt_timezone.utc)))
+
+            args = (day, periods, options['resources'], reservations, options['duration'], tz)
+            if slots_for_day(*args) != scan_slots_for_day(*args):
+                self.stdout.write(self.style.ERROR(f"Rezultati se razlikuju za {count} rezervacija!"))
+
+            scan = min(timeit.repeat(lambda: scan_slots_for_day(*args), number=1, repeat=options['repeat']))
+            sweep = min(timeit.repeat(lambda: slots_for_day(*args), number=1, repeat=options['repeat']))
+            self.stdout.write(f"{count:>12} {scan * 1000:>10.2f} {sweep * 1000:>10.2f} {scan / sweep:>7.1f}x")
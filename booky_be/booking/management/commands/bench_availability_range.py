@@ -0,0 +1,84 @@
+import random
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.availability import occupancy
+from booking.models import BusinessHours, Location, Reservation, Resource, ServiceType
+from ._bench import summarize, throwaway_database, timed
+
+
+class Command(BaseCommand):
+    help = 'Benchmark: N single-day /availability/ calls vs one /availability/range/ call (uses a throwaway database).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=14, help='Broj dana u prozoru (default 14)')
+        parser.add_argument('--resources', type=int, default=10, help='Broj resursa (default 10)')
+        parser.add_argument('--per-day', type=int, default=50, help='Rezervacija po danu (default 50)')
+        parser.add_argument('--repeat', type=int, default=20, help='Broj ponavljanja (default 20)')
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            service, start_date = self.seed(options)
+            end_date = start_date + timedelta(days=options['days'] - 1)
+            client = Client()
+            single_url = reverse('booking:availability')
+            range_url = reverse('booking:availability-range')
+
+            def single_days():
+                cache.clear()  # mjerimo hladan put, bez availability cachea
+                for offset in range(options['days']):
+                    day = start_date + timedelta(days=offset)
+                    client.get(single_url, {'service': service.id, 'date': day.isoformat()})
+
+            def one_range():
+                client.get(range_url, {'service': service.id, 'start': start_date.isoformat(), 'end': end_date.isoformat()})
+
+            for label, func in ((f"{options['days']} x single day", single_days), ('1 x range', one_range)):
+                with CaptureQueriesContext(connection) as queries:
+                    func()
+                query_count = len(queries)
+                stats = summarize(timed(func, options['repeat']))
+                self.stdout.write(
+                    f"{label:>20}: p50 {stats['p50_ms']:>8.2f} ms  p95 {stats['p95_ms']:>8.2f} ms  queries {query_count}"
+                )
+
+    def seed(self, options):
+        rng = random.Random(1)
+        tz = timezone.get_current_timezone()
+        location = Location.objects.create(name='Bench Garage', address='Benchstrasse 1')
+        service = ServiceType.objects.create(name='Bench Service', duration_minutes=60, location=location)
+        resources = [Resource.objects.create(name=f'Bench Lift {i}', location=location) for i in range(options['resources'])]
+        service.resources.add(*resources)
+        for dow in range(5):
+            BusinessHours.objects.create(day_of_week=dow, open_time=time(8, 0), close_time=time(12, 0))
+            BusinessHours.objects.create(day_of_week=dow, open_time=time(13, 0), close_time=time(17, 0))
+
+        start_date = timezone.localdate() + timedelta(days=1)
+        reservations = []
+        taken = set()  # (dan, resurs, polusatni slot); baza ne dozvoljava preklapanja na istom resursu
+        for offset in range(options['days']):
+            opening = datetime.combine(start_date + timedelta(days=offset), time(8, 0), tzinfo=tz)
+            for _ in range(options['per_day']):
+                half_hour = rng.randrange(0, 18)
+                free = [resource for resource in resources if not taken & {(offset, resource.id, half_hour), (offset, resource.id, half_hour + 1)}]
+                if not free:
+                    continue
+                resource = rng.choice(free)
+                taken.update({(offset, resource.id, half_hour), (offset, resource.id, half_hour + 1)})
+                start = opening + timedelta(minutes=30 * half_hour)
+                reservations.append(Reservation(
+                    full_name='Bench User', phone='000', email='bench@example.com',
+                    service=service, resource=resource,
+                    start_time=start, end_time=start + timedelta(minutes=60),
+                ))
+        Reservation.objects.bulk_create(reservations, batch_size=1000)
+        # bulk_create zaobilazi signale, pa ResourceSlotOccupancy punimo ručno
+        occupancy.rebuild()
+        return service, start_date
@@ -0,0 +1,228 @@
+import json
+import platform
+import random
+import time as clock
+from datetime import datetime, time, timedelta
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from booking.availability import occupancy
+from booking.models import BusinessHours, Holiday, Reservation, Resource, ServiceType
+from ._bench import summarize, throwaway_database
+from .seed_reservations import make_license_plate, make_name_email, make_phone
+
+PERIODS = ('3w', '6w', 'all', 'today', 'past', 'pending')
+SEARCH_TERMS = ('müller', 'ZH-1', '76 5')
+# Radno vrijeme kao u seed podacima: pon–pet 08–12 i 13–17, slotovi od 30 min
+WORKING_PERIODS = ((time(8, 0), time(12, 0)), (time(13, 0), time(17, 0)))
+SLOTS_PER_DAY = 16
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark of the booking hot paths (availability, disabled dates, reservation list, search, create): '
+        'p50/p95 latency and query counts to JSON, optionally compared with a baseline (uses a throwaway database).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--services', type=int, default=5, help='Broj servisa (default 5)')
+        parser.add_argument('--resources', type=int, default=10, help='Broj resursa (default 10)')
+        parser.add_argument('--per-day', type=int, default=60, help='Rezervacija po radnom danu (default 60)')
+        parser.add_argument('--days', type=int, default=60, help='Dana s rezervacijama unaprijed; trećina toliko unazad (default 60)')
+        parser.add_argument('--holidays', type=int, default=10, help='Broj praznika u periodu (default 10)')
+        parser.add_argument('--repeat', type=int, default=30, help='Mjerenja po scenariju (default 30)')
+        parser.add_argument('--seed', type=int, default=19, help='Seed za random (default 19)')
+        parser.add_argument('--output', default='bench_booky.json', help='JSON s rezultatima (default bench_booky.json)')
+        parser.add_argument('--baseline', help='Raniji JSON za usporedbu')
+        parser.add_argument('--threshold', type=float, default=20.0,
+                            help='Dozvoljeno pogoršanje p50/p95 u postocima (default 20)')
+        parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                            help='Manje razlike od ovoga nisu regresija, bez obzira na postotak (default 1.0)')
+
+    def handle(self, *args, **options):
+        params = {key: options[key] for key in ('services', 'resources', 'per_day', 'days', 'holidays', 'repeat', 'seed')}
+        with throwaway_database():
+            seeded = self.seed(options)
+            results = self.run_scenarios(seeded, options['repeat'])
+
+        report = {
+            'meta': {
+                'created': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'reservations': seeded['reservations'],
+                'params': params,
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2, ensure_ascii=False)
+        self.stdout.write(f"Rezultati: {options['output']}")
+
+        if options['baseline']:
+            self.compare(report, options)
+
+    # --- PODACI --- #
+
+    def seed(self, options):
+        rng = random.Random(options['seed'])
+        today = timezone.localdate()
+
+        for day_of_week in range(5):
+            for open_time, close_time in WORKING_PERIODS:
+                BusinessHours.objects.create(day_of_week=day_of_week, open_time=open_time, close_time=close_time)
+
+        services = [
+            ServiceType.objects.create(name=f'Bench Service {i}', duration_minutes=30)
+            for i in range(options['services'])
+        ]
+        resources = [Resource.objects.create(name=f'Bench Lift {i}') for i in range(options['resources'])]
+        for service in services:
+            service.resources.add(*resources)
+
+        first_day = today - timedelta(days=options['days'] // 3)
+        days = [first_day + timedelta(days=i) for i in range(options['days'] // 3 + options['days'])]
+        workdays = [day for day in days if day.weekday() < 5]
+        future = [day for day in workdays if day > today]
+        holidays = set(rng.sample(future, min(options['holidays'], len(future) - 1)))
+        for day in sorted(holidays):
+            Holiday.objects.create(name=f'Bench Holiday {day}', date=day)
+
+        # Dan popunjavamo slot po slot preko svih resursa (prvih `per_day` ćelija),
+        # a upisujemo unazad po vremenu: SQLite trigger za preklapanja je tada najjeftiniji
+        per_day = min(options['per_day'], len(resources) * SLOTS_PER_DAY)
+        batch = []
+        with transaction.atomic():
+            for day in reversed([day for day in workdays if day not in holidays]):
+                for cell in reversed(range(per_day)):
+                    slot, index = divmod(cell, len(resources))
+                    start = self.slot_start(day, slot)
+                    full_name, email = make_name_email(rng.choice(['de', 'fr', 'it', 'rs']))
+                    reservation = Reservation(
+                        full_name=full_name, email=email, phone=make_phone(), license_plate=make_license_plate(),
+                        service=rng.choice(services), resource=resources[index],
+                        start_time=start, end_time=start + timedelta(minutes=30),
+                        is_approved=rng.random() < 0.7,
+                    )
+                    reservation.fill_search_fields()  # bulk_create preskače save()
+                    batch.append(reservation)
+                if len(batch) >= 5000:
+                    Reservation.objects.bulk_create(batch)
+                    batch = []
+            Reservation.objects.bulk_create(batch)
+        occupancy.rebuild(batch_size=5000)
+
+        return {
+            'service': services[0],
+            'busy_day': next(day for day in workdays if day > today and day not in holidays),
+            'free_day': days[-1] + timedelta(days=1),
+            'reservations': Reservation.objects.count(),
+        }
+
+    def slot_start(self, day, slot):
+        open_time = WORKING_PERIODS[0][0] if slot < SLOTS_PER_DAY // 2 else WORKING_PERIODS[1][0]
+        minutes = 30 * (slot % (SLOTS_PER_DAY // 2))
+        return timezone.make_aware(datetime.combine(day, open_time)) + timedelta(minutes=minutes)
+
+    # --- MJERENJE --- #
+
+    def scenarios(self, seeded):
+        """(name, method, url, params, expected status); POST params is a callable (novi termin svaki put)."""
+        service_id = seeded['service'].pk
+        busy_day = seeded['busy_day']
+        scenarios = [
+            ('availability', 'get', reverse('booking:availability'),
+             {'service': service_id, 'date': busy_day.isoformat()}, 200),
+            ('availability (cache hit)', 'get', reverse('booking:availability'),
+             {'service': service_id, 'date': busy_day.isoformat()}, 200),
+            ('availability range 7d', 'get', reverse('booking:availability-range'),
+             {'service': service_id, 'start': busy_day.isoformat(), 'end': (busy_day + timedelta(days=6)).isoformat()}, 200),
+            ('disabled dates', 'get', reverse('booking:disabled-dates'), {'days': 90}, 200),
+            ('disabled dates (service)', 'get', reverse('booking:disabled-dates'), {'days': 90, 'service': service_id}, 200),
+        ]
+        for period in PERIODS:
+            scenarios.append((f'list period={period}', 'get', reverse('booking:reservation-list-create'), {'period': period}, 200))
+        for term in SEARCH_TERMS:
+            scenarios.append((f'search {term!r}', 'get', reverse('booking:reservation-list-create'), {'search': term}, 200))
+
+        created = iter(range(10 ** 6))
+
+        def new_reservation():
+            # Slobodni dani iza seed podataka, slot po slot
+            day, slot = divmod(next(created), SLOTS_PER_DAY)
+            start = self.slot_start(seeded['free_day'] + timedelta(days=day), slot)
+            return {
+                'full_name': 'Bench Customer', 'phone': '+41 76 000 00 00', 'email': 'bench@example.com',
+                'license_plate': 'ZH 1', 'service': service_id, 'start_time': start.isoformat(),
+            }
+        scenarios.append(('create', 'post', reverse('booking:reservation-list-create'), new_reservation, 201))
+        return scenarios
+
+    def run_scenarios(self, seeded, repeat):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(
+            email='bench@example.com', password='bench', is_staff=True,
+        ))
+
+        results = {}
+        self.stdout.write(f"{'scenario':<28} {'p50':>9} {'p95':>9} {'mean':>9} {'queries':>8}")
+        for name, method, url, params, expected in self.scenarios(seeded):
+            # Bez cachea dostupnosti (timeout 0), osim u scenariju koji mjeri baš cache
+            with override_settings(BOOKY_AVAILABILITY_CACHE_TIMEOUT=300 if 'cache hit' in name else 0):
+                durations, queries = [], 0
+                for run in range(repeat + 1):  # prvi poziv je zagrijavanje
+                    data = params() if callable(params) else params
+                    with CaptureQueriesContext(connection) as captured:
+                        started = clock.perf_counter()
+                        response = getattr(client, method)(url, data, format='json' if method == 'post' else None)
+                        elapsed = clock.perf_counter() - started
+                    if response.status_code != expected:
+                        raise CommandError(f"{name}: HTTP {response.status_code} (expected {expected})")
+                    if run:
+                        durations.append(elapsed)
+                        queries = max(queries, len(captured))
+
+            stats = dict(summarize(durations), queries=queries)
+            results[name] = stats
+            self.stdout.write(
+                f"{name:<28} {stats['p50_ms']:>7.2f}ms {stats['p95_ms']:>7.2f}ms {stats['mean_ms']:>7.2f}ms {queries:>8}"
+            )
+        return results
+
+    # --- USPOREDBA --- #
+
+    def compare(self, report, options):
+        with open(options['baseline'], encoding='utf-8') as handle:
+            baseline = json.load(handle)
+        if baseline['meta'].get('params') != report['meta']['params']:
+            self.stderr.write(self.style.WARNING('Baseline je mjeren s drugim parametrima; usporedba je samo okvirna.'))
+
+        limit = 1 + options['threshold'] / 100
+        regressions = []
+        self.stdout.write(f"\n{'scenario':<28} {'p50 before':>11} {'p50 now':>9} {'change':>8} {'queries':>9}")
+        for name, now in report['results'].items():
+            before = baseline['results'].get(name)
+            if before is None:
+                continue
+            change = (now['p50_ms'] / before['p50_ms'] - 1) * 100 if before['p50_ms'] else 0.0
+            self.stdout.write(
+                f"{name:<28} {before['p50_ms']:>9.2f}ms {now['p50_ms']:>7.2f}ms {change:>+7.1f}% "
+                f"{before['queries']:>4}->{now['queries']:<4}"
+            )
+            if now['queries'] > before['queries']:
+                regressions.append(f"{name}: {before['queries']} -> {now['queries']} queries")
+            for metric in ('p50_ms', 'p95_ms'):
+                if now[metric] > before[metric] * limit and now[metric] - before[metric] >= options['min_delta_ms']:
+                    regressions.append(f"{name}: {metric} {before[metric]:.2f} -> {now[metric]:.2f}")
+
+        if regressions:
+            raise CommandError('Regressions over the threshold:\n  ' + '\n  '.join(regressions))
+        self.stdout.write(self.style.SUCCESS('Nema regresija u odnosu na baseline.'))
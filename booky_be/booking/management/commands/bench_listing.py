@@ -0,0 +1,84 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from booking.listing import ROW_FIELDS, reservation_rows
+from booking.models import Reservation, Resource, ServiceType
+from booking.renderers import FastJSONRenderer
+from booking.serializers import ReservationListSerializer
+from ._bench import summarize, throwaway_database, timed
+
+# Polja koja ReservationListSerializer (s ugniježđenim service/resource) stvarno čita
+LIST_FIELDS = (
+    'id', 'full_name', 'phone', 'email', 'license_plate', 'start_time', 'end_time',
+    'is_stored', 'is_approved', 'created_at',
+    'service__id', 'service__name', 'service__duration_minutes', 'service__location',
+    # modeltranslation: name_de/name_en (ServiceTypeSerializer ih vraća)
+    *(f'service__name_{code}' for code, _ in settings.LANGUAGES),
+    'resource__id', 'resource__name', 'resource__location',
+)
+
+
+def serializer_list(limit):
+    """Stari put: model instance + ReservationListSerializer + DRF JSONRenderer."""
+    queryset = (
+        Reservation.objects
+        .select_related('service', 'resource')
+        .only(*LIST_FIELDS)
+        .prefetch_related(Prefetch('service__resources', queryset=Resource.objects.only('id')))
+        .order_by('start_time', 'id')[:limit]
+    )
+    return JSONRenderer().render(ReservationListSerializer(queryset, many=True).data)
+
+
+def lean_list(limit):
+    """Novi put: .values() + keširani servisi/resursi + FastJSONRenderer."""
+    rows = Reservation.objects.order_by('start_time', 'id').values(*ROW_FIELDS)[:limit]
+    return FastJSONRenderer().render(reservation_rows(rows))
+
+
+class Command(BaseCommand):
+    help = 'Benchmark: ReservationListSerializer vs lean .values() listing, rows/s (uses a throwaway database).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[100, 500, 2000], help='Veličine liste')
+        parser.add_argument('--repeat', type=int, default=10, help='Broj ponavljanja (default 10)')
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            self.seed(max(options['rows']))
+            self.stdout.write(f"{'rows':>6} {'serializer p50':>15} {'rows/s':>9} {'lean p50':>10} {'rows/s':>9} {'speedup':>8}")
+            for limit in options['rows']:
+                if serializer_list(limit) != lean_list(limit):
+                    self.stderr.write(self.style.ERROR(f"Output differs for {limit} rows"))
+                before = summarize(timed(lambda: serializer_list(limit), options['repeat']))['p50_ms']
+                after = summarize(timed(lambda: lean_list(limit), options['repeat']))['p50_ms']
+                self.stdout.write(
+                    f"{limit:>6} {before:>13.2f}ms {limit / before * 1000:>9.0f} "
+                    f"{after:>8.2f}ms {limit / after * 1000:>9.0f} {before / after:>7.1f}x"
+                )
+
+    def seed(self, count):
+        services = [ServiceType.objects.create(name=f'Bench Service {i}', duration_minutes=30) for i in range(5)]
+        resources = [Resource.objects.create(name=f'Bench Lift {i}') for i in range(10)]
+        for service in services:
+            service.resources.add(*resources)
+
+        first = timezone.make_aware(datetime.combine(timezone.localdate() + timedelta(days=1), time(7, 0)))
+        batch = []
+        for i in range(count):
+            start = first + timedelta(minutes=30 * (i // len(resources)))
+            reservation = Reservation(
+                full_name=f'Customer {i}', email=f'customer{i}@example.com', phone='+41 76 000 00 00',
+                license_plate=f'ZH {i}', service=services[i % len(services)], resource=resources[i % len(resources)],
+                start_time=start, end_time=start + timedelta(minutes=30),
+            )
+            reservation.fill_search_fields()
+            batch.append(reservation)
+        with transaction.atomic():
+            Reservation.objects.bulk_create(batch, batch_size=1000)
@@ -0,0 +1,75 @@
+import random
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from booking.models import Reservation, Resource, ServiceType
+from booking.search import search_reservations
+from ._bench import summarize, throwaway_database, timed
+from .seed_reservations import make_license_plate, make_name_email, make_phone
+
+QUERIES = ['müller', 'Petrov', 'ZH-12', '76 512', 'testmail', 'GE 4']
+
+
+def legacy_search(queryset, query):
+    """Stara pretraga: četiri icontains nad sirovim kolonama (full scan)."""
+    return queryset.filter(
+        Q(full_name__icontains=query) |
+        Q(email__icontains=query) |
+        Q(phone__icontains=query) |
+        Q(license_plate__icontains=query)
+    )
+
+
+class Command(BaseCommand):
+    help = 'Benchmark: legacy icontains search vs indexed search (uses a throwaway database).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reservations', type=int, default=100_000, help='Broj rezervacija (default 100000)')
+        parser.add_argument('--repeat', type=int, default=10, help='Broj ponavljanja po upitu (default 10)')
+        parser.add_argument('--query', nargs='+', default=QUERIES, help='Pojmovi za pretragu')
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            self.seed(options['reservations'])
+            self.stdout.write(
+                f"{'query':>10} {'legacy p50':>11} {'legacy p95':>11} {'rows':>6} {'indexed p50':>12} {'indexed p95':>12} {'rows':>6}"
+            )
+            base = Reservation.objects.all()
+            for query in options['query']:
+                line = f"{query:>10}"
+                for search in (legacy_search, search_reservations):
+                    queryset = search(base, query).values_list('id', flat=True)
+                    rows = len(list(queryset))
+                    stats = summarize(timed(lambda: list(queryset.all()), options['repeat']))
+                    line += f" {stats['p50_ms']:>10.2f}ms {stats['p95_ms']:>10.2f}ms {rows:>6}"
+                self.stdout.write(line)
+
+    def seed(self, count):
+        random.seed(11)
+        service = ServiceType.objects.create(name='Bench Service', duration_minutes=30)
+        resources = [Resource.objects.create(name=f'Bench Lift {i}') for i in range(20)]
+        service.resources.add(*resources)
+
+        # 20 liftova x 20 polusatnih termina dnevno, dan za danom unazad
+        first_day = timezone.localdate() - timedelta(days=count // 400 + 1)
+        batch = []
+        with transaction.atomic():
+            for i in range(count):
+                day, slot = divmod(i, 400)
+                start = timezone.make_aware(datetime.combine(first_day + timedelta(days=day), time(7, 0))) + timedelta(minutes=30 * (slot // 20))
+                full_name, email = make_name_email(random.choice(['de', 'fr', 'it', 'rs']))
+                reservation = Reservation(
+                    full_name=full_name, email=email, phone=make_phone(), license_plate=make_license_plate(),
+                    service=service, resource=resources[slot % 20],
+                    start_time=start, end_time=start + timedelta(minutes=30),
+                )
+                reservation.fill_search_fields()  # bulk_create preskače save()
+                batch.append(reservation)
+                if len(batch) == 5000:
+                    Reservation.objects.bulk_create(batch)
+                    batch = []
+            Reservation.objects.bulk_create(batch)
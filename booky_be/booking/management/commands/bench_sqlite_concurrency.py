@@ -0,0 +1,147 @@
+import multiprocessing
+import os
+import tempfile
+import time as clock
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.test import override_settings
+from django.utils import timezone
+
+from booking.db import is_lock_error
+from booking.models import Reservation, Resource, ServiceType
+from booking.queries import overlapping_reservations
+from ._bench import summarize, throwaway_database
+
+# 'default' je ono što Django radi bez configure_sqlite (rollback journal, DEFERRED
+# transakcije, sqlite3 timeout od 5 s), 'pragmas' dodaje BOOKY_SQLITE_PRAGMAS, 'tuned' i BEGIN IMMEDIATE
+SCENARIOS = ('default', 'pragmas', 'tuned')
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark: write throughput and lock-error rate of concurrent writer processes (with readers alongside) '
+        'on a throwaway SQLite file database, with Django defaults vs BOOKY_SQLITE_PRAGMAS vs '
+        'BOOKY_SQLITE_PRAGMAS + BEGIN IMMEDIATE.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writes', type=int, default=1000, help='Broj rezervacija po scenariju (default 1000)')
+        parser.add_argument('--writers', type=int, default=8, help='Broj procesa koji pišu (default 8)')
+        parser.add_argument('--readers', type=int, default=4, help='Broj procesa koji samo čitaju (default 4)')
+        parser.add_argument('--scenario', choices=SCENARIOS, nargs='+', default=list(SCENARIOS))
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('This benchmark only makes sense on SQLite.')
+        if options['writers'] < 1 or options['writes'] < options['writers']:
+            raise CommandError('--writers must be positive and --writes at least --writers.')
+
+        # Produkcijske PRAGMA-e: WAL uključuje start.sh (SQLITE_JOURNAL_MODE)
+        pragmas = {**settings.BOOKY_SQLITE_PRAGMAS, 'journal_mode': 'WAL', 'synchronous': 'NORMAL'}
+        configurations = {
+            'default': {'BOOKY_SQLITE_PRAGMAS': {}, 'BOOKY_SQLITE_TRANSACTION_MODE': ''},
+            'pragmas': {'BOOKY_SQLITE_PRAGMAS': pragmas, 'BOOKY_SQLITE_TRANSACTION_MODE': ''},
+            'tuned': {'BOOKY_SQLITE_PRAGMAS': pragmas, 'BOOKY_SQLITE_TRANSACTION_MODE': 'IMMEDIATE'},
+        }
+        self.stdout.write(
+            f"{'scenario':>9} {'written':>8} {'locked':>7} {'lock %':>7} {'writes/s':>9} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'reads/s':>8} {'read err':>9}"
+        )
+        for scenario in options['scenario']:
+            # Svaki scenarij na novom fajlu: journal_mode=WAL ostaje zapisan u bazi
+            with tempfile.TemporaryDirectory() as directory, override_settings(**configurations[scenario]):
+                with throwaway_database(test_name=os.path.join(directory, 'bench.sqlite3')):
+                    result = self.run(options)
+            self.stdout.write(
+                f"{scenario:>9} {result['written']:>8} {result['locked']:>7} "
+                f"{100 * result['locked'] / options['writes']:>7.1f} {result['written'] / result['seconds']:>9.1f} "
+                f"{result['latency']['p50_ms']:>8.1f} {result['latency']['p95_ms']:>8.1f} "
+                f"{result['reads'] / result['seconds']:>8.1f} {result['read_errors']:>9}"
+            )
+
+    def run(self, options):
+        service = ServiceType.objects.create(name='Bench Service', duration_minutes=30)
+        resource = Resource.objects.create(name='Bench Lift')
+        service.resources.add(resource)
+        first = datetime.combine(timezone.localdate() + timedelta(days=1), time(8, 0), tzinfo=timezone.get_current_timezone())
+        # Procesi (fork), kao gunicorn workeri: threadovi bi se natjecali za GIL dok drže lock
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        results, done = context.Queue(), context.Event()
+
+        def write(index):
+            # Svaka rezervacija u svom terminu: mjeri se zaključavanje, ne preklapanja
+            start_time = first + timedelta(minutes=30 * index)
+            end_time = start_time + timedelta(minutes=30)
+            with transaction.atomic():
+                # Čitanje prije pisanja, kao provjere u viewovima i alokaciji
+                overlapping_reservations([resource.id], start_time, end_time).exists()
+                Reservation.objects.create(
+                    full_name='Bench User', phone='000', email='bench@example.com',
+                    service=service, resource=resource, start_time=start_time, end_time=end_time,
+                )
+
+        def writer(indexes):
+            result = {'written': 0, 'locked': 0, 'latencies': []}
+            try:
+                for index in indexes:
+                    started = clock.perf_counter()
+                    try:
+                        write(index)
+                    except OperationalError as error:
+                        if not is_lock_error(error):
+                            raise
+                        result['locked'] += 1
+                    else:
+                        result['written'] += 1
+                        result['latencies'].append(clock.perf_counter() - started)
+            finally:
+                # I kad proces padne, da glavni proces ne čeka zauvijek
+                connections.close_all()
+                results.put(result)
+
+        def reader():
+            result = {'reads': 0, 'read_errors': 0}
+            try:
+                while not done.is_set():
+                    try:
+                        list(
+                            overlapping_reservations([resource.id], first, first + timedelta(days=2))
+                            .values_list('id', flat=True)
+                        )
+                    except OperationalError as error:
+                        if not is_lock_error(error):
+                            raise
+                        result['read_errors'] += 1
+                    else:
+                        result['reads'] += 1
+            finally:
+                connections.close_all()
+                results.put(result)
+
+        writers = [
+            context.Process(target=writer, args=(range(i, options['writes'], options['writers']),))
+            for i in range(options['writers'])
+        ]
+        readers = [context.Process(target=reader) for _ in range(options['readers'])]
+        started = clock.perf_counter()
+        for process in writers + readers:
+            process.start()
+        parts = [results.get() for _ in writers]
+        seconds = clock.perf_counter() - started
+        done.set()
+        parts += [results.get() for _ in readers]
+        for process in writers + readers:
+            process.join()
+
+        return {
+            'seconds': seconds,
+            'written': sum(part.get('written', 0) for part in parts),
+            'locked': sum(part.get('locked', 0) for part in parts),
+            'reads': sum(part.get('reads', 0) for part in parts),
+            'read_errors': sum(part.get('read_errors', 0) for part in parts),
+            'latency': summarize([latency for part in parts for latency in part.get('latencies', [])]),
+        }
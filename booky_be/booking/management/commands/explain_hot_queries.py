@@ -0,0 +1,91 @@
+import re
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from booking.availability import occupancy
+from booking.models import ArchivedReservation, Holiday, Reservation, Resource
+from booking.queries import filter_by_period, local_midnight, overlapping_reservations
+from booking.search import search_reservations
+
+# SQLite: "SCAN booking_reservation" (starije verzije: "SCAN TABLE ...") bez "USING ... INDEX"
+SQLITE_FULL_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(?: AS \w+)?\s*$', re.MULTILINE)
+POSTGRES_FULL_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def hot_queries():
+    """(name, queryset) for every query on the booking hot paths."""
+    today = timezone.localdate()
+    start_time = local_midnight(today + timedelta(days=1)) + timedelta(hours=10)
+    end_time = start_time + timedelta(minutes=60)
+    resource_ids = [1, 2]
+
+    queries = [
+        ('reservation overlap (create)',
+         overlapping_reservations(resource_ids, start_time, end_time).values_list('resource_id', flat=True)),
+        ('occupancy window (availability)',
+         occupancy.busy_rows(resource_ids, today, today + timedelta(days=14))),
+        ('occupancy per day (fully booked dates)',
+         occupancy.busy_buckets_per_day(resource_ids, today, today + timedelta(days=90), {0: [(480, 1020)], 5: [(480, 720)]})),
+        ('holiday on date', Holiday.objects.filter(date=today)),
+        ('holidays in window', Holiday.objects.filter(date__range=(today, today + timedelta(days=90)))),
+        ('resources of service', Resource.objects.filter(services=1).values_list('id', flat=True)),
+    ]
+    for period in ('3w', '6w', 'all', 'today', 'past', 'pending'):
+        queries.append((f'reservation list period={period}', filter_by_period(Reservation.objects.all(), period, today)))
+    queries.append(('calendar feed (resource)',
+                    Reservation.objects.filter(resource_id__in=resource_ids, start_time__gte=start_time).order_by('start_time', 'id')))
+    for term in ('müller', 'ZH-1234', '076 123'):
+        queries.append((f'reservation search {term!r}', search_reservations(Reservation.objects.all(), term)))
+    # Arhiva se čita samo za 'past' (booking/archive.py)
+    queries.append(('archive list period=past', filter_by_period(ArchivedReservation.objects.all(), 'past', today)))
+    queries.append(('archive search', search_reservations(ArchivedReservation.objects.all(), 'müller')))
+    return queries
+
+
+def full_scans(plan, vendor, tables):
+    """Tables from `tables` that `plan` reads with a full table scan."""
+    pattern = POSTGRES_FULL_SCAN if vendor == 'postgresql' else SQLITE_FULL_SCAN
+    return sorted({table for table in pattern.findall(plan) if table in tables})
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN za hot queries (SQLite i Postgres); greška ako neki radi full table scan.'
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f"explain_hot_queries supports SQLite and PostgreSQL, not {vendor}.")
+
+        tables = {model._meta.db_table for model in apps.get_app_config('booking').get_models()}
+        tables |= {
+            field.remote_field.through._meta.db_table
+            for model in apps.get_app_config('booking').get_models()
+            for field in model._meta.local_many_to_many
+        }
+
+        failures = []
+        with transaction.atomic():
+            if vendor == 'postgresql':
+                # Na malim tabelama Postgres svejedno bira Seq Scan; zanima nas može li koristiti indeks
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for name, queryset in hot_queries():
+                plan = queryset.explain()
+                scanned = full_scans(plan, vendor, tables)
+                if scanned:
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(f"FULL SCAN  {name}: {', '.join(scanned)}"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"ok         {name}"))
+                if options['verbosity'] > 1 or scanned:
+                    for line in plan.splitlines():
+                        self.stdout.write(f"    {line}")
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot query(s) fall back to a full table scan: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("All hot queries use an index."))
@@ -0,0 +1,285 @@
+import json
+import logging
+import random
+import threading
+import time as clock
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from booking import config_snapshot
+from booking.db import LOCK_ERROR_MESSAGES, is_lock_error
+from booking.models import OutboundEmail, Reservation
+from booking.queries import local_midnight
+from ._bench import percentile
+
+# Ponedjeljak ujutro: većina gleda termine, manje ih stvarno rezervira
+DEFAULT_MIX = 'availability=6,datepicker=3,book=1'
+ACTIONS = ('availability', 'datepicker', 'book')
+LOADTEST_EMAIL = 'loadtest@example.invalid'  # po ovome cleanup() prepoznaje svoje rezervacije
+
+
+def parse_mix(value):
+    weights = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ACTIONS:
+            raise CommandError(f"Unknown action {name!r} in --mix, use {', '.join(ACTIONS)}.")
+        try:
+            weights[name] = float(weight)
+        except ValueError:
+            raise CommandError(f"Invalid weight for {name!r} in --mix.")
+    if not any(weights.values()):
+        raise CommandError('--mix needs at least one positive weight.')
+    return weights
+
+
+def cleanup():
+    """Deletes the load test's reservations and the emails queued for them; returns (reservations, emails)."""
+    with transaction.atomic():
+        reservations = Reservation.objects.filter(email=LOADTEST_EMAIL)
+        # Brisanje rezervacije emailove samo odveže (SET_NULL), pa bi ih run_outbox ipak poslao, i vlasniku
+        emails, _ = OutboundEmail.objects.filter(reservation__in=reservations).delete()
+        _, deleted = reservations.delete()
+    return deleted.get(Reservation._meta.label, 0), emails
+
+
+class BudgetExhausted(Exception):
+    """--requests HTTP requests have been sent."""
+
+
+def find_double_bookings(first_day, last_day):
+    """(earlier id, later id) pairs of reservations that overlap on one resource in [first_day, last_day]."""
+    pairs = []
+    last = {}
+    for reservation_id, resource_id, start_time, end_time in (
+        Reservation.objects
+        .filter(start_time__gte=local_midnight(first_day), start_time__lt=local_midnight(last_day + timedelta(days=1)))
+        .order_by('resource_id', 'start_time')
+        .values_list('id', 'resource_id', 'start_time', 'end_time')
+    ):
+        previous = last.get(resource_id)
+        if previous and previous[1] > start_time:
+            pairs.append((previous[0], reservation_id))
+        if not previous or end_time > previous[1]:
+            last[resource_id] = (reservation_id, end_time)
+    return pairs
+
+
+class InProcessTransport:
+    """The real URL conf through django.test.Client (one per thread), no server needed."""
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def request(self, method, path, params=None, data=None):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = Client(raise_request_exception=False)
+        if method == 'GET':
+            response = client.get(path, params)
+        else:
+            response = client.post(path, data, content_type='application/json')
+        if response.status_code >= 500:
+            # exc_info dolazi preko globalnog signala, pa gledamo samo odgovore s 500
+            return response.status_code, None, bool(response.exc_info) and is_lock_error(response.exc_info[1])
+        body = response.json() if response.get('Content-Type', '').startswith('application/json') else None
+        return response.status_code, body, False
+
+    def close(self):
+        connections.close_all()
+
+
+class HTTPTransport:
+    """A running local server (runserver, gunicorn) over plain urllib."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, params=None, data=None):
+        url = self.base_url + path
+        if params:
+            url += '?' + urllib.parse.urlencode(params)
+        body = json.dumps(data).encode() if data is not None else None
+        request = urllib.request.Request(url, data=body, method=method, headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                status, content = response.status, response.read()
+        except urllib.error.HTTPError as error:
+            status, content = error.code, error.read()
+        if status >= 500:
+            # Lock greška je vidljiva samo u DEBUG stranici s tracebackom
+            text = content.decode('utf-8', 'replace')
+            return status, None, 'OperationalError' in text and any(message in text for message in LOCK_ERROR_MESSAGES)
+        try:
+            return status, json.loads(content or b'null'), False
+        except ValueError:
+            return status, None, False
+
+    def close(self):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test: concurrent clients mixing availability lookups, date-picker loads and reservation POSTs '
+        'against the current database (in-process, or --url for a running local server). '
+        'Its reservations and their queued emails are deleted afterwards unless --keep is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=16, help='Broj paralelnih klijenata (default 16)')
+        parser.add_argument('--duration', type=float, default=10.0, help='Trajanje u sekundama (default 10)')
+        parser.add_argument('--requests', type=int,
+                            help='Umjesto trajanja: ukupan broj HTTP zahtjeva (rezervacija su dva: dostupnost + POST)')
+        parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Omjeri akcija (default {DEFAULT_MIX})')
+        parser.add_argument('--days', type=int, default=10,
+                            help='Broj radnih dana unaprijed na koje klijenti ciljaju (default 10; manje = više sudara)')
+        parser.add_argument('--url', help='Bazni URL lokalnog servera, npr. http://127.0.0.1:8000 (default: in-process)')
+        parser.add_argument('--seed', type=int, default=21, help='Seed za random (default 21)')
+        parser.add_argument('--keep', action='store_true',
+                            help='Ne briši na kraju rezervacije load testa i emailove za njih iz outboxa')
+
+    def handle(self, *args, **options):
+        weights = parse_mix(options['mix'])
+        snapshot = config_snapshot.get()
+        services = [service for service in snapshot.services.values() if service.resource_ids]
+        if not services:
+            raise CommandError('No service with resources; run seed_reservations on a configured database first.')
+        days = self.target_days(snapshot, options['days'])
+        if not days:
+            raise CommandError('No working days in the target window (business hours / holidays).')
+
+        in_process = not options['url']
+        transport = InProcessTransport() if in_process else HTTPTransport(options['url'])
+        if in_process:
+            setup_test_environment()  # ALLOWED_HOSTS 'testserver' i locmem email backend
+            logging.getLogger('django.request').setLevel(logging.CRITICAL)  # 500 brojimo sami
+        try:
+            try:
+                stats, elapsed = self.run(transport, services, days, weights, options)
+            finally:
+                if in_process:
+                    teardown_test_environment()
+            self.report(stats, elapsed)
+            double_bookings = find_double_bookings(days[0], days[-1])
+        finally:
+            # I kad je run prekinut (Ctrl+C), inače bi run_outbox poslao emailove za lažne rezervacije
+            if not options['keep']:
+                reservations, emails = cleanup()
+                self.stdout.write(f"Obrisano {reservations} rezervacija i {emails} emailova load testa.")
+        if double_bookings:
+            raise CommandError(f"{len(double_bookings)} double booking(s): {double_bookings[:10]}")
+        self.stdout.write(self.style.SUCCESS('Nema dvostrukih rezervacija.'))
+
+    def target_days(self, snapshot, count):
+        days = []
+        day = timezone.localdate() + timedelta(days=1)
+        for _ in range(count * 7 + 7):
+            if snapshot.periods[day.weekday()] and not snapshot.is_holiday(day):
+                days.append(day)
+                if len(days) == count:
+                    break
+            day += timedelta(days=1)
+        return days
+
+    # --- KLIJENTI --- #
+
+    def run(self, transport, services, days, weights, options):
+        stats = {
+            'latency': defaultdict(list),
+            'status': defaultdict(lambda: defaultdict(int)),
+            'locked': 0,
+            'booked': 0,
+            'rejected': 0,
+        }
+        lock = threading.Lock()
+        actions, action_weights = zip(*weights.items())
+        deadline = clock.perf_counter() + options['duration']
+        budget = iter(range(options['requests'])) if options['requests'] else None
+
+        def record(action, status, latency, locked):
+            with lock:
+                stats['latency'][action].append(latency)
+                stats['status'][action][status] += 1
+                stats['locked'] += locked
+
+        def call(action, method, path, params=None, data=None):
+            if budget is not None:
+                with lock:
+                    if next(budget, None) is None:
+                        raise BudgetExhausted
+            started = clock.perf_counter()
+            status, body, locked = transport.request(method, path, params, data)
+            record(action, status, clock.perf_counter() - started, locked)
+            return status, body
+
+        def client(index):
+            rng = random.Random(options['seed'] * 1000 + index)
+            try:
+                while budget is not None or clock.perf_counter() < deadline:
+                    service = rng.choice(services)
+                    action = rng.choices(actions, action_weights)[0]
+                    if action == 'datepicker':
+                        call(action, 'GET', reverse('booking:disabled-dates'), {'service': service.id, 'days': 60})
+                    elif action == 'availability':
+                        call(action, 'GET', reverse('booking:availability'),
+                             {'service': service.id, 'date': rng.choice(days).isoformat()})
+                    else:
+                        self.book(rng, call, service, days, stats, lock)
+            except BudgetExhausted:
+                pass
+            finally:
+                transport.close()
+
+        started = clock.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['clients']) as pool:
+            list(pool.map(client, range(options['clients'])))
+        return stats, clock.perf_counter() - started
+
+    def book(self, rng, call, service, days, stats, lock):
+        """Kao pravi korisnik: dostupnost za dan, pa POST jednog slobodnog termina (rani termini su popularniji)."""
+        day = rng.choice(days)
+        status, slots = call('book', 'GET', reverse('booking:availability'), {'service': service.id, 'date': day.isoformat()})
+        if status != 200 or not slots:
+            return
+        slot = slots[min(int(rng.expovariate(0.5)), len(slots) - 1)]
+        start = timezone.make_aware(datetime.combine(day, datetime.strptime(slot['time'], '%H:%M').time()))
+        status, _ = call('book', 'POST', reverse('booking:reservation-list-create'), data={
+            'full_name': 'Load Test', 'phone': '+41 76 000 00 00', 'email': LOADTEST_EMAIL,
+            'license_plate': f'LT {rng.randint(1, 99999)}', 'service': service.id, 'start_time': start.isoformat(),
+        })
+        with lock:
+            if status == 201:
+                stats['booked'] += 1
+            elif status == 400:
+                stats['rejected'] += 1  # netko je bio brži
+
+    # --- IZVJEŠTAJ --- #
+
+    def report(self, stats, elapsed):
+        total = sum(len(values) for values in stats['latency'].values())
+        self.stdout.write(f"{total} requests in {elapsed:.1f}s: {total / elapsed:.1f} req/s")
+        self.stdout.write(f"{'action':<13} {'requests':>8} {'p50':>9} {'p95':>9} {'p99':>9}  status codes")
+        for action, latencies in sorted(stats['latency'].items()):
+            codes = ' '.join(f"{code}x{count}" for code, count in sorted(stats['status'][action].items()))
+            self.stdout.write(
+                f"{action:<13} {len(latencies):>8} "
+                + ' '.join(f"{percentile(latencies, pct) * 1000:>7.1f}ms" for pct in (50, 95, 99))
+                + f"  {codes}"
+            )
+        self.stdout.write(
+            f"bookings: {stats['booked']} created, {stats['rejected']} rejected (slot taken); "
+            f"database locked errors: {stats['locked']}"
+        )
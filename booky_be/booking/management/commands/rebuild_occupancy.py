@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from booking.availability import occupancy
+
+
+class Command(BaseCommand):
+    help = 'Regenerate ResourceSlotOccupancy from Reservation in batches. --check samo provjerava konzistentnost.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-b', '--batch-size',
+            type=int,
+            default=1000,
+            help='Broj rezervacija po batchu/transakciji (default 1000)'
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Ne mijenja ništa, samo usporedi tabelu s rezervacijama (exit code 1 ako se razlikuju)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        if options['check']:
+            broken = occupancy.find_inconsistencies(batch_size=batch_size)
+            if broken:
+                preview = ', '.join(str(pk) for pk in broken[:20])
+                raise CommandError(
+                    f"{len(broken)} reservation(s) have inconsistent occupancy rows: {preview}"
+                    f"{' ...' if len(broken) > 20 else ''}. Run rebuild_occupancy to fix."
+                )
+            self.stdout.write(self.style.SUCCESS("Occupancy table is consistent with reservations."))
+            return
+
+        def progress(done):
+            self.stdout.write(f"  {done} reservations processed...")
+
+        total = occupancy.rebuild(batch_size=batch_size, progress=progress if options['verbosity'] > 1 else None)
+        self.stdout.write(self.style.SUCCESS(f"Gotovo! Occupancy rebuilt for {total} reservations."))
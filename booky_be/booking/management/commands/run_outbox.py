@@ -0,0 +1,53 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from booking import outbox
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Šalje emailove iz outboxa (OutboundEmail) u batchevima preko jedne SMTP konekcije po batchu.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-b', '--batch-size',
+            type=int,
+            default=50,
+            help='Broj poruka po batchu/konekciji (default 50)'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Radi kao worker: nakon pražnjenja čeka --interval sekundi i ponavlja'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Pauza između krugova u --loop modu, u sekundama (default 5)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                stats = outbox.drain(batch_size=options['batch_size'])
+            except Exception:
+                if not options['loop']:
+                    raise
+                # Worker ne smije umrijeti (npr. "database is locked"): preuzete poruke
+                # se nakon CLAIM_LEASE opet pokušavaju, a sljedeći krug ide s novom konekcijom
+                logger.exception('Outbox round failed, retrying in %s s', options['interval'])
+                close_old_connections()
+                time.sleep(options['interval'])
+                continue
+            if any(stats.values()) or not options['loop']:
+                self.stdout.write(
+                    f"Outbox: {stats['sent']} sent, {stats['retried']} scheduled for retry, {stats['dead']} dead-lettered."
+                )
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -1,8 +1,20 @@
+import math
+import random
+import time as clock
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
 from django.core.management.base import BaseCommand
-from booking.models import Reservation, ServiceType
+from django.db import connection, transaction
 from django.utils import timezone
-import random
-from datetime import timedelta
+
+from booking import feeds
+from booking.availability import cache as availability_cache
+from booking.availability import occupancy
+from booking.availability.engine import SLOT_STEP_MINUTES
+from booking.availability.window import iter_days
+from booking.models import BusinessHours, Holiday, OutboundEmail, Reservation, ResourceSlotOccupancy, ServiceType
+from booking.queries import local_midnight
 
 IMENA_DE = [
     "Johann Müller", "Lena Schneider", "Maximilian Bauer", "Sophie Fischer", "Leon Weber",
@@ -28,21 +40,21 @@ CH_KANTONS = [
     "SO", "GR", "NE", "JU", "VS", "OW", "NW", "GL", "AR", "AI", "UR"
 ]
 
-def make_license_plate():
-    canton = random.choice(CH_KANTONS)
-    number_len = random.randint(2, 6)
-    number = random.randint(10**(number_len-1), 10**number_len - 1)
+def make_license_plate(rng=random):
+    canton = rng.choice(CH_KANTONS)
+    number_len = rng.randint(2, 6)
+    number = rng.randint(10**(number_len-1), 10**number_len - 1)
     return f"{canton}-{number}"
 
-def make_name_email(language_group):
+def make_name_email(language_group, rng=random):
     if language_group == 'de':
-        full_name = random.choice(IMENA_DE)
+        full_name = rng.choice(IMENA_DE)
     elif language_group == 'fr':
-        full_name = random.choice(IMENA_FR)
+        full_name = rng.choice(IMENA_FR)
     elif language_group == 'it':
-        full_name = random.choice(IMENA_IT)
+        full_name = rng.choice(IMENA_IT)
     elif language_group == 'rs':
-        full_name = random.choice(IMENA_RS)
+        full_name = rng.choice(IMENA_RS)
     else:
         full_name = "Hans Muster"
     email = (
@@ -53,47 +65,59 @@ def make_name_email(language_group):
         .replace("č", "c")
         .replace("ž", "z")
         .replace("đ", "dj")
-        + random.choice(EMAIL_DOMENE)
+        + rng.choice(EMAIL_DOMENE)
     )
     return full_name, email
 
-def make_phone():
-    return f"+41 7{random.randint(6,9)} {random.randint(100,999)} {random.randint(10,99)} {random.randint(10,99)}"
-
-def gen_working_datetime(dt_type, duration_minutes):
-    while True:
-        # 1. Odredi bazni dan (u prošlosti, sljedećih 7, ili onih tamo 8-14 dana)
-        if dt_type == 'past':
-            base_date = timezone.now() - timedelta(days=random.randint(1, 10))
-        elif dt_type == 'next':
-            base_date = timezone.now() + timedelta(days=random.randint(0, 6))
-        else:
-            base_date = timezone.now() + timedelta(days=random.randint(8, 14))
-        # 2. Presloži na radni dan (pon–pet)
-        while base_date.weekday() >= 5:  # 5=subota, 6=nedjelja
-            base_date += timedelta(days=1)
-        # 3. Randomizuj slot prije ili poslije pauze
-        before_pause = random.choice([True, False])
-        if before_pause:
-            # 08:00 do max (12:00 - trajanje)
-            earliest = 8 * 60
-            latest = (12 * 60) - duration_minutes
-        else:
-            # 13:00 do max (17:00 - trajanje)
-            earliest = 13 * 60
-            latest = (17 * 60) - duration_minutes
-        if latest < earliest:
-            continue  # skipaj, nema mjesta za taj servis
-        start_minutes = random.randint(earliest, latest)
-        start_hour = start_minutes // 60
-        start_minute = start_minutes % 60
-        # Postavi na bazni dan
-        start_time = base_date.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(hours=start_hour, minutes=start_minute)
-        # timezone-aware (vec jeste)
-        return start_time
+def make_phone(rng=random):
+    return f"+41 7{rng.randint(6,9)} {rng.randint(100,999)} {rng.randint(10,99)} {rng.randint(10,99)}"
+
+LANG_GROUPS = ['de', 'fr', 'it', 'rs']
+# Kad BusinessHours nije definisano: pon–pet 08–12 i 13–17 (kao ranije)
+DEFAULT_PERIODS = ((8 * 60, 12 * 60), (13 * 60, 17 * 60))
+# Horizont se produžava dok traženi broj ne popuni najviše 3/4 slobodnih termina
+MAX_FILL = 0.75
+
+
+def existing_busy(first_day, last_day):
+    """(resource_id, date) -> [(start_minute, end_minute), ...] of reservations already in the database."""
+    tz = timezone.get_current_timezone()
+    busy = defaultdict(list)
+    for resource_id, start_time, end_time in Reservation.objects.filter(
+        start_time__lt=local_midnight(last_day + timedelta(days=1)),
+        end_time__gt=local_midnight(first_day),
+    ).values_list('resource_id', 'start_time', 'end_time'):
+        for day, bucket in occupancy.occupied_buckets(start_time, end_time, tz):
+            minute = bucket * occupancy.BUCKET_MINUTES
+            busy[resource_id, day].append((minute, minute + occupancy.BUCKET_MINUTES))
+    return busy
+
+
+def day_layout(rng, periods, services, busy):
+    """
+    Back-to-back `(start_minute, service)` tiles for one resource and day:
+    random services on the 30-minute grid of every working period, minus
+    those that would overlap an existing booking in `busy`.
+    """
+    tiles = []
+    for open_minute, close_minute in periods:
+        start = open_minute
+        while True:
+            service = rng.choice(services)
+            end = start + service.duration_minutes
+            if end > close_minute:
+                break
+            if not any(lo < end and hi > start for lo, hi in busy):
+                tiles.append((start, service))
+            start += math.ceil(service.duration_minutes / SLOT_STEP_MINUTES) * SLOT_STEP_MINUTES
+    return tiles
+
 
 class Command(BaseCommand):
-    help = 'Seed random reservations for testing/demo. --delete briše sve, -nr N pravi N novih rezervacija'
+    help = (
+        'Seed realistic, non-overlapping reservations for testing/demo and load tests. '
+        '--delete briše sve, -nr N pravi N novih rezervacija, --seed za ponovljiv rezultat'
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -107,79 +131,167 @@ class Command(BaseCommand):
             action='store_true',
             help='Prvo obrisi sve rezervacije (i zaustavi se)'
         )
+        parser.add_argument('--seed', type=int, help='Seed za random: isti seed i ista baza = iste rezervacije')
+        parser.add_argument('--past-days', type=int, default=10,
+                            help='Dana unazad (default 10); produžava se dok termini ne zauzmu najviše 3/4 kapaciteta')
+        parser.add_argument('--future-days', type=int, default=14, help='Dana unaprijed, uključujući danas (default 14)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Redova po bulk_create (default 5000)')
 
     def handle(self, *args, **options):
         broj_rez = options['number']
-        do_delete = options['delete']
 
         # --delete radi samo brisanje!
-        if do_delete:
-            Reservation.objects.all().delete()
-            self.stdout.write(self.style.WARNING("Obrisane sve postojeće rezervacije."))
+        if options['delete']:
+            deleted = self.delete_all()
+            self.stdout.write(self.style.WARNING(f"Obrisano svih {deleted} postojećih rezervacija."))
             return
 
-        if broj_rez == 0:
+        if broj_rez <= 0:
             self.stdout.write(self.style.SUCCESS("Nema traženih novih rezervacija za seed."))
             return
 
-        if ServiceType.objects.count() == 0:
+        if not ServiceType.objects.exists():
             self.stdout.write(self.style.ERROR("Nema definisanih ServiceType!"))
             return
 
-        lang_groups = ['de', 'fr', 'it', 'rs']
-        count_per_group = broj_rez // len(lang_groups)
-        extra = broj_rez % len(lang_groups)
-        lang_list = []
-        for g in lang_groups:
-            lang_list.extend([g]*count_per_group)
-        lang_list.extend(random.choices(lang_groups, k=extra))
-        random.shuffle(lang_list)
-
-        rezervacije = []
-
-        def get_random_service():
-            return random.choice(list(ServiceType.objects.all()))
-
-        def get_random_resource(service):
-            return random.choice(list(service.resources.all()))
-
-        n_past = max(1, broj_rez // 5)
-        n_next = broj_rez // 2
-        n_later = broj_rez - n_past - n_next
-
-        date_types = ['past'] * n_past + ['next'] * n_next + ['later'] * n_later
-        random.shuffle(date_types)
-
-        for i in range(broj_rez):
-            service = get_random_service()
-            resource = get_random_resource(service)
-            lang_group = lang_list[i % len(lang_list)]
-            full_name, email = make_name_email(lang_group)
-            start_time = gen_working_datetime(date_types[i % len(date_types)], service.duration_minutes)
-            end_time = start_time + timedelta(minutes=service.duration_minutes)
-            is_stored = random.choice([True, False]) if 'wheel' in service.name.lower() else False
-            if date_types[i % len(date_types)] == 'past':
-                is_approved = random.choice([True, False])
-            else:
-                is_approved = (i % 2 == 0)
-            r = Reservation(
-                full_name=full_name,
-                phone=make_phone(),
-                email=email,
-                license_plate=make_license_plate(),
-                service=service,
-                start_time=start_time,
-                end_time=end_time,
-                resource=resource,
-                is_stored=is_stored,
-                is_approved=is_approved
-            )
-            rezervacije.append(r)
-
-        for r in rezervacije:
-            r.save()
-            self.stdout.write(self.style.SUCCESS(
-                f"Added: {r.full_name} / {r.service.name} @ {r.start_time.strftime('%a %d.%m.%Y %H:%M')} / Approved: {r.is_approved} / Stored: {r.is_stored}"
-            ))
-
-        self.stdout.write(self.style.SUCCESS(f"Gotovo! {broj_rez} rezervacija dodano."))
+        seed = options['seed'] if options['seed'] is not None else random.randrange(2**32)
+        self.load_configuration()
+
+        # 1) Horizont: produžavamo unazad dok termini ne popune najviše MAX_FILL kapaciteta
+        today = timezone.localdate()
+        past_days, future_days = max(options['past_days'], 0), max(options['future_days'], 1)
+        while True:
+            days = list(iter_days(today - timedelta(days=past_days), today + timedelta(days=future_days - 1)))
+            busy = existing_busy(days[0], days[-1])
+            capacity = sum(1 for _ in self.tiles(seed, days, busy))
+            if capacity * MAX_FILL >= broj_rez:
+                break
+            if not capacity:
+                self.stdout.write(self.style.ERROR("Nema slobodnih termina (resursi servisa, radno vrijeme)!"))
+                return
+            past_days += math.ceil((broj_rez / MAX_FILL - capacity) / (capacity / len(days))) + 1
+
+        self.stdout.write(
+            f"Seed {seed}: {broj_rez} od {capacity} slobodnih termina, {days[0]} – {days[-1]}"
+        )
+        started = clock.perf_counter()
+        dodano = self.insert(seed, days, busy, capacity, broj_rez, options['batch_size'], started)
+
+        # bulk_create preskače signale: cache dostupnosti i kalendarske feedove osvježimo ručno
+        availability_cache.invalidate_all()
+        feeds.touch_all()
+
+        elapsed = clock.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Gotovo! {dodano} rezervacija dodano za {elapsed:.1f}s ({dodano / max(elapsed, 1e-9):.0f}/s)."
+        ))
+
+    def delete_all(self):
+        """
+        Deletes every reservation with plain SQL, like archive.archive_batch:
+        the Collector would run post_delete signals (occupancy, cache, feeds)
+        for every row. Returns how many reservations were deleted.
+        """
+        with transaction.atomic():
+            OutboundEmail.objects.filter(reservation__isnull=False).update(reservation=None)
+            with connection.cursor() as cursor:
+                for model in (ResourceSlotOccupancy, Reservation):
+                    cursor.execute(f"DELETE FROM {connection.ops.quote_name(model._meta.db_table)}")
+                deleted = cursor.rowcount
+
+        # Jednom za sve, umjesto signala po redu
+        availability_cache.invalidate_all()
+        feeds.touch_all()
+        return deleted
+
+    def load_configuration(self):
+        self.tz = timezone.get_current_timezone()
+        self.holidays = set(Holiday.objects.values_list('date', flat=True))
+        self.periods = defaultdict(list)
+        for day_of_week, open_time, close_time in BusinessHours.objects.order_by('day_of_week', 'open_time').values_list(
+            'day_of_week', 'open_time', 'close_time'
+        ):
+            self.periods[day_of_week].append((open_time.hour * 60 + open_time.minute, close_time.hour * 60 + close_time.minute))
+        if not self.periods:
+            self.periods.update({day_of_week: list(DEFAULT_PERIODS) for day_of_week in range(5)})
+
+        services = {service.pk: service for service in ServiceType.objects.all()}
+        self.services_by_resource = defaultdict(list)
+        for service_id, resource_id in ServiceType.resources.through.objects.order_by('resource_id', 'servicetype_id').values_list(
+            'servicetype_id', 'resource_id'
+        ):
+            self.services_by_resource[resource_id].append(services[service_id])
+
+    def tiles(self, seed, days, busy):
+        """
+        Every free tile of the horizon as `(day, resource_id, start_minute, service)`,
+        newest day first. Deterministic for a given seed and database.
+        """
+        rng = random.Random(f'{seed}:layout')
+        for day in reversed(days):
+            periods = self.periods.get(day.weekday())
+            if not periods or day in self.holidays:
+                continue
+            for resource_id, services in self.services_by_resource.items():
+                for start, service in reversed(day_layout(rng, periods, services, busy.get((resource_id, day), ()))):
+                    yield day, resource_id, start, service
+
+    def insert(self, seed, days, busy, capacity, wanted, batch_size, started):
+        """
+        Picks exactly `wanted` of the `capacity` tiles uniformly (selection
+        sampling, one pass) and bulk-inserts them in one transaction. Rows go
+        in newest first, which keeps the SQLite overlap trigger (migration
+        0009) cheap: it only ever finds later bookings of the same resource.
+        """
+        rng = random.Random(seed)
+        report_every = max(batch_size, wanted // 20)
+        dodano, reported, remaining = 0, 0, capacity
+        batch = []
+        with transaction.atomic():
+            for day, resource_id, start, service in self.tiles(seed, days, busy):
+                remaining -= 1
+                if rng.random() * (remaining + 1) >= wanted - dodano - len(batch):
+                    continue
+                batch.append(self.reservation(rng, day, resource_id, start, service))
+                if len(batch) >= batch_size:
+                    dodano += self.flush(batch)
+                    batch = []
+                    if dodano - reported >= report_every:
+                        reported = dodano
+                        rate = dodano / (clock.perf_counter() - started)
+                        self.stdout.write(f"  {dodano}/{wanted} ({rate:.0f}/s)")
+            dodano += self.flush(batch)
+            if not connection.features.can_return_rows_from_bulk_insert:
+                occupancy.rebuild(batch_size=batch_size)  # bez id-eva iz bulk_create
+        return dodano
+
+    def reservation(self, rng, day, resource_id, start, service):
+        full_name, email = make_name_email(rng.choice(LANG_GROUPS), rng)
+        start_time = timezone.make_aware(datetime.combine(day, time(start // 60, start % 60)), self.tz)
+        reservation = Reservation(
+            full_name=full_name,
+            phone=make_phone(rng),
+            email=email,
+            license_plate=make_license_plate(rng),
+            service=service,
+            resource_id=resource_id,
+            start_time=start_time,
+            end_time=start_time + timedelta(minutes=service.duration_minutes),
+            is_stored=rng.random() < 0.5 if 'wheel' in service.name.lower() else False,
+            is_approved=rng.random() < 0.5,
+        )
+        reservation.fill_search_fields()  # bulk_create preskače save()
+        return reservation
+
+    def flush(self, batch):
+        """bulk_create of reservations plus their ResourceSlotOccupancy rows (signals do not run)."""
+        if not batch:
+            return 0
+        Reservation.objects.bulk_create(batch)
+        if not connection.features.can_return_rows_from_bulk_insert:
+            return len(batch)
+        occupancy.insert_rows(
+            [(reservation.pk, reservation.resource_id, reservation.start_time, reservation.end_time) for reservation in batch],
+            self.tz,
+        )
+        return len(batch)
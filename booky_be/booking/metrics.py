@@ -0,0 +1,242 @@
+# booking/metrics.py
+"""
+Per-endpoint request metrics in the Prometheus text exposition format,
+served at /api/metrics/ (staff only).
+
+`MetricsMiddleware` labels every request with the named URL it resolved to
+in booking/urls.py (`view="booking:availability"`, ...; everything else is
+`other`) and records:
+
+- booky_http_requests_total{view, method, status}
+- booky_http_request_duration_seconds{view} (histogram)
+- booky_db_queries_total{view}, booky_db_query_duration_seconds_total{view}
+- booky_cache_requests_total{view, cache, result}: hits and misses of the
+  result caches, reported by the caches themselves through `record_cache()`
+- booky_metrics_overhead_seconds_total: time spent in this bookkeeping
+
+Each process keeps its values in memory and writes them to its own file in
+BOOKY_METRICS_DIR at most every BOOKY_METRICS_FLUSH_INTERVAL seconds and on
+exit. `render()` sums the files of all processes, so a scrape shows every
+gunicorn worker whichever one answers it. Files of exited workers are kept,
+so counters never go backwards; start.sh empties the directory on deploy.
+
+Streamed responses (CSV export) are timed up to the first byte.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+OTHER_VIEW = 'other'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+FAMILIES = (
+    ('booky_http_requests_total', 'counter', 'HTTP requests by view, method and status code.'),
+    ('booky_http_request_duration_seconds', 'histogram', 'Request latency by view, middleware to middleware.'),
+    ('booky_db_queries_total', 'counter', 'Database queries executed by requests to the view.'),
+    ('booky_db_query_duration_seconds_total', 'counter', 'Time spent executing those queries.'),
+    ('booky_cache_requests_total', 'counter', 'Result cache lookups by view, cache and result (hit/miss).'),
+    ('booky_metrics_overhead_seconds_total', 'counter', 'Time spent recording these metrics.'),
+)
+
+_lock = threading.Lock()
+_values = defaultdict(float)  # (ime uzorka, ((labela, vrijednost), ...)) -> vrijednost
+_local = threading.local()
+_last_flush = 0.0
+
+
+def _after_fork():
+    # gunicorn --preload: svaki worker kreće od nule i piše svoj fajl
+    global _lock, _last_flush
+    _lock = threading.Lock()
+    _values.clear()
+    _last_flush = 0.0
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+# --- PRIKUPLJANJE --- #
+
+class _RequestTracker:
+    """Per-request query counter (a `connection.execute_wrapper`) and cache results."""
+    __slots__ = ('queries', 'db_time', 'caches')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.caches = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+def record_cache(name, hits=0, misses=0):
+    """Counts result cache lookups for the current request (no-op outside a request)."""
+    tracker = getattr(_local, 'tracker', None)
+    if tracker is None:
+        return
+    for result, count in (('hit', hits), ('miss', misses)):
+        if count:
+            key = (name, result)
+            tracker.caches[key] = tracker.caches.get(key, 0) + count
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is not None and match.namespace == 'booking' and match.url_name:
+        return match.view_name
+    return OTHER_VIEW
+
+
+def _observe(view, method, status, duration, tracker):
+    view_labels = (('view', view),)
+    bucket = next((bound for bound in DURATION_BUCKETS if duration <= bound), None)
+    with _lock:
+        _values['booky_http_requests_total', (('view', view), ('method', method), ('status', str(status)))] += 1
+        # Bucketi se čuvaju nekumulativno, render() ih sabira
+        if bucket is not None:
+            _values['booky_http_request_duration_seconds_bucket', (('view', view), ('le', repr(bucket)))] += 1
+        _values['booky_http_request_duration_seconds_sum', view_labels] += duration
+        _values['booky_http_request_duration_seconds_count', view_labels] += 1
+        _values['booky_db_queries_total', view_labels] += tracker.queries
+        _values['booky_db_query_duration_seconds_total', view_labels] += tracker.db_time
+        for (cache_name, result), count in tracker.caches.items():
+            _values['booky_cache_requests_total', (('view', view), ('cache', cache_name), ('result', result))] += count
+
+
+def _add_overhead(seconds):
+    with _lock:
+        _values['booky_metrics_overhead_seconds_total', ()] += seconds
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        tracker = _local.tracker = _RequestTracker()
+        try:
+            with connection.execute_wrapper(tracker):
+                view_started = time.perf_counter()
+                response = self.get_response(request)
+                view_finished = time.perf_counter()
+        finally:
+            _local.tracker = None
+
+        _observe(view_label(request), request.method, response.status_code, view_finished - started, tracker)
+        if view_finished - _last_flush >= settings.BOOKY_METRICS_FLUSH_INTERVAL:
+            flush()
+        _add_overhead((view_started - started) + (time.perf_counter() - view_finished))
+        return response
+
+
+# --- DIJELJENJE MEĐU PROCESIMA --- #
+
+def _path(pid):
+    return os.path.join(settings.BOOKY_METRICS_DIR, f'{pid}.json')
+
+
+def flush():
+    """Writes this process's values to its file (atomically); False if the directory is not writable."""
+    global _last_flush
+    with _lock:
+        _last_flush = time.perf_counter()
+        rows = [[name, labels, value] for (name, labels), value in _values.items()]
+    if not rows:
+        return True
+    path = _path(os.getpid())
+    try:
+        os.makedirs(settings.BOOKY_METRICS_DIR, exist_ok=True)
+        with open(path + '.tmp', 'w', encoding='utf-8') as handle:
+            json.dump(rows, handle)
+        os.replace(path + '.tmp', path)
+    except OSError:
+        return False
+    return True
+
+
+atexit.register(flush)
+
+
+def collect():
+    """Values summed over all processes: the other processes' files plus this process's live values."""
+    totals = defaultdict(float)
+    own = f'{os.getpid()}.json'
+    try:
+        names = [name for name in os.listdir(settings.BOOKY_METRICS_DIR) if name.endswith('.json') and name != own]
+    except OSError:
+        names = []
+    for name in names:
+        try:
+            with open(os.path.join(settings.BOOKY_METRICS_DIR, name), encoding='utf-8') as handle:
+                rows = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        for sample, labels, value in rows:
+            totals[sample, tuple(tuple(pair) for pair in labels)] += value
+    with _lock:
+        for key, value in _values.items():
+            totals[key] += value
+    return totals
+
+
+def reset():
+    """Forgets this process's values (tests)."""
+    with _lock:
+        _values.clear()
+
+
+# --- PROMETHEUS FORMAT --- #
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _sample(name, labels, value):
+    label_text = ','.join(f'{key}="{_escape(label)}"' for key, label in labels)
+    number = str(int(value)) if float(value).is_integer() else repr(value)
+    return f'{name}{{{label_text}}} {number}' if label_text else f'{name} {number}'
+
+
+def _histogram_lines(name, totals):
+    lines = []
+    counts = sorted((labels, value) for (sample, labels), value in totals.items() if sample == f'{name}_count')
+    for labels, count in counts:
+        cumulative = 0
+        for bound in DURATION_BUCKETS:
+            le = repr(bound)
+            cumulative += totals.get((f'{name}_bucket', labels + (('le', le),)), 0)
+            lines.append(_sample(f'{name}_bucket', labels + (('le', le),), cumulative))
+        lines.append(_sample(f'{name}_bucket', labels + (('le', '+Inf'),), count))
+        lines.append(_sample(f'{name}_sum', labels, totals[f'{name}_sum', labels]))
+        lines.append(_sample(f'{name}_count', labels, count))
+    return lines
+
+
+def render():
+    totals = collect()
+    lines = []
+    for name, kind, help_text in FAMILIES:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'histogram':
+            lines.extend(_histogram_lines(name, totals))
+        else:
+            lines.extend(
+                _sample(name, labels, value)
+                for (sample, labels), value in sorted(totals.items()) if sample == name
+            )
+    return '\n'.join(lines) + '\n'
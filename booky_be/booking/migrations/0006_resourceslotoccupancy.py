@@ -0,0 +1,77 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:52
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+# Bucket algoritam iz booking/availability/occupancy.py u vrijeme ove migracije,
+# kopiran da kasnije izmjene tog modula ne mijenjaju šta ova migracija radi
+BUCKET_MINUTES = 5
+MINUTES_PER_DAY = 24 * 60
+BUCKETS_PER_DAY = MINUTES_PER_DAY // BUCKET_MINUTES
+BATCH_SIZE = 1000
+
+
+def to_minutes(value, day, tz, round_up=False):
+    local = value.astimezone(tz)
+    minutes = (local.date() - day).days * MINUTES_PER_DAY + local.hour * 60 + local.minute
+    if round_up and (local.second or local.microsecond):
+        minutes += 1
+    return minutes
+
+
+def occupied_buckets(start_time, end_time, tz):
+    day = start_time.astimezone(tz).date()
+    last_day = end_time.astimezone(tz).date()
+    while day <= last_day:
+        first = max(0, to_minutes(start_time, day, tz) // BUCKET_MINUTES)
+        end = -(-to_minutes(end_time, day, tz, round_up=True) // BUCKET_MINUTES)
+        for bucket in range(first, min(end, BUCKETS_PER_DAY)):
+            yield day, bucket
+        day += timedelta(days=1)
+
+
+def populate_occupancy(apps, schema_editor):
+    # Isti rezultat kao `rebuild_occupancy`, ali nad historijskim modelima i u paketima
+    Reservation = apps.get_model('booking', 'Reservation')
+    ResourceSlotOccupancy = apps.get_model('booking', 'ResourceSlotOccupancy')
+    tz = timezone.get_default_timezone()
+    rows = []
+    for reservation_id, resource_id, start_time, end_time in (
+        Reservation.objects.values_list('id', 'resource_id', 'start_time', 'end_time').iterator(chunk_size=BATCH_SIZE)
+    ):
+        rows.extend(
+            ResourceSlotOccupancy(reservation_id=reservation_id, resource_id=resource_id, date=day, bucket=bucket)
+            for day, bucket in occupied_buckets(start_time, end_time, tz)
+        )
+        if len(rows) >= BATCH_SIZE:
+            ResourceSlotOccupancy.objects.bulk_create(rows)
+            rows = []
+    ResourceSlotOccupancy.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_servicetype_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResourceSlotOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('bucket', models.PositiveSmallIntegerField(help_text='Index of the 5-minute bucket after local midnight')),
+                ('reservation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='booking.reservation')),
+                ('resource', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='booking.resource')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'resource', 'bucket'], name='occupancy_lookup_idx')],
+                'constraints': [models.UniqueConstraint(fields=('reservation', 'date', 'bucket'), name='occupancy_unique_bucket')],
+            },
+        ),
+        migrations.RunPython(populate_occupancy, migrations.RunPython.noop),
+    ]
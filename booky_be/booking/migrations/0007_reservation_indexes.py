@@ -0,0 +1,25 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0006_resourceslotoccupancy'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['resource', 'start_time', 'end_time'], name='reservation_overlap_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['start_time'], name='reservation_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(condition=models.Q(('is_approved', False)), fields=['start_time'], name='reservation_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0007_reservation_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResourceDayLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('resource', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='day_locks', to='booking.resource')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('resource', 'date'), name='resource_day_lock_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+from django.db import IntegrityError, migrations
+
+from . import _sqlite_triggers
+
+# Ime se pojavljuje u poruci greške na obje baze; booking.allocation ga po tome prepoznaje
+CONSTRAINT_NAME = _sqlite_triggers.OVERLAP_NAME
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    f"""
+    ALTER TABLE booking_reservation ADD CONSTRAINT {CONSTRAINT_NAME}
+    EXCLUDE USING gist (resource_id WITH =, tstzrange(start_time, end_time, '[)') WITH &&)
+    """,
+]
+POSTGRES_BACKWARD = [
+    f"ALTER TABLE booking_reservation DROP CONSTRAINT IF EXISTS {CONSTRAINT_NAME}",
+]
+
+# SQLite nema exclusion constraint; triggeri su u _sqlite_triggers (i kasnije migracije ih tamo nalaze)
+SQLITE_FORWARD = _sqlite_triggers.OVERLAP_CREATE
+SQLITE_BACKWARD = _sqlite_triggers.OVERLAP_DROP
+
+
+def check_no_overlaps(apps, schema_editor):
+    """
+    Stops the migration while booking_reservation already holds overlapping
+    reservations: Postgres would reject the constraint, and on SQLite the
+    triggers would reject later writes of those rows.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT a.id, b.id FROM booking_reservation a
+            JOIN booking_reservation b
+              ON b.resource_id = a.resource_id
+             AND b.id > a.id
+             AND b.start_time < a.end_time
+             AND b.end_time > a.start_time
+            ORDER BY a.id, b.id
+        """)
+        pairs = cursor.fetchall()
+    if pairs:
+        listed = ', '.join(f'{first}/{second}' for first, second in pairs[:20])
+        raise IntegrityError(
+            f'{len(pairs)} pairs of reservations overlap on the same resource (ids {listed}'
+            f'{", ..." if len(pairs) > 20 else ""}). Move or delete them and run migrate again; '
+            f'data from the old seed_reservations can be removed with `seed_reservations --delete`.'
+        )
+
+
+def run(statements_by_vendor):
+    def operation(apps, schema_editor):
+        for sql in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0008_resourcedaylock'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_no_overlaps, migrations.RunPython.noop),
+        migrations.RunPython(
+            run({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run({'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:12
+
+from django.db import OperationalError, migrations, models, transaction
+
+from . import _sqlite_triggers
+
+FTS_TABLE = _sqlite_triggers.fts_table('booking_reservation')
+FTS_COLUMNS = _sqlite_triggers.FTS_COLUMNS
+
+SQLITE_FORWARD = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        {FTS_COLUMNS}, content='booking_reservation', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    *_sqlite_triggers.fts_create('booking_reservation'),
+    # Indeksira postojeće redove iz booking_reservation
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    *_sqlite_triggers.fts_drop('booking_reservation'),
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX reservation_search_name_trgm ON booking_reservation USING gin (search_name gin_trgm_ops)",
+    "CREATE INDEX reservation_search_phone_trgm ON booking_reservation USING gin (search_phone gin_trgm_ops)",
+    "CREATE INDEX reservation_search_plate_trgm ON booking_reservation USING gin (search_plate gin_trgm_ops)",
+    # Django icontains na Postgresu: UPPER("email"::text) LIKE UPPER(%s)
+    "CREATE INDEX reservation_email_trgm ON booking_reservation USING gin ((UPPER(email::text)) gin_trgm_ops)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS reservation_search_name_trgm",
+    "DROP INDEX IF EXISTS reservation_search_phone_trgm",
+    "DROP INDEX IF EXISTS reservation_search_plate_trgm",
+    "DROP INDEX IF EXISTS reservation_email_trgm",
+]
+
+
+def populate_search_fields(apps, schema_editor):
+    from booking.search import normalize_name, normalize_phone, normalize_plate
+
+    Reservation = apps.get_model('booking', 'Reservation')
+    batch = []
+    for reservation in Reservation.objects.only('id', 'full_name', 'phone', 'license_plate').iterator(chunk_size=1000):
+        # Isto kao ReservationBase.fill_search_fields(): normalizacija može produžiti ime
+        reservation.search_name = normalize_name(reservation.full_name)[:100]
+        reservation.search_phone = normalize_phone(reservation.phone)[:30]
+        reservation.search_plate = normalize_plate(reservation.license_plate)[:20]
+        batch.append(reservation)
+        if len(batch) == 1000:
+            Reservation.objects.bulk_update(batch, ['search_name', 'search_phone', 'search_plate'])
+            batch = []
+    Reservation.objects.bulk_update(batch, ['search_name', 'search_phone', 'search_plate'])
+
+
+def run(statements_by_vendor):
+    def operation(apps, schema_editor):
+        statements = statements_by_vendor.get(schema_editor.connection.vendor, [])
+        if schema_editor.connection.vendor == 'sqlite' and statements is SQLITE_FORWARD:
+            try:
+                with transaction.atomic(using=schema_editor.connection.alias):
+                    for sql in statements:
+                        schema_editor.execute(sql)
+            except OperationalError:
+                # SQLite bez FTS5/trigram tokenizera: pretraga radi LIKE nad normaliziranim kolonama
+                pass
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0010_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='search_name',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='search_phone',
+            field=models.CharField(blank=True, editable=False, max_length=30),
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='search_plate',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=20),
+        ),
+        # AddField na SQLite-u pravi tabelu iznova i pri tome briše njene triggere (0009)
+        migrations.RunPython(_sqlite_triggers.reinstall, migrations.RunPython.noop),
+        migrations.RunPython(populate_search_fields, migrations.RunPython.noop),
+        migrations.RunPython(
+            run({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run({'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
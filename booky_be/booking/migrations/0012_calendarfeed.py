@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:52
+
+import booking.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0011_reservation_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarFeed',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('token', models.CharField(default=booking.models.new_feed_token, editable=False, max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='calendar_feeds', to='booking.location')),
+                ('resource', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='calendar_feeds', to='booking.resource')),
+            ],
+            options={
+                'constraints': [models.CheckConstraint(condition=models.Q(models.Q(('location__isnull', True), ('resource__isnull', False)), models.Q(('location__isnull', False), ('resource__isnull', True)), _connector='OR'), name='calendar_feed_resource_or_location')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0012_calendarfeed'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='resourceslotoccupancy',
+            name='occupancy_lookup_idx',
+        ),
+        migrations.AddIndex(
+            model_name='resourceslotoccupancy',
+            index=models.Index(fields=['resource', 'date', 'bucket'], name='occupancy_resource_date_idx'),
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:42
+
+import django.db.models.deletion
+from django.db import OperationalError, migrations, models, transaction
+
+from . import _sqlite_triggers
+
+# Arhiva ima svoj indeks za pretragu, isti kao booking_reservation (0011)
+TABLE = 'booking_archivedreservation'
+FTS_TABLE = _sqlite_triggers.fts_table(TABLE)
+FTS_COLUMNS = _sqlite_triggers.FTS_COLUMNS
+
+SQLITE_FORWARD = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        {FTS_COLUMNS}, content='{TABLE}', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    *_sqlite_triggers.fts_create(TABLE),
+]
+SQLITE_BACKWARD = [
+    *_sqlite_triggers.fts_drop(TABLE),
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+POSTGRES_FORWARD = [
+    f"CREATE INDEX archived_search_name_trgm ON {TABLE} USING gin (search_name gin_trgm_ops)",
+    f"CREATE INDEX archived_search_phone_trgm ON {TABLE} USING gin (search_phone gin_trgm_ops)",
+    f"CREATE INDEX archived_search_plate_trgm ON {TABLE} USING gin (search_plate gin_trgm_ops)",
+    f"CREATE INDEX archived_email_trgm ON {TABLE} USING gin ((UPPER(email::text)) gin_trgm_ops)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS archived_search_name_trgm",
+    "DROP INDEX IF EXISTS archived_search_phone_trgm",
+    "DROP INDEX IF EXISTS archived_search_plate_trgm",
+    "DROP INDEX IF EXISTS archived_email_trgm",
+]
+
+
+def run(statements_by_vendor):
+    def operation(apps, schema_editor):
+        statements = statements_by_vendor.get(schema_editor.connection.vendor, [])
+        if schema_editor.connection.vendor == 'sqlite' and statements is SQLITE_FORWARD:
+            try:
+                with transaction.atomic(using=schema_editor.connection.alias):
+                    for sql in statements:
+                        schema_editor.execute(sql)
+            except OperationalError:
+                # SQLite bez FTS5/trigram tokenizera: pretraga radi LIKE nad normaliziranim kolonama
+                pass
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0013_occupancy_resource_date_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('full_name', models.CharField(max_length=100)),
+                ('phone', models.CharField(max_length=30)),
+                ('email', models.EmailField(max_length=254)),
+                ('license_plate', models.CharField(blank=True, max_length=20)),
+                ('start_time', models.DateTimeField()),
+                ('end_time', models.DateTimeField()),
+                ('is_stored', models.BooleanField(default=False)),
+                ('is_approved', models.BooleanField(default=False)),
+                ('search_name', models.CharField(blank=True, editable=False, max_length=100)),
+                ('search_phone', models.CharField(blank=True, editable=False, max_length=30)),
+                ('search_plate', models.CharField(blank=True, db_index=True, editable=False, max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('resource', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='booking.resource')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='booking.servicetype')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['start_time'], name='archived_start_idx')],
+            },
+        ),
+        migrations.RunPython(
+            run({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run({'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
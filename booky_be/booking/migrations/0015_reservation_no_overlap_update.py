@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-18 21:05
+
+from django.db import migrations
+
+from . import _sqlite_triggers
+
+
+class Migration(migrations.Migration):
+    """SQLite: the UPDATE overlap trigger now fires only when the slot or resource changes."""
+
+    dependencies = [
+        ('booking', '0014_archivedreservation'),
+    ]
+
+    operations = [
+        migrations.RunPython(_sqlite_triggers.reinstall, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,12 @@
+import secrets
+
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils import timezone
 from django.conf import settings
 
+from .search import normalize_name, normalize_phone, normalize_plate
+
 # --- CUSTOM USER MANAGER --- #
 
 class CustomUserManager(BaseUserManager):
@@ -97,7 +101,8 @@ class BusinessHours(models.Model):
     def __str__(self):
         return f"{self.get_day_of_week_display()}: {self.open_time.strftime('%H:%M')} - {self.close_time.strftime('%H:%M')}"
 
-class Reservation(models.Model):
+class ReservationBase(models.Model):
+    """Columns shared by the live `Reservation` table and its `ArchivedReservation` copy."""
     full_name = models.CharField(max_length=100)
     phone = models.CharField(max_length=30)
     email = models.EmailField()
@@ -110,9 +115,84 @@ class Reservation(models.Model):
     is_approved = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Normalizirane kolone za pretragu (booking/search.py), pune se u save()
+    search_name = models.CharField(max_length=100, blank=True, editable=False)
+    search_phone = models.CharField(max_length=30, blank=True, editable=False)
+    search_plate = models.CharField(max_length=20, blank=True, editable=False, db_index=True)
+
+    class Meta:
+        abstract = True
+
     def __str__(self):
         return f"{self.full_name} - {self.service.name} on {self.start_time.strftime('%Y-%m-%d %H:%M')}"
 
+    SEARCH_SOURCE_FIELDS = {'full_name', 'phone', 'license_plate'}
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.fill_search_fields()
+        elif self.SEARCH_SOURCE_FIELDS & set(update_fields):
+            self.fill_search_fields()
+            kwargs['update_fields'] = set(update_fields) | {'search_name', 'search_phone', 'search_plate'}
+        super().save(*args, **kwargs)
+
+    def fill_search_fields(self):
+        """Recomputes the normalized search columns; call before bulk_create (it skips save())."""
+        # Normalizacija može produžiti tekst ('ß' -> 'ss', 'æ' -> 'ae'): kolona ne smije preći max_length
+        for field, value in (
+            ('search_name', normalize_name(self.full_name)),
+            ('search_phone', normalize_phone(self.phone)),
+            ('search_plate', normalize_plate(self.license_plate)),
+        ):
+            setattr(self, field, value[:self._meta.get_field(field).max_length])
+
+
+class Reservation(ReservationBase):
+    class Meta:
+        indexes = [
+            # Provjera preklapanja: resource = X AND start_time < end AND end_time > start
+            models.Index(fields=['resource', 'start_time', 'end_time'], name='reservation_overlap_idx'),
+            # Liste po periodu (today/3w/6w/all/past) filtriraju i sortiraju po start_time
+            models.Index(fields=['start_time'], name='reservation_start_idx'),
+            # Pending lista: mali parcijalni indeks samo s neodobrenim rezervacijama
+            models.Index(fields=['start_time'], condition=models.Q(is_approved=False), name='reservation_pending_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Zapamti termin iz baze, da signali kod izmjene mogu očistiti i stari datum/resurs
+        instance._loaded_slot = instance.current_slot()
+        return instance
+
+    def current_slot(self):
+        """(resource_id, start_time, end_time) or None if any of them is deferred/unset."""
+        slot = (
+            self.__dict__.get('resource_id'),
+            self.__dict__.get('start_time'),
+            self.__dict__.get('end_time'),
+        )
+        return None if None in slot else slot
+
+
+class ArchivedReservation(ReservationBase):
+    """
+    Cold copy of reservations that ended long ago, moved here with their
+    original id by `archive_reservations` (booking/archive.py). Only history
+    reads it (the 'past' list, search within it, export); availability,
+    occupancy and calendar feeds see the live table alone, which stays small.
+    """
+    # Kopira se iz Reservation; auto_now_add bi kod kopiranja upisao današnji datum
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # 'past' lista i export: start_time silazno / raspon
+            models.Index(fields=['start_time'], name='archived_start_idx'),
+        ]
+
+
 class Holiday(models.Model):
     name = models.CharField(max_length=100, help_text="e.g., New Year's Day")
     date = models.DateField(unique=True)
@@ -132,3 +212,115 @@ class Holiday(models.Model):
 
 
 
+
+class ResourceSlotOccupancy(models.Model):
+    """
+    Derived table: one row per 5-minute bucket a reservation occupies on its
+    resource. Kept in sync on write (booking.availability.occupancy) so the
+    availability endpoints read occupancy with one indexed lookup.
+    """
+    reservation = models.ForeignKey(Reservation, on_delete=models.CASCADE, related_name='occupancy')
+    resource = models.ForeignKey(Resource, on_delete=models.CASCADE, related_name='occupancy')
+    date = models.DateField()
+    bucket = models.PositiveSmallIntegerField(help_text="Index of the 5-minute bucket after local midnight")
+
+    class Meta:
+        indexes = [
+            # resource IN (...) kao jednakost, pa raspon datuma: bez statistike (ANALYZE)
+            # SQLite bi inače birao goli FK indeks na resource_id i čitao cijelu povijest
+            models.Index(fields=['resource', 'date', 'bucket'], name='occupancy_resource_date_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['reservation', 'date', 'bucket'], name='occupancy_unique_bucket'),
+        ]
+
+    def __str__(self):
+        return f"{self.resource_id} on {self.date} bucket {self.bucket}"
+
+
+class ResourceDayLock(models.Model):
+    """
+    One row per (resource, local date) that reservation creation locks with
+    SELECT ... FOR UPDATE (booking.allocation), so concurrent bookings only
+    serialize when they compete for the same bay on the same day.
+    """
+    resource = models.ForeignKey(Resource, on_delete=models.CASCADE, related_name='day_locks')
+    date = models.DateField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['resource', 'date'], name='resource_day_lock_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.resource_id} on {self.date}"
+
+
+class OutboundEmail(models.Model):
+    """
+    Transactional outbox: emails are written in the same transaction as the
+    change that causes them and sent later by `run_outbox` (booking.outbox).
+    """
+    PENDING = 'pending'
+    SENT = 'sent'
+    DEAD = 'dead'
+    STATUS_CHOICES = ((PENDING, 'Pending'), (SENT, 'Sent'), (DEAD, 'Dead'))
+
+    reservation = models.ForeignKey(Reservation, on_delete=models.SET_NULL, null=True, blank=True, related_name='emails')
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    content_subtype = models.CharField(max_length=20, default='plain')
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    attachments = models.JSONField(default=list, blank=True, help_text="[{filename, content, mimetype}], text content only")
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+
+def new_feed_token():
+    return secrets.token_urlsafe(32)
+
+
+class CalendarFeed(models.Model):
+    """
+    Subscribable iCalendar feed (/api/calendar/<token>.ics, booking.feeds) of
+    one resource or of every resource at one location. The token in the URL
+    is the only credential, since calendar apps cannot send auth headers.
+    """
+    name = models.CharField(max_length=100)
+    token = models.CharField(max_length=64, unique=True, default=new_feed_token, editable=False)
+    resource = models.ForeignKey(Resource, on_delete=models.CASCADE, null=True, blank=True, related_name='calendar_feeds')
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, null=True, blank=True, related_name='calendar_feeds')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=(
+                    models.Q(resource__isnull=False, location__isnull=True)
+                    | models.Q(resource__isnull=True, location__isnull=False)
+                ),
+                name='calendar_feed_resource_or_location',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.resource or self.location})"
+
+    def resource_ids(self):
+        if self.resource_id:
+            return [self.resource_id]
+        return list(Resource.objects.filter(location_id=self.location_id).order_by('id').values_list('id', flat=True))
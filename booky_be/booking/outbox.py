@@ -0,0 +1,135 @@
+# booking/outbox.py
+"""
+Transactional email outbox.
+
+`enqueue` stores messages as `OutboundEmail` rows inside the caller's
+transaction, so an email exists exactly when the reservation change that
+caused it was committed. `drain` (the `run_outbox` command) claims due rows
+in batches, sends each batch over one SMTP connection and reschedules
+failures with exponential backoff until they are dead-lettered.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .db import retry_on_lock
+from .models import OutboundEmail
+
+# Koliko dugo je preuzeti batch "rezerviran" za jednog workera; ako worker
+# padne usred slanja, poruke se nakon toga ponovno pokušavaju
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+def outbound_email(message, reservation=None):
+    """Unsaved `OutboundEmail` row for an `EmailMessage`."""
+    return OutboundEmail(
+        reservation=reservation,
+        subject=message.subject,
+        body=message.body,
+        content_subtype=message.content_subtype,
+        from_email=message.from_email,
+        to=list(message.to),
+        attachments=[
+            {'filename': filename, 'content': content, 'mimetype': mimetype}
+            for filename, content, mimetype in message.attachments
+        ],
+    )
+
+
+def enqueue(*messages, reservation=None):
+    """Stores `messages` in the outbox; call inside the transaction of the change."""
+    return OutboundEmail.objects.bulk_create([outbound_email(message, reservation) for message in messages])
+
+
+def to_message(row):
+    message = EmailMessage(subject=row.subject, body=row.body, from_email=row.from_email, to=row.to)
+    message.content_subtype = row.content_subtype
+    for attachment in row.attachments:
+        message.attach(attachment['filename'], attachment['content'], attachment['mimetype'])
+    return message
+
+
+def claim(batch_size, now):
+    """Reserves up to `batch_size` due rows for this worker and returns them."""
+    def take():
+        with transaction.atomic():
+            rows = list(
+                OutboundEmail.objects.select_for_update(skip_locked=True)
+                .filter(status=OutboundEmail.PENDING, next_attempt_at__lte=now)
+                .order_by('next_attempt_at', 'id')[:batch_size]
+            )
+            if rows:
+                OutboundEmail.objects.filter(pk__in=[row.pk for row in rows]).update(next_attempt_at=now + CLAIM_LEASE)
+        return rows
+
+    return retry_on_lock(take)
+
+
+def retry_delay(attempts, base_delay=None):
+    """Backoff after the `attempts`-th failed attempt: base, 2*base, 4*base, ..."""
+    base_delay = settings.BOOKY_OUTBOX_RETRY_DELAY if base_delay is None else base_delay
+    return timedelta(seconds=base_delay * 2 ** (attempts - 1))
+
+
+def _failed(row, error, now, max_attempts):
+    row.attempts += 1
+    row.last_error = f"{type(error).__name__}: {error}"
+    if row.attempts >= max_attempts:
+        row.status = OutboundEmail.DEAD
+    else:
+        row.next_attempt_at = now + retry_delay(row.attempts)
+
+
+def send_batch(rows, now=None, max_attempts=None):
+    """
+    Sends `rows` over one connection and records the outcome of every row.
+    Returns `{'sent', 'retried', 'dead'}` counts.
+    """
+    now = now or timezone.now()
+    max_attempts = max_attempts or settings.BOOKY_OUTBOX_MAX_ATTEMPTS
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        # Nema konekcije: cijeli batch ide na ponovni pokušaj
+        for row in rows:
+            _failed(row, error, now, max_attempts)
+    else:
+        try:
+            for row in rows:
+                try:
+                    if not connection.send_messages([to_message(row)]):
+                        raise RuntimeError("backend reported the message as not sent")
+                except Exception as error:
+                    _failed(row, error, now, max_attempts)
+                else:
+                    row.status = OutboundEmail.SENT
+                    row.attempts += 1
+                    row.sent_at = now
+                    row.last_error = ''
+        finally:
+            connection.close()
+
+    # Poruke su već poslane: zaključana baza ne smije izgubiti ishod (ponovno slanje nakon CLAIM_LEASE)
+    retry_on_lock(lambda: OutboundEmail.objects.bulk_update(
+        rows, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'],
+    ))
+    stats = {'sent': 0, 'retried': 0, 'dead': 0}
+    for row in rows:
+        stats[{OutboundEmail.SENT: 'sent', OutboundEmail.DEAD: 'dead'}.get(row.status, 'retried')] += 1
+    return stats
+
+
+def drain(batch_size=50, max_attempts=None):
+    """Sends everything that is due right now, batch by batch. Returns summed stats."""
+    totals = {'sent': 0, 'retried': 0, 'dead': 0}
+    while True:
+        now = timezone.now()
+        rows = claim(batch_size, now)
+        if not rows:
+            return totals
+        for key, value in send_batch(rows, now, max_attempts).items():
+            totals[key] += value
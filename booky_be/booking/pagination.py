@@ -0,0 +1,95 @@
+# booking/pagination.py
+"""
+Keyset (cursor) pagination on `(start_time, id)`.
+
+Opt-in: without `page_size`/`cursor` query params the list stays a plain
+array, so existing clients keep working. With them the response becomes
+`{"next": <url or null>, "results": [...]}` and every page continues
+strictly after the last row of the previous one, so rows inserted or deleted
+meanwhile never shift a page (unlike offset pagination).
+"""
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 200
+    invalid_cursor_message = 'Invalid cursor'
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def encode_cursor(self, row):
+        # Redovi su instance ili dictovi iz .values() (booking/listing.py)
+        start_time, pk = (row['start_time'], row['id']) if isinstance(row, dict) else (row.start_time, row.pk)
+        raw = f"{start_time.isoformat()}|{pk}".encode()
+        return base64.urlsafe_b64encode(raw).decode()
+
+    def decode_cursor(self, value):
+        try:
+            start_time, pk = base64.urlsafe_b64decode(value.encode()).decode().split('|')
+            start_time, pk = parse_datetime(start_time), int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if start_time is None:
+            raise NotFound(self.invalid_cursor_message)
+        return start_time, pk
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        descending = queryset.query.order_by[:1] == ('-start_time',)
+        page_size = self.get_page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            start_time, pk = self.decode_cursor(cursor)
+            if descending:
+                after = Q(start_time__lt=start_time) | Q(start_time=start_time, pk__lt=pk)
+            else:
+                after = Q(start_time__gt=start_time) | Q(start_time=start_time, pk__gt=pk)
+            queryset = queryset.filter(after)
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
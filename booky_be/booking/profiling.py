@@ -0,0 +1,200 @@
+# booking/profiling.py
+"""
+On-demand profiling of single requests for staff.
+
+A request with an `X-Booky-Profile` header from a staff user (JWT or admin
+session) runs under cProfile with every SQL statement captured. The response
+then carries a one-line summary in the `X-Booky-Profile` header (report id,
+total time, SQL count/time, duplicate queries) plus `Server-Timing`, and the
+full report is stored as JSON in BOOKY_PROFILE_DIR for
+/api/debug/profiles/<id>/ (files, so any gunicorn worker can serve it; the
+newest BOOKY_PROFILE_KEEP are kept).
+
+Without the header the middleware does a single dict lookup. Anonymous and
+non-staff requests with the header are served normally, unprofiled.
+"""
+import cProfile
+import json
+import os
+import pstats
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+REQUEST_HEADER = 'HTTP_X_BOOKY_PROFILE'
+RESPONSE_HEADER = 'X-Booky-Profile'
+PARAMS_MAX_LENGTH = 500
+
+
+def staff_user(request):
+    """The staff user behind the request (admin session or JWT), else None."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            user, _ = JWTAuthentication().authenticate(request) or (None, None)
+        except AuthenticationFailed:
+            return None
+    return user if user is not None and user.is_active and user.is_staff else None
+
+
+class _SqlCapture:
+    """`connection.execute_wrapper` that records every statement with its duration."""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.statements.append({
+                'sql': sql,
+                'params': repr(params)[:PARAMS_MAX_LENGTH],
+                'many': many,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+            })
+
+
+def duplicate_queries(statements):
+    """
+    (duplicates, similar): identical statements (same SQL and parameters) run
+    more than once, and the same SQL run more than once with different
+    parameters (typical N+1), each sorted by total time.
+    """
+    identical, by_sql = defaultdict(list), defaultdict(list)
+    for statement in statements:
+        identical[statement['sql'], statement['params']].append(statement['duration_ms'])
+        by_sql[statement['sql']].append(statement['params'])
+
+    duplicates = [
+        {'sql': sql, 'params': params, 'count': len(durations), 'total_ms': round(sum(durations), 3)}
+        for (sql, params), durations in identical.items() if len(durations) > 1
+    ]
+    similar = [
+        {
+            'sql': sql, 'count': len(params),
+            'total_ms': round(sum(s['duration_ms'] for s in statements if s['sql'] == sql), 3),
+        }
+        for sql, params in by_sql.items() if len(set(params)) > 1
+    ]
+    return (
+        sorted(duplicates, key=lambda item: -item['total_ms']),
+        sorted(similar, key=lambda item: -item['total_ms']),
+    )
+
+
+def top_functions(profiler, limit):
+    """The `limit` functions with the highest cumulative time."""
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, name), (primitive, calls, total, cumulative, _) in stats.stats.items():
+        rows.append({
+            'function': f'{filename}:{line}({name})',
+            'calls': calls,
+            'primitive_calls': primitive,
+            'total_ms': round(total * 1000, 3),
+            'cumulative_ms': round(cumulative * 1000, 3),
+        })
+    rows.sort(key=lambda row: (-row['cumulative_ms'], -row['total_ms']))
+    return rows[:limit]
+
+
+# --- SPREMANJE IZVJEŠTAJA --- #
+
+def _path(profile_id):
+    return os.path.join(settings.BOOKY_PROFILE_DIR, f'{profile_id}.json')
+
+
+def save(report):
+    """Stores the report (atomically); False if the directory is not writable."""
+    path = _path(report['id'])
+    try:
+        os.makedirs(settings.BOOKY_PROFILE_DIR, exist_ok=True)
+        with open(path + '.tmp', 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, default=str)
+        os.replace(path + '.tmp', path)
+    except OSError:
+        return False
+
+    # Samo najnoviji izvještaji
+    reports = sorted(
+        (entry for entry in os.scandir(settings.BOOKY_PROFILE_DIR) if entry.name.endswith('.json')),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in reports[settings.BOOKY_PROFILE_KEEP:]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+    return True
+
+
+def load(profile_id):
+    """The stored report, or None."""
+    try:
+        with open(_path(profile_id), encoding='utf-8') as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+# --- MIDDLEWARE --- #
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if REQUEST_HEADER not in request.META:
+            return self.get_response(request)
+        user = staff_user(request)
+        if user is None:
+            return self.get_response(request)
+
+        profiler, capture = cProfile.Profile(), _SqlCapture()
+        started = time.perf_counter()
+        with connection.execute_wrapper(capture):
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        total_ms = (time.perf_counter() - started) * 1000
+
+        statements = capture.statements
+        sql_ms = sum(statement['duration_ms'] for statement in statements)
+        duplicates, similar = duplicate_queries(statements)
+        repeated = sum(item['count'] - 1 for item in duplicates)
+        report = {
+            'id': str(uuid.uuid4()),
+            'created': timezone.now(),
+            'user': user.get_username(),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'total_ms': round(total_ms, 3),
+            'sql': {
+                'count': len(statements),
+                'total_ms': round(sql_ms, 3),
+                'duplicates': duplicates,
+                'similar': similar,
+                'statements': statements,
+            },
+            'functions': top_functions(profiler, settings.BOOKY_PROFILE_TOP_FUNCTIONS),
+        }
+        url = reverse('booking:profile-detail', args=[report['id']]) if save(report) else '-'
+        response[RESPONSE_HEADER] = (
+            f"id={report['id']}; url={url}; total={total_ms:.1f}ms; "
+            f"sql={len(statements)}; sql_time={sql_ms:.1f}ms; duplicates={repeated}"
+        )
+        response['Server-Timing'] = f'total;dur={total_ms:.1f}, db;dur={sql_ms:.1f}'
+        return response
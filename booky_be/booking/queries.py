@@ -0,0 +1,58 @@
+# booking/queries.py
+"""
+Hot reservation queries, written as sargable range predicates so they can use
+the indexes declared on `Reservation.Meta`. The `explain_hot_queries`
+command checks their plans.
+"""
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+from .models import Reservation
+
+
+def local_midnight(day):
+    """Aware datetime of 00:00 local time on `day`."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def filter_by_period(queryset, period, today=None, limit_past=True):
+    """
+    Applies the `period` filter of the reservation list ('3w', '6w', 'all',
+    'today', 'past', 'pending') and its `(start_time, id)` ordering. 'past'
+    is cut to the newest 20 rows unless `limit_past` is False (paginated list).
+
+    `start_time__date` would wrap the column in a date conversion and defeat
+    the index, so days are turned into `[local midnight, next local midnight)`
+    ranges instead.
+    """
+    today = today or timezone.localdate()
+    day_start = local_midnight(today)
+
+    if period == 'pending':
+        queryset = queryset.filter(is_approved=False)
+    elif period == 'past':
+        queryset = queryset.filter(start_time__lt=day_start)
+    else:  # '3w', 'all', 'today' i default
+        queryset = queryset.filter(start_time__gte=day_start)
+        if period == '3w':
+            queryset = queryset.filter(start_time__lt=local_midnight(today + timedelta(weeks=3, days=1)))
+        elif period == '6w':
+            queryset = queryset.filter(start_time__lt=local_midnight(today + timedelta(weeks=6, days=1)))
+        elif period == 'today':
+            queryset = queryset.filter(start_time__lt=local_midnight(today + timedelta(days=1)))
+
+    if period == 'past':
+        queryset = queryset.order_by('-start_time', '-id')  # Prošle sortiramo od najnovijih
+        # filter only last 20 past reservations
+        return queryset[:20] if limit_past else queryset
+    return queryset.order_by('start_time', 'id')  # Buduće sortiramo od najranijih
+
+
+def overlapping_reservations(resource_ids, start_time, end_time):
+    """Reservations on any of `resource_ids` that overlap `[start_time, end_time)`."""
+    return Reservation.objects.filter(
+        resource__in=resource_ids,
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    )
@@ -0,0 +1,111 @@
+# booking/renderers.py
+"""
+Renderers for the reservation list and export endpoints.
+"""
+import csv
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # opcionalno; bez njega se koristi C enkoder iz stdlib json
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in JSONRenderer producing identical bytes for compact output.
+
+    Uses orjson when installed, otherwise a single reused stdlib encoder (C
+    accelerated) instead of building a new one per response. Indented output
+    (`Accept: application/json; indent=4`, browsable API) goes through DRF.
+    """
+
+    def __init__(self):
+        self._encoder = encoders.JSONEncoder(
+            ensure_ascii=self.ensure_ascii,
+            allow_nan=not self.strict,
+            separators=(',', ':') if self.compact else (', ', ': '),
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if orjson is not None and self.compact and not self.ensure_ascii:
+            ret = orjson.dumps(data, default=self._encoder.default)
+            return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+        ret = self._encoder.encode(data)
+        return ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+class _Echo:
+    """File-like object whose write() returns the line (csv.writer without a buffer)."""
+
+    def write(self, value):
+        return value
+
+
+class StreamingRenderer(BaseRenderer):
+    """
+    Renderer for the export endpoint. `stream(rows, fields)` yields encoded chunks of
+    `rows_per_chunk` rows for StreamingHttpResponse; `render()` only covers
+    small payloads such as error responses.
+    """
+    charset = 'utf-8'
+    rows_per_chunk = 500
+
+    def stream(self, rows, fields):
+        header = self.header(fields)
+        if header:
+            yield header.encode()
+        chunk = []
+        for row in rows:
+            chunk.append(self.line(row, fields))
+            if len(chunk) == self.rows_per_chunk:
+                yield ''.join(chunk).encode()
+                chunk = []
+        if chunk:
+            yield ''.join(chunk).encode()
+
+    def header(self, fields):
+        return ''
+
+    def line(self, row, fields):
+        raise NotImplementedError
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        fields = list(rows[0]) if rows and isinstance(rows[0], dict) else []
+        return b''.join(self.stream(rows, fields))
+
+
+class CSVRenderer(StreamingRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def __init__(self):
+        self._writer = csv.writer(_Echo())
+
+    def header(self, fields):
+        return self._writer.writerow(fields)
+
+    def line(self, row, fields):
+        return self._writer.writerow([row[field] for field in fields])
+
+
+class NDJSONRenderer(StreamingRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def __init__(self):
+        self._encoder = encoders.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+    def line(self, row, fields):
+        return self._encoder.encode(row) + '\n'
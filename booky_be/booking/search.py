@@ -0,0 +1,116 @@
+# booking/search.py
+"""
+Reservation search over normalized columns.
+
+`Reservation.save()` keeps three search columns in sync:
+- search_name:  full name ASCII-folded and lowercased ("Miloš Stanković" -> "milos stankovic")
+- search_phone: phone digits only ("+41 76 123 45 67" -> "41761234567")
+- search_plate: plate uppercased without spaces/dashes/dots ("zh-123 45" -> "ZH12345")
+
+Substring matching is served by an index on every backend:
+- SQLite: FTS5 virtual table `<table>_search` (trigram tokenizer, external
+  content, kept in sync by triggers; `booking_reservation_search` from
+  migration 0011, `booking_archivedreservation_search` from 0014)
+- PostgreSQL: pg_trgm GIN indexes on the search columns and UPPER(email)
+Plate prefixes ("ZH12" -> ZH12...) additionally use the btree index on
+search_plate via a range predicate.
+
+Trigram indexes need at least 3 characters; shorter terms fall back to
+LIKE on the normalized columns.
+"""
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+TRIGRAM = 3
+
+# Slova koja NFKD ne rastavlja na osnovno slovo + dijakritik
+_FOLD = str.maketrans({'đ': 'dj', 'Đ': 'Dj', 'ß': 'ss', 'ø': 'o', 'Ø': 'O', 'ł': 'l', 'Ł': 'L', 'æ': 'ae', 'Æ': 'Ae', 'œ': 'oe', 'Œ': 'Oe'})
+_PLATE_JUNK = re.compile(r'[\s\-.]+')
+# Upit se traži u telefonima samo ako izgleda kao broj ("076 123", "+41-76"), ne "GE 4"
+_PHONE_QUERY = re.compile(r'^[\d\s+\-/().]+$')
+
+
+def normalize_name(value):
+    decomposed = unicodedata.normalize('NFKD', (value or '').translate(_FOLD))
+    folded = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(folded.lower().split())
+
+
+def normalize_phone(value):
+    return ''.join(char for char in (value or '') if char.isdigit())
+
+
+def normalize_plate(value):
+    return _PLATE_JUNK.sub('', value or '').upper()
+
+
+def prefix_range(prefix):
+    """(lower, upper) bounds such that lower <= value < upper <=> value.startswith(prefix)."""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+_fts_available = {}
+
+
+def fts_table(model):
+    return f'{model._meta.db_table}_search'
+
+
+def fts_available(table):
+    """True if the SQLite FTS5 table exists (migrations 0011/0014 skip it when FTS5/trigram is missing)."""
+    key = (connection.settings_dict['NAME'], table)
+    if key not in _fts_available:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [table])
+            _fts_available[key] = cursor.fetchone() is not None
+    return _fts_available[key]
+
+
+def _fts_phrase(column, term):
+    return f'{column} : "{term.replace(chr(34), chr(34) * 2)}"'
+
+
+def search_terms(query):
+    """Normalized forms of `query` for each search column (empty when not applicable)."""
+    return {
+        'search_name': normalize_name(query),
+        'email': query.strip().lower(),
+        'search_phone': normalize_phone(query) if _PHONE_QUERY.match(query.strip()) else '',
+        'search_plate': normalize_plate(query),
+    }
+
+
+def search_reservations(queryset, query):
+    """
+    Filters `queryset` (Reservation or ArchivedReservation) to reservations
+    whose name, email, phone or plate contains `query`.
+    """
+    terms = {column: term for column, term in search_terms(query).items() if term}
+    if not terms:
+        return queryset
+
+    condition = Q()
+    plate = terms.get('search_plate')
+    if plate:
+        lower, upper = prefix_range(plate)
+        condition |= Q(search_plate__gte=lower, search_plate__lt=upper)
+
+    indexed = {column: term for column, term in terms.items() if len(term) >= TRIGRAM}
+    short = {column: term for column, term in terms.items() if len(term) < TRIGRAM}
+
+    table = fts_table(queryset.model)
+    if indexed and connection.vendor == 'sqlite' and fts_available(table):
+        match = ' OR '.join(_fts_phrase(column, term) for column, term in indexed.items())
+        condition |= Q(id__in=RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [match]))
+    else:
+        short.update(indexed)
+
+    for column, term in short.items():
+        lookup = 'email__icontains' if column == 'email' else f'{column}__contains'
+        condition |= Q(**{lookup: term})
+
+    return queryset.filter(condition)
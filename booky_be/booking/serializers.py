@@ -114,4 +114,30 @@ class ReservationListSerializer(serializers.ModelSerializer):
 class DisabledDatesSerializer(serializers.Serializer):
     start_date = serializers.DateField()
     end_date = serializers.DateField()
-    disabled_dates = serializers.ListField(child=serializers.DateField())
\ No newline at end of file
+    disabled_dates = serializers.ListField(child=serializers.DateField())
+    # Samo uz ?service=: dani bez slobodnog termina (već uključeni u disabled_dates)
+    fully_booked_dates = serializers.ListField(child=serializers.DateField(), required=False)
+
+
+class CompactDisabledDatesSerializer(serializers.Serializer):
+    """?compact=1: closed weekdays as a mask (bit 0 = Monday), holidays (and fully booked days) as [from, to] periods."""
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    weekday_mask = serializers.IntegerField()
+    closed_weekdays = serializers.ListField(child=serializers.IntegerField())
+    periods = serializers.ListField(child=serializers.ListField(child=serializers.DateField()))
+    fully_booked_dates = serializers.ListField(child=serializers.DateField(), required=False)
+
+
+class ReservationBulkActionSerializer(serializers.Serializer):
+    """Input for POST /reservations/bulk/: ids and what to do with them."""
+    APPROVE = 'approve'
+    DECLINE = 'decline'
+    MAX_IDS = 500
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_IDS,
+    )
+    action = serializers.ChoiceField(choices=[APPROVE, DECLINE])
@@ -0,0 +1,156 @@
+# booking/signals.py
+"""
+Signal handlers that keep derived data in sync with the booking tables.
+Connected in BookingConfig.ready().
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .availability import cache as availability_cache
+from .availability import occupancy
+from .availability.window import iter_days
+from . import config_version, feeds
+from .listing import invalidate_catalog
+from .models import BusinessHours, Holiday, Location, Reservation, Resource, ServiceType
+
+
+def services_of_resources(resource_ids):
+    return list(
+        ServiceType.objects.filter(resources__in=resource_ids)
+                           .values_list('id', flat=True)
+                           .distinct()
+    )
+
+
+def slot_dates(start_time, end_time):
+    tz = timezone.get_current_timezone()
+    return iter_days(start_time.astimezone(tz).date(), end_time.astimezone(tz).date())
+
+
+# --- RESERVATIONS: OCCUPANCY TABLE + AVAILABILITY CACHE --- #
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def reservation_changed(sender, instance, created=False, **kwargs):
+    current = instance.current_slot()
+    loaded = getattr(instance, '_loaded_slot', None)
+
+    # Kalendarski feedovi: i promjena bez novog termina (npr. odobravanje) mijenja VEVENT
+    resource_ids = {slot[0] for slot in (current, loaded) if slot}
+    if resource_ids:
+        feeds.touch(resource_ids)
+    else:
+        feeds.touch_all()
+
+    saved = kwargs['signal'] is post_save
+    if saved and not created and current == loaded:
+        return  # npr. odobravanje: termin i resurs se nisu promijenili
+
+    # Brisanje čisti ResourceSlotOccupancy preko CASCADE; ovdje samo save
+    if saved:
+        occupancy.sync_reservation(instance)
+
+    # Cache: samo (servis, datum) parovi koje diraju stari i novi termin
+    slots = {current, loaded} - {None}
+    if slots:
+        dates = [day for _, start_time, end_time in slots for day in slot_dates(start_time, end_time)]
+        availability_cache.invalidate_dates(
+            services_of_resources({resource_id for resource_id, _, _ in slots}),
+            dates,
+        )
+    instance._loaded_slot = current
+
+
+# --- AVAILABILITY CACHE: CONFIGURATION --- #
+
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+def invalidate_holiday_availability(sender, instance, created=False, **kwargs):
+    if kwargs['signal'] is post_save and not created:
+        # Praznik je možda premješten na drugi datum, a stari ne znamo
+        availability_cache.invalidate_all()
+        return
+    availability_cache.invalidate_dates(ServiceType.objects.values_list('id', flat=True), [instance.date])
+
+
+@receiver(post_save, sender=BusinessHours)
+@receiver(post_delete, sender=BusinessHours)
+def invalidate_business_hours_availability(sender, instance, **kwargs):
+    availability_cache.invalidate_all()
+
+
+@receiver(post_save, sender=Resource)
+@receiver(pre_delete, sender=Resource)
+def invalidate_resource_availability(sender, instance, **kwargs):
+    # pre_delete: M2M veze još postoje, pa znamo koje servise treba očistiti
+    availability_cache.invalidate_services(services_of_resources([instance.pk]))
+
+
+@receiver(post_save, sender=ServiceType)
+def invalidate_service_availability(sender, instance, created, **kwargs):
+    if not created:
+        availability_cache.invalidate_services([instance.pk])
+
+
+@receiver(m2m_changed, sender=ServiceType.resources.through)
+def invalidate_service_resources_availability(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        availability_cache.invalidate_services([instance.pk])
+    elif pk_set:
+        availability_cache.invalidate_services(pk_set)
+    else:
+        # resource.services.clear(): ne znamo više koji su servisi bili vezani
+        availability_cache.invalidate_all()
+
+
+# --- RESERVATION LISTS: SERIALIZED SERVICES / RESOURCES --- #
+
+@receiver(post_save, sender=ServiceType)
+@receiver(post_delete, sender=ServiceType)
+@receiver(post_save, sender=Resource)
+@receiver(post_delete, sender=Resource)
+def invalidate_listing_catalog(sender, **kwargs):
+    invalidate_catalog()
+
+
+@receiver(m2m_changed, sender=ServiceType.resources.through)
+def invalidate_listing_catalog_resources(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_catalog()
+
+
+# --- CALENDAR FEEDS: NAMES IN SUMMARY / LOCATION --- #
+
+@receiver(post_save, sender=ServiceType)
+@receiver(post_delete, sender=ServiceType)
+@receiver(post_save, sender=Resource)
+@receiver(post_delete, sender=Resource)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def touch_calendar_feeds(sender, **kwargs):
+    feeds.touch_all()
+
+
+# --- PUBLIC REFERENCE ENDPOINTS: CONFIG VERSION (ETag) --- #
+
+@receiver(post_save, sender=ServiceType)
+@receiver(post_delete, sender=ServiceType)
+@receiver(post_save, sender=Resource)
+@receiver(post_delete, sender=Resource)
+@receiver(post_save, sender=BusinessHours)
+@receiver(post_delete, sender=BusinessHours)
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def bump_config_version(sender, **kwargs):
+    config_version.bump()
+
+
+@receiver(m2m_changed, sender=ServiceType.resources.through)
+def bump_config_version_resources(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        config_version.bump()
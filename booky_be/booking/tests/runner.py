@@ -0,0 +1,38 @@
+import shutil
+import tempfile
+
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+from booking import metrics
+
+
+class TestRunner(DiscoverRunner):
+    """
+    DiscoverRunner that gives the test run its own BOOKY_METRICS_DIR and
+    BOOKY_PROFILE_DIR, so requests made by tests (and the atexit flush) never
+    end up in the directories /api/metrics/ and /api/debug/profiles/ read.
+
+    Tests tagged 'slow' are skipped unless asked for with `--tag slow`.
+    """
+
+    def __init__(self, *args, tags=None, exclude_tags=None, **kwargs):
+        if 'slow' not in (tags or ()):
+            exclude_tags = [*(exclude_tags or ()), 'slow']
+        super().__init__(*args, tags=tags, exclude_tags=exclude_tags, **kwargs)
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.scratch_dir = tempfile.mkdtemp(prefix='booky-tests-')
+        self.scratch_settings = override_settings(
+            BOOKY_METRICS_DIR=f'{self.scratch_dir}/metrics',
+            BOOKY_PROFILE_DIR=f'{self.scratch_dir}/profiles',
+        )
+        self.scratch_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        # Bez vrijednosti atexit flush ne piše ništa, ni nakon vraćanja postavki
+        metrics.reset()
+        self.scratch_settings.disable()
+        shutil.rmtree(self.scratch_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
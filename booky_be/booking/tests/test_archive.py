@@ -0,0 +1,157 @@
+import json
+from datetime import datetime, time, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from booking import archive
+from booking.models import ArchivedReservation, OutboundEmail, Reservation, Resource, ResourceSlotOccupancy, ServiceType
+from booking.search import search_reservations
+from booking.tests.utils import LOCAL_CACHES
+
+User = get_user_model()
+
+
+class ArchiveMixin:
+    def setUp(self):
+        self.service = ServiceType.objects.create(name='Wash', duration_minutes=30)
+        self.resource = Resource.objects.create(name='Lift 1')
+        self.service.resources.add(self.resource)
+        self.today = timezone.localdate()
+
+    def create(self, days_ago, name, plate='ZH 1'):
+        start = timezone.make_aware(datetime.combine(self.today - timedelta(days=days_ago), time(9, 0)))
+        return Reservation.objects.create(
+            full_name=name, phone='000', email=f'{name.lower().replace(" ", ".")}@example.com', license_plate=plate,
+            service=self.service, resource=self.resource, start_time=start, end_time=start + timedelta(minutes=30),
+        )
+
+    def archive(self, **options):
+        call_command('archive_reservations', stdout=StringIO(), **options)
+
+
+class ArchiveReservationsCommandTests(ArchiveMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.old = [self.create(days_ago, f'Old {days_ago}') for days_ago in (400, 500, 600)]
+        self.recent = self.create(10, 'Recent')
+        self.future = self.create(-3, 'Future')
+
+    def test_moves_old_rows_with_their_ids(self):
+        OutboundEmail.objects.create(reservation=self.old[0], subject='Hi', body='', from_email='a@b.c', to=['x@y.z'])
+        self.archive(older_than=365, batch_size=2)
+
+        self.assertEqual(set(Reservation.objects.values_list('id', flat=True)), {self.recent.id, self.future.id})
+        archived = ArchivedReservation.objects.order_by('id')
+        self.assertEqual([row.id for row in archived], [row.id for row in self.old])
+        original = self.old[0]
+        copy = archived[0]
+        for field in archive.copy_fields():
+            self.assertEqual(getattr(copy, field), getattr(original, field), field)
+
+        # Izvedeni podaci žive tabele ne drže arhivirane redove
+        self.assertFalse(ResourceSlotOccupancy.objects.filter(reservation_id__in=[row.id for row in self.old]).exists())
+        self.assertIsNone(OutboundEmail.objects.get().reservation_id)
+
+        # Pretraga radi nad arhivom (FTS indeks arhive)
+        self.assertEqual(
+            list(search_reservations(ArchivedReservation.objects.all(), 'old 5').values_list('id', flat=True)),
+            [self.old[1].id],
+        )
+        self.assertFalse(search_reservations(Reservation.objects.all(), 'old 5').exists())
+
+    def test_rerun_continues_and_is_idempotent(self):
+        self.archive(older_than=550)
+        self.assertEqual(ArchivedReservation.objects.count(), 1)
+        self.archive(older_than=365)
+        self.archive(older_than=365)
+        self.assertEqual(ArchivedReservation.objects.count(), 3)
+        self.assertEqual(Reservation.objects.count(), 2)
+
+    def test_failed_batch_moves_nothing(self):
+        with mock.patch.object(OutboundEmail.objects, 'filter', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                self.archive(older_than=365)
+        self.assertEqual(Reservation.objects.count(), 5)
+        self.assertFalse(ArchivedReservation.objects.exists())
+
+    def test_dry_run_and_limits(self):
+        out = StringIO()
+        call_command('archive_reservations', older_than=365, dry_run=True, stdout=out)
+        self.assertIn('3 reservation(s)', out.getvalue())
+        self.assertFalse(ArchivedReservation.objects.exists())
+
+        # Feedovi čitaju samo živu tabelu, pa nikad unutar njihovog prozora
+        with self.assertRaises(CommandError):
+            self.archive(older_than=5)
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class ArchiveReadTests(ArchiveMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(User.objects.create_user(email='staff@example.com', password='pass', is_staff=True))
+        self.url = reverse('booking:reservation-list-create')
+        for days_ago in range(1, 31):
+            self.create(days_ago * 20, f'Customer {days_ago}', plate=f'ZH {days_ago}')
+        self.create(-1, 'Tomorrow')
+        self.archive(older_than=300)
+        self.assertEqual(ArchivedReservation.objects.count(), 15)  # 16 do 30
+
+    def expected_past(self):
+        return [f'Customer {days_ago}' for days_ago in range(1, 31)]
+
+    def names(self, params):
+        return [row['full_name'] for row in self.client.get(self.url, params).data]
+
+    def test_past_list_reads_both_tables(self):
+        self.names({'period': 'past'})  # catalog (servisi/resursi) je tada u cacheu
+        with self.assertNumQueries(2):  # živa tabela + arhiva, svaka s LIMIT 20
+            names = self.names({'period': 'past'})
+        self.assertEqual(names, self.expected_past()[:20])
+        self.assertEqual(self.names({'period': 'all'}), ['Tomorrow'])
+
+    def test_past_pages_cross_into_the_archive(self):
+        names, response = [], self.client.get(self.url, {'period': 'past', 'page_size': 7})
+        while True:
+            names += [row['full_name'] for row in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(names, self.expected_past())
+
+    def test_search_in_past_finds_archived_rows(self):
+        self.assertEqual(self.names({'period': 'past', 'search': 'ZH 25'}), ['Customer 25'])
+        self.assertEqual(self.names({'period': 'past', 'search': 'customer 3'}), ['Customer 3', 'Customer 30'])
+        self.assertEqual(self.names({'search': 'customer 25'}), [])  # 3w: samo buduće
+
+    def test_export_of_past_includes_archive(self):
+        response = self.client.get(reverse('booking:reservation-export'), {'format': 'ndjson', 'period': 'past'})
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual([json.loads(line)['full_name'] for line in content.splitlines()], self.expected_past())
+
+    def test_archived_rows_from_the_past_list_can_be_viewed_and_deleted(self):
+        # Dashboard zove reservations/<id>/ za svaki red iz liste, i za arhivirane
+        archived = ArchivedReservation.objects.get(full_name='Customer 25')
+        url = reverse('booking:reservation-detail', args=[archived.pk])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['full_name'], 'Customer 25')
+
+        response = self.client.patch(url, {'is_approved': True}, format='json')
+        self.assertEqual(response.status_code, 400)
+        archived.refresh_from_db()
+        self.assertFalse(archived.is_approved)
+
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertFalse(ArchivedReservation.objects.filter(pk=archived.pk).exists())
+        self.assertEqual(self.names({'period': 'past', 'search': 'customer 25'}), [])
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -0,0 +1,132 @@
+from datetime import datetime, time, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from booking import metrics
+from booking.models import BusinessHours, Holiday, Reservation, Resource, ServiceType
+from booking.tests.utils import LOCAL_CACHES
+
+User = get_user_model()
+
+
+class AvailabilityCacheMixin:
+    def setUp(self):
+        cache.clear()
+        self.service = ServiceType.objects.create(name='Test Service', duration_minutes=30)
+        self.resource1 = Resource.objects.create(name='Lift 1')
+        self.resource2 = Resource.objects.create(name='Lift 2')
+        self.service.resources.add(self.resource1, self.resource2)
+
+        self.test_date = timezone.localdate() + timedelta(days=1)
+        self.other_date = self.test_date + timedelta(days=7)  # isti dan u tjednu
+        BusinessHours.objects.create(day_of_week=self.test_date.weekday(), open_time=time(9, 0), close_time=time(12, 0))
+        self.url = reverse('booking:availability')
+
+    def get_slots(self, day):
+        return self.client.get(self.url, {'service': self.service.id, 'date': day.isoformat()})
+
+    def book(self, day, hour, resource):
+        start_time = datetime.combine(day, time(hour, 0), tzinfo=timezone.get_current_timezone())
+        # Invalidacija ide tek nakon commita
+        with self.captureOnCommitCallbacks(execute=True):
+            return Reservation.objects.create(
+                service=self.service, resource=resource, full_name='Cache User',
+                start_time=start_time, end_time=start_time + timedelta(minutes=30),
+            )
+
+    def slot(self, response, label):
+        return next(s for s in response.data if s['time'] == label)
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class AvailabilityCacheTests(AvailabilityCacheMixin, APITestCase):
+    def test_second_request_is_served_from_cache_without_queries(self):
+        first = self.get_slots(self.test_date)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.get_slots(self.test_date)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.data, second.data)
+
+    def test_reservation_invalidates_only_its_date(self):
+        self.get_slots(self.test_date)
+        self.get_slots(self.other_date)
+
+        self.book(self.test_date, 10, self.resource1)
+
+        fresh = self.get_slots(self.test_date)
+        self.assertEqual(fresh['X-Cache'], 'MISS')
+        self.assertEqual(self.slot(fresh, '10:00')['available_count'], 1)
+        self.assertEqual(self.get_slots(self.other_date)['X-Cache'], 'HIT')
+
+    def test_moving_a_reservation_invalidates_old_and_new_date(self):
+        reservation = self.book(self.test_date, 10, self.resource1)
+        reservation = Reservation.objects.get(pk=reservation.pk)
+        self.get_slots(self.test_date)
+        self.get_slots(self.other_date)
+
+        reservation.start_time = datetime.combine(self.other_date, time(10, 0), tzinfo=timezone.get_current_timezone())
+        reservation.end_time = reservation.start_time + timedelta(minutes=30)
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation.save()
+
+        self.assertEqual(self.slot(self.get_slots(self.test_date), '10:00')['available_count'], 2)
+        self.assertEqual(self.slot(self.get_slots(self.other_date), '10:00')['available_count'], 1)
+
+    def test_configuration_changes_invalidate(self):
+        self.get_slots(self.test_date)
+        with self.captureOnCommitCallbacks(execute=True):
+            Holiday.objects.create(name='Test Holiday', date=self.test_date)
+        self.assertEqual(self.get_slots(self.test_date).data, [])
+
+        self.get_slots(self.other_date)
+        with self.captureOnCommitCallbacks(execute=True):
+            BusinessHours.objects.create(day_of_week=self.other_date.weekday(), open_time=time(14, 0), close_time=time(15, 0))
+        self.assertIn('14:00', [s['time'] for s in self.get_slots(self.other_date).data])
+
+        self.get_slots(self.other_date)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.resources.add(Resource.objects.create(name='Lift 3'))
+        self.assertEqual(self.slot(self.get_slots(self.other_date), '09:00')['available_count'], 3)
+
+    def test_cache_stats_are_staff_only(self):
+        metrics.reset()  # brojači su u metrikama procesa (booking/metrics.py)
+        self.get_slots(self.test_date)
+        self.get_slots(self.test_date)
+        stats_url = reverse('booking:availability-cache-stats')
+
+        self.assertEqual(self.client.get(stats_url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.force_authenticate(User.objects.create_user(email='staff@example.com', password='pass', is_staff=True))
+        response = self.client.get(stats_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['hits'], 1)
+        self.assertEqual(response.data['misses'], 1)
+
+
+class SharedBackendInvalidationTests(AvailabilityCacheMixin, APITestCase):
+    """Default backend: dva gunicorn workera = dvije instance backenda nad istim podacima."""
+
+    def test_booking_in_another_worker_invalidates(self):
+        other_worker = caches.create_connection(DEFAULT_CACHE_ALIAS)
+        # LocMem bi svaki proces držao za sebe
+        self.assertNotIsInstance(other_worker, LocMemCache)
+
+        self.get_slots(self.test_date)
+        self.assertEqual(self.get_slots(self.test_date)['X-Cache'], 'HIT')
+
+        with mock.patch('booking.availability.cache.cache', other_worker):
+            self.book(self.test_date, 10, self.resource1)
+
+        fresh = self.get_slots(self.test_date)
+        self.assertEqual(fresh['X-Cache'], 'MISS')
+        self.assertEqual(self.slot(fresh, '10:00')['available_count'], 1)
+
@@ -0,0 +1,106 @@
+import random
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from django.test import SimpleTestCase
+
+from booking.availability.engine import available_slots, blocked_windows, slots_for_day
+from booking.availability.reference import scan_slots_for_day
+
+TZ = ZoneInfo('Europe/Zurich')
+UTC = ZoneInfo('UTC')
+
+
+def random_case(rng):
+    """Generates one random day of configuration + bookings (never a DST switch day)."""
+    day = date(2025, 6, 2) + timedelta(days=rng.randint(0, 90))
+
+    periods = []
+    cursor = rng.randint(6 * 60, 10 * 60)
+    for _ in range(rng.randint(1, 3)):
+        length = rng.randint(15, 6 * 60)
+        periods.append((cursor, cursor + length))
+        cursor += length + rng.choice([0, 15, 30, 60, 90])
+    periods = [
+        (time(open_minute // 60, open_minute % 60), time(min(close_minute, 23 * 60 + 59) // 60, min(close_minute, 23 * 60 + 59) % 60))
+        for open_minute, close_minute in periods
+    ]
+
+    resource_ids = list(range(1, rng.randint(1, 6) + 1))
+    midnight = datetime.combine(day, time.min, tzinfo=TZ)
+    reservations = []
+    for _ in range(rng.randint(0, 40)):
+        start = midnight + timedelta(
+            minutes=rng.randint(-120, 24 * 60),
+            seconds=rng.choice([0, 0, 0, rng.randint(1, 59)]),
+        )
+        end = start + timedelta(minutes=rng.choice([15, 30, 45, 60, 90, 120, 240]))
+        # DB vraća vremena u UTC-u, kao i Django ORM
+        reservations.append((rng.choice(resource_ids), start.astimezone(UTC), end.astimezone(UTC)))
+
+    now = None
+    if rng.random() < 0.4:
+        now = midnight + timedelta(minutes=rng.randint(0, 24 * 60), seconds=rng.randint(0, 59))
+        now = now.astimezone(UTC)
+
+    return {
+        'day': day,
+        'periods': periods,
+        'total_resources': len(resource_ids),
+        'reservations': reservations,
+        'duration_minutes': rng.choice([15, 30, 45, 60, 90, 120]),
+        'tz': TZ,
+        'now': now,
+    }
+
+
+class SlotEngineEquivalenceTests(SimpleTestCase):
+    """Property-style tests: the sweep engine must match the legacy per-slot scan."""
+
+    def test_matches_reference_on_random_days(self):
+        rng = random.Random(20240617)
+        for _ in range(500):
+            case = random_case(rng)
+            with self.subTest(case=case):
+                self.assertEqual(slots_for_day(**case), scan_slots_for_day(**case))
+
+    def test_matches_reference_on_dense_days(self):
+        rng = random.Random(7)
+        for _ in range(50):
+            case = random_case(rng)
+            midnight = datetime.combine(case['day'], time(8, 0), tzinfo=TZ)
+            case['reservations'] = [
+                (rid, (midnight + timedelta(minutes=m)).astimezone(UTC), (midnight + timedelta(minutes=m + 30)).astimezone(UTC))
+                for rid in range(1, case['total_resources'] + 1)
+                for m in range(0, 10 * 60, rng.choice([30, 45, 60]))
+            ]
+            with self.subTest(case=case):
+                self.assertEqual(slots_for_day(**case), scan_slots_for_day(**case))
+
+
+class SlotEngineTests(SimpleTestCase):
+
+    def test_adjacent_and_overlapping_intervals_are_merged(self):
+        self.assertEqual(blocked_windows([(60, 90), (90, 120), (100, 110)], 30), [[31, 120]])
+
+    def test_back_to_back_booking_does_not_block(self):
+        # 08:00-08:30 zauzeto, slot u 08:30 mora biti slobodan
+        slots = available_slots([(480, 600)], {1: [(480, 510)]}, 1, 30)
+        self.assertEqual(slots[0], (510, 1))
+        self.assertNotIn(480, [start for start, _ in slots])
+
+    def test_same_resource_counted_once(self):
+        slots = available_slots([(480, 540)], {1: [(480, 500), (490, 510)]}, 2, 30)
+        self.assertEqual(slots, [(480, 1), (510, 2)])
+
+    def test_dst_switch_days_match_reference(self):
+        rng = random.Random(3)
+        for day in (date(2025, 3, 30), date(2025, 10, 26)):
+            for _ in range(50):
+                case = random_case(rng)
+                shift = day - case['day']
+                case['day'] = day
+                case['reservations'] = [(rid, start + shift, end + shift) for rid, start, end in case['reservations'] if (start + shift).astimezone(TZ).hour >= 4]
+                case['now'] = None
+                with self.subTest(day=day, case=case):
+                    self.assertEqual(slots_for_day(**case), scan_slots_for_day(**case))
@@ -0,0 +1,85 @@
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from booking.availability.window import MAX_RANGE_DAYS
+from booking.models import BusinessHours, Holiday, Location, Reservation, Resource, ServiceType
+from booking.tests.utils import LOCAL_CACHES
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class AvailabilityRangeTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.location = Location.objects.create(name="Test Garage", address="Teststraße 123, Zürich")
+        self.service = ServiceType.objects.create(name='Test Service', duration_minutes=60, location=self.location)
+        self.resource1 = Resource.objects.create(name='Lift 1', location=self.location)
+        self.resource2 = Resource.objects.create(name='Lift 2', location=self.location)
+        self.service.resources.add(self.resource1, self.resource2)
+
+        # Pon–pet s pauzom
+        for dow in range(5):
+            BusinessHours.objects.create(day_of_week=dow, open_time=time(8, 0), close_time=time(12, 0))
+            BusinessHours.objects.create(day_of_week=dow, open_time=time(13, 0), close_time=time(17, 0))
+
+        # Uvijek sljedeći ponedjeljak, da bi prvi dani bili radni
+        today = timezone.localdate()
+        self.start = today + timedelta(days=7 - today.weekday())
+        self.end = self.start + timedelta(days=13)
+        Holiday.objects.create(name='Test Holiday', date=self.start + timedelta(days=2))
+
+        tz = timezone.get_current_timezone()
+        for offset, hour, resource in [(0, 9, self.resource1), (0, 9, self.resource2), (1, 14, self.resource1), (5, 8, self.resource2)]:
+            start_time = datetime.combine(self.start + timedelta(days=offset), time(hour, 0), tzinfo=tz)
+            Reservation.objects.create(
+                service=self.service, resource=resource, full_name='Range User',
+                start_time=start_time, end_time=start_time + timedelta(minutes=90),
+            )
+
+        self.url = reverse('booking:availability-range')
+        self.single_url = reverse('booking:availability')
+
+    def test_range_matches_single_day_endpoint(self):
+        response = self.client.get(self.url, {
+            'service': self.service.id, 'start': self.start.isoformat(), 'end': self.end.isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 14)
+
+        day = self.start
+        while day <= self.end:
+            single = self.client.get(self.single_url, {'service': self.service.id, 'date': day.isoformat()})
+            self.assertEqual(response.data[day.isoformat()], single.data, day)
+            day += timedelta(days=1)
+
+        self.assertEqual(response.data[(self.start + timedelta(days=2)).isoformat()], [])
+        eleven = next(slot for slot in response.data[self.start.isoformat()] if slot['time'] == '11:00')
+        self.assertEqual(eleven['available_count'], 2)
+        self.assertNotIn('09:00', [slot['time'] for slot in response.data[self.start.isoformat()]])
+
+    def test_query_count_does_not_depend_on_range_length(self):
+        # servis, resursi, praznici, radno vrijeme, rezervacije
+        with self.assertNumQueries(5):
+            self.client.get(self.url, {'service': self.service.id, 'start': self.start.isoformat(), 'end': self.start.isoformat()})
+        with self.assertNumQueries(5):
+            self.client.get(self.url, {'service': self.service.id, 'start': self.start.isoformat(), 'end': self.end.isoformat()})
+
+    def test_range_is_capped(self):
+        response = self.client.get(self.url, {
+            'service': self.service.id,
+            'start': self.start.isoformat(),
+            'end': (self.start + timedelta(days=MAX_RANGE_DAYS)).isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'service': self.service.id}).status_code, status.HTTP_400_BAD_REQUEST)
+        bad_date = self.client.get(self.url, {'service': self.service.id, 'start': 'foo', 'end': self.end.isoformat()})
+        self.assertEqual(bad_date.status_code, status.HTTP_400_BAD_REQUEST)
+        reversed_range = self.client.get(self.url, {'service': self.service.id, 'start': self.end.isoformat(), 'end': self.start.isoformat()})
+        self.assertEqual(reversed_range.status_code, status.HTTP_400_BAD_REQUEST)
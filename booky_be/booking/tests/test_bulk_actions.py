@@ -0,0 +1,99 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from booking import outbox
+from booking.models import Location, OutboundEmail, Reservation, Resource, ResourceSlotOccupancy, ServiceType
+from booking.tests.test_outbox import CountingBackend
+from booking.tests.utils import LOCAL_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class ReservationBulkActionTests(APITestCase):
+    def setUp(self):
+        self.staff_user = User.objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        self.client.force_authenticate(self.staff_user)
+        self.url = reverse('booking:reservation-bulk')
+
+        location = Location.objects.create(name='Test Garage', address='Teststrasse 1')
+        self.service = ServiceType.objects.create(name='Test Service', duration_minutes=30, location=location)
+        self.resource = Resource.objects.create(name='Lift 1', location=location)
+        self.service.resources.add(self.resource)
+        self.day = timezone.localdate() + timedelta(days=1)
+
+    def create_reservations(self, count, approved=False):
+        reservations = []
+        for i in range(count):
+            start = timezone.make_aware(datetime.combine(self.day, time(8, 0))) + timedelta(minutes=30 * Reservation.objects.count())
+            reservations.append(Reservation.objects.create(
+                full_name=f'Customer {i}', email=f'customer{i}@example.com', phone='000',
+                service=self.service, resource=self.resource,
+                start_time=start, end_time=start + timedelta(minutes=30), is_approved=approved,
+            ))
+        return reservations
+
+    def test_approve_reports_per_id_results(self):
+        pending = self.create_reservations(2)
+        approved = self.create_reservations(1, approved=True)
+        ids = [pending[0].id, approved[0].id, 9999, pending[1].id, pending[0].id]
+
+        response = self.client.post(self.url, {'ids': ids, 'action': 'approve'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [
+            {'id': pending[0].id, 'status': 'approved'},
+            {'id': approved[0].id, 'status': 'already_approved'},
+            {'id': 9999, 'status': 'not_found'},
+            {'id': pending[1].id, 'status': 'approved'},
+        ])
+        self.assertEqual(Reservation.objects.filter(is_approved=False).count(), 0)
+        # Samo novoodobrene dobijaju email
+        self.assertEqual(
+            sorted(OutboundEmail.objects.values_list('reservation_id', flat=True)),
+            sorted(r.id for r in pending),
+        )
+
+    def test_approve_query_count_does_not_grow_with_ids(self):
+        def approve(reservations):
+            ids = [r.id for r in reservations]
+            with self.assertNumQueries(5):  # savepoint, select, update, insert emails, release
+                response = self.client.post(self.url, {'ids': ids, 'action': 'approve'}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        approve(self.create_reservations(2))
+        approve(self.create_reservations(20))
+
+    @override_settings(EMAIL_BACKEND='booking.tests.test_outbox.CountingBackend')
+    def test_approval_emails_go_out_over_one_connection(self):
+        reservations = self.create_reservations(12)
+        self.client.post(self.url, {'ids': [r.id for r in reservations], 'action': 'approve'}, format='json')
+
+        CountingBackend.opened = 0
+        self.assertEqual(outbox.drain()['sent'], 12)
+        self.assertEqual(CountingBackend.opened, 1)
+        self.assertTrue(all('approved' in m.subject for m in mail.outbox))
+        self.assertTrue(all(m.attachments[0][0] == 'reservation.ics' for m in mail.outbox))
+
+    def test_decline_deletes_reservations(self):
+        reservations = self.create_reservations(3)
+        ids = [reservations[0].id, reservations[2].id, 9999]
+        response = self.client.post(self.url, {'ids': ids, 'action': 'decline'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['status'] for r in response.data['results']], ['declined', 'declined', 'not_found'])
+        self.assertEqual(list(Reservation.objects.values_list('id', flat=True)), [reservations[1].id])
+        self.assertEqual(set(ResourceSlotOccupancy.objects.values_list('reservation_id', flat=True)), {reservations[1].id})
+
+    def test_validation_and_permissions(self):
+        self.assertEqual(self.client.post(self.url, {'ids': [], 'action': 'approve'}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post(self.url, {'ids': [1], 'action': 'cancel'}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post(self.url, {'ids': ['x'], 'action': 'approve'}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(User.objects.create_user(email='user@example.com', password='pass'))
+        self.assertEqual(self.client.post(self.url, {'ids': [1], 'action': 'approve'}, format='json').status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,154 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from booking import feeds
+from booking.models import CalendarFeed, Location, Reservation, Resource, ServiceType
+from booking.tests.utils import LOCAL_CACHES
+from booking.utils.calendar_utils import escape_text, fold, generate_ics_file
+
+User = get_user_model()
+
+
+def unfold(text):
+    return text.replace('\r\n ', '')
+
+
+class ICSFormattingTests(TestCase):
+    def test_fold_keeps_lines_under_75_octets_and_characters_whole(self):
+        line = 'DESCRIPTION:' + 'Miloš Đorđević čćžšđ ' * 10
+        folded = fold(line)
+        self.assertTrue(all(len(part.encode('utf-8')) <= 75 for part in folded.split('\r\n')))
+        self.assertEqual(unfold(folded), line)
+        self.assertEqual(fold('SUMMARY:short'), 'SUMMARY:short')
+
+    def test_escape_text(self):
+        self.assertEqual(escape_text('a;b,c\\d\ne'), 'a\\;b\\,c\\\\d\\ne')
+
+    def test_email_attachment_uses_utc(self):
+        service = ServiceType.objects.create(name='Wash', duration_minutes=30)
+        resource = Resource.objects.create(name='Lift 1')
+        start = timezone.make_aware(datetime(2026, 7, 1, 9, 0))  # Europe/Zurich, ljeto: UTC+2
+        reservation = Reservation.objects.create(
+            full_name='Ana', phone='000', email='ana@example.com', service=service, resource=resource,
+            start_time=start, end_time=start + timedelta(minutes=30),
+        )
+        content = generate_ics_file(reservation).read().decode()
+        self.assertIn('DTSTART:20260701T070000Z\r\n', content)
+        self.assertIn(f'UID:reservation-{reservation.pk}@booky\r\n', content)
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class CalendarFeedTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.location = Location.objects.create(name='Garage Zürich', address='Bahnhofstrasse 1')
+        self.service = ServiceType.objects.create(name='Räder', name_en='Wheels', duration_minutes=30)
+        self.lifts = [Resource.objects.create(name=f'Lift {i}', location=self.location) for i in range(2)]
+        self.elsewhere = Resource.objects.create(name='Other lift')
+        self.service.resources.add(*self.lifts, self.elsewhere)
+
+        self.day = timezone.localdate() + timedelta(days=2)
+        self.reservations = [
+            self.create(self.lifts[0], time(8, 0), 'Miloš Stanković'),
+            self.create(self.lifts[1], time(8, 0), 'Anna Müller'),
+            self.create(self.elsewhere, time(8, 0), 'Somebody Else'),
+        ]
+        self.feed = CalendarFeed.objects.create(name='Lift 0', resource=self.lifts[0])
+        self.url = reverse('booking:calendar-feed', args=[self.feed.token])
+
+    def create(self, resource, start, name):
+        start_time = timezone.make_aware(datetime.combine(self.day, start))
+        return Reservation.objects.create(
+            full_name=name, phone='+41 76 000 00 00', email='c@example.com', license_plate='ZH 1',
+            service=self.service, resource=resource, start_time=start_time, end_time=start_time + timedelta(minutes=30),
+        )
+
+    def body(self, response):
+        return unfold(response.content.decode())
+
+    def test_resource_feed(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        body = self.body(response)
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n') and body.endswith('END:VCALENDAR\r\n'))
+        self.assertIn(f'UID:reservation-{self.reservations[0].pk}@booky', body)
+        self.assertIn('SUMMARY:Wheels: Miloš Stanković', body)
+        self.assertIn('LOCATION:Lift 0\\, Garage Zürich', body)
+        self.assertIn('STATUS:TENTATIVE', body)
+        start_utc = self.reservations[0].start_time.astimezone(dt_timezone.utc)
+        self.assertIn(f"DTSTART:{start_utc.strftime('%Y%m%dT%H%M%SZ')}", body)
+        self.assertNotIn('Anna Müller', body)
+
+    def test_location_feed_covers_its_resources(self):
+        feed = CalendarFeed.objects.create(name='Garage', location=self.location)
+        body = self.body(self.client.get(reverse('booking:calendar-feed', args=[feed.token])))
+        self.assertIn('Miloš Stanković', body)
+        self.assertIn('Anna Müller', body)
+        self.assertNotIn('Somebody Else', body)
+
+    def test_unknown_token(self):
+        self.assertEqual(self.client.get(reverse('booking:calendar-feed', args=['nope'])).status_code, 404)
+
+    def test_conditional_requests_skip_the_reservation_table(self):
+        first = self.client.get(self.url)
+
+        # Samo upit za CalendarFeed; rezervacije se ne čitaju
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], first['ETag'])
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_changes_produce_new_etag(self):
+        etag = self.client.get(self.url)['ETag']
+
+        # Druga lokacija/resurs: feed ostaje isti
+        # Stampovi se pišu nakon commita
+        self.reservations[2].full_name = 'Changed Elsewhere'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reservations[2].save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Odobravanje ne mijenja termin, ali mijenja VEVENT
+        self.reservations[0].is_approved = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reservations[0].save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('STATUS:CONFIRMED', self.body(response))
+
+    def test_bulk_approve_produces_new_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.force_authenticate(User.objects.create_user(email='admin@example.com', password='pass', is_staff=True))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('booking:reservation-bulk'), {'ids': [self.reservations[0].pk], 'action': 'approve'}, format='json')
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_only_changed_events_are_rebuilt(self):
+        self.create(self.lifts[0], time(9, 0), 'Second Customer')
+        with mock.patch.object(feeds, '_event', wraps=feeds._event) as built:
+            self.client.get(self.url)
+            self.assertEqual(built.call_count, 2)
+
+            self.reservations[0].phone = '+41 79 111 11 11'
+            self.reservations[0].save()
+            body = self.body(self.client.get(self.url))
+            self.assertEqual(built.call_count, 3)
+        self.assertIn('+41 79 111 11 11', body)
@@ -0,0 +1,124 @@
+import time as clock
+from datetime import date, time, timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from booking import config_version
+from booking.models import BusinessHours, Holiday, Location, Resource, ServiceType
+from booking.tests.utils import LOCAL_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class ConfigConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = ServiceType.objects.create(name='Wash', duration_minutes=30)
+        BusinessHours.objects.create(day_of_week=0, open_time=time(8, 0), close_time=time(17, 0))
+        self.urls = [
+            reverse('booking:service-list'),
+            reverse('booking:holiday-list-create'),
+            reverse('booking:disabled-dates'),
+        ]
+
+    def assert_not_modified(self, url, etag, **params):
+        with self.assertNumQueries(0):
+            response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        return response
+
+    def test_repeat_requests_get_304_without_queries(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                self.assertEqual(first.status_code, 200)
+                cache_control = first['Cache-Control']
+                self.assertIn('public', cache_control)
+                self.assertIn('max-age=60', cache_control)
+                self.assertIn('stale-while-revalidate=600', cache_control)
+
+                not_modified = self.assert_not_modified(url, first['ETag'])
+                self.assertEqual(not_modified['ETag'], first['ETag'])
+
+                with self.assertNumQueries(0):
+                    response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+                self.assertEqual(response.status_code, 304)
+
+    def test_query_params_are_part_of_the_etag(self):
+        url = reverse('booking:disabled-dates')
+        short = self.client.get(url, {'days': 7})
+        self.assertNotEqual(short['ETag'], self.client.get(url, {'days': 30})['ETag'])
+        self.assert_not_modified(url, short['ETag'], days=7)
+
+    def test_configuration_changes_produce_new_etags(self):
+        changes = [
+            lambda: Holiday.objects.create(name='Feiertag', date=timezone.localdate() + timedelta(days=3)),
+            lambda: BusinessHours.objects.create(day_of_week=1, open_time=time(8, 0), close_time=time(12, 0)),
+            lambda: self.service.save(),
+            lambda: self.service.resources.add(Resource.objects.create(name='Lift 1')),
+            lambda: Location.objects.create(name='Garage', address='Street 1'),
+        ]
+        for change in changes:
+            etags = [self.client.get(url)['ETag'] for url in self.urls]
+            with self.captureOnCommitCallbacks(execute=True):  # verzija se mijenja nakon commita
+                change()
+            for url, etag in zip(self.urls, etags):
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_writes_are_not_conditional(self):
+        self.client.force_authenticate(User.objects.create_user(email='staff@example.com', password='pass', is_staff=True))
+        etag = self.client.get(reverse('booking:holiday-list-create'))['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('booking:holiday-list-create'),
+                {'name': 'Neujahr', 'date': date(2030, 1, 1)},
+                HTTP_IF_NONE_MATCH=etag,
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('ETag', response)
+
+        response = self.client.get(reverse('booking:holiday-list-create'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([holiday['name'] for holiday in response.data], ['Neujahr'])
+
+
+class SharedConfigVersionTests(APITestCase):
+    """Default (dijeljeni, database) cache, kako radi u produkciji."""
+
+    def setUp(self):
+        self.url = reverse('booking:holiday-list-create')
+
+    def test_304_runs_no_queries(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_change_in_another_worker_is_not_answered_with_304(self):
+        other_worker = caches.create_connection(DEFAULT_CACHE_ALIAS)
+        self.assertNotIsInstance(other_worker, LocMemCache)  # LocMem je po procesu
+        first = self.client.get(self.url)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        # Drugi worker: svoj cache klijent i svoja zapamćena verzija
+        with mock.patch.multiple(config_version, cache=other_worker, _version=None, _expires_at=0.0), \
+                self.captureOnCommitCallbacks(execute=True):
+            Holiday.objects.create(name='Feiertag', date=timezone.localdate() + timedelta(days=3))
+
+        # Ovaj worker provjerava verziju najkasnije nakon BOOKY_CONFIG_VERSION_CHECK_INTERVAL
+        later = clock.monotonic() + settings.BOOKY_CONFIG_VERSION_CHECK_INTERVAL + 1
+        with mock.patch.object(config_version.time, 'monotonic', return_value=later):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertEqual(len(response.data), 1)
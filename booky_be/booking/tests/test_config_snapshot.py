@@ -0,0 +1,113 @@
+import time as clock
+from datetime import date, time
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from booking import config_snapshot, config_version
+from booking.models import BusinessHours, Holiday, Resource, ServiceType
+from booking.tests.utils import LOCAL_CACHES
+
+
+class ConfigSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = ServiceType.objects.create(name='Wash', duration_minutes=30)
+        self.lifts = [Resource.objects.create(name=f'Lift {i}') for i in range(2)]
+        self.service.resources.add(*reversed(self.lifts))
+        BusinessHours.objects.create(day_of_week=0, open_time=time(13, 0), close_time=time(17, 30))
+        BusinessHours.objects.create(day_of_week=0, open_time=time(8, 0), close_time=time(12, 0))
+        for day in (date(2030, 12, 25), date(2030, 1, 1)):
+            Holiday.objects.create(name='Feiertag', date=day)
+
+    def test_contents(self):
+        snapshot = config_snapshot.get()
+        service = snapshot.services[self.service.pk]
+        self.assertEqual(service.duration_minutes, 30)
+        self.assertEqual(service.resource_ids, tuple(lift.pk for lift in self.lifts))
+        self.assertEqual([resource.id for resource in service.resources], list(service.resource_ids))
+
+        self.assertEqual(snapshot.periods[0], ((480, 720), (780, 1050)))
+        self.assertEqual(snapshot.closed_weekdays(), [1, 2, 3, 4, 5, 6])
+
+        self.assertEqual(snapshot.holidays, (date(2030, 1, 1), date(2030, 12, 25)))
+        self.assertTrue(snapshot.is_holiday(date(2030, 12, 25)))
+        self.assertFalse(snapshot.is_holiday(date(2030, 12, 24)))
+        self.assertEqual(snapshot.holidays_between(date(2030, 1, 1), date(2030, 6, 1)), (date(2030, 1, 1),))
+
+    def test_read_only(self):
+        snapshot = config_snapshot.get()
+        with self.assertRaises(AttributeError):
+            snapshot.holidays = ()
+        with self.assertRaises(TypeError):
+            snapshot.services[0] = None
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class SharedConfigSnapshotTests(TransactionTestCase):
+    """Bez testne transakcije: snapshot se dijeli kroz proces kao u produkciji."""
+
+    def setUp(self):
+        cache.clear()
+        self.service = ServiceType.objects.create(name='Wash', duration_minutes=30)
+
+    def test_reused_until_configuration_changes(self):
+        first = config_snapshot.get()
+        with self.assertNumQueries(0):
+            self.assertIs(config_snapshot.get(), first)
+
+        for change in (
+            lambda: Holiday.objects.create(name='Neujahr', date=date(2030, 1, 1)),
+            lambda: BusinessHours.objects.create(day_of_week=2, open_time=time(8, 0), close_time=time(12, 0)),
+            lambda: self.service.resources.add(Resource.objects.create(name='Lift 1')),
+        ):
+            before = config_snapshot.get()
+            change()
+            self.assertIsNot(config_snapshot.get(), before)
+
+        snapshot = config_snapshot.get()
+        self.assertEqual(snapshot.holidays, (date(2030, 1, 1),))
+        self.assertEqual(snapshot.periods[2], ((480, 720),))
+        self.assertEqual(len(snapshot.services[self.service.pk].resource_ids), 1)
+
+    def test_lost_version_key_reloads(self):
+        first = config_snapshot.get()
+        clock.sleep(0.002)  # nova verzija je trenutno vrijeme u ms
+        cache.clear()
+        later = clock.monotonic() + settings.BOOKY_CONFIG_VERSION_CHECK_INTERVAL + 1
+        with CaptureQueriesContext(connection) as queries, \
+                mock.patch.object(config_version.time, 'monotonic', return_value=later):
+            self.assertIsNot(config_snapshot.get(), first)
+        self.assertEqual(len(queries), 4)
+
+    def test_reloaded_after_ttl_even_without_version_change(self):
+        first = config_snapshot.get()
+        with mock.patch.object(config_snapshot.time, 'monotonic', return_value=clock.monotonic() + 3600):
+            self.assertIsNot(config_snapshot.get(), first)
+
+
+class CrossWorkerConfigSnapshotTests(TransactionTestCase):
+    """Default (dijeljeni) cache: izmjena u drugom workeru stiže do snapshota ovog workera."""
+
+    def test_change_in_another_worker_reloads(self):
+        service = ServiceType.objects.create(name='Wash', duration_minutes=30)
+        first = config_snapshot.get()
+        self.assertIs(config_snapshot.get(), first)
+        self.assertEqual(first.services[service.pk].resource_ids, ())
+
+        # Drugi worker: svoj cache klijent i svoja zapamćena verzija
+        other_worker = caches.create_connection(DEFAULT_CACHE_ALIAS)
+        with mock.patch.multiple(config_version, cache=other_worker, _version=None, _expires_at=0.0):
+            service.resources.add(Resource.objects.create(name='Lift 1'))
+            Holiday.objects.create(name='Feiertag', date=date(2030, 1, 1))
+        self.assertIs(config_snapshot.get(), first)  # do sljedeće provjere verzije
+
+        later = clock.monotonic() + settings.BOOKY_CONFIG_VERSION_CHECK_INTERVAL + 1
+        with mock.patch.object(config_version.time, 'monotonic', return_value=later):
+            snapshot = config_snapshot.get()
+        self.assertEqual(len(snapshot.services[service.pk].resource_ids), 1)
+        self.assertEqual(snapshot.holidays, (date(2030, 1, 1),))
@@ -1,12 +1,17 @@
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
+from django.core.cache import cache
+from django.test import override_settings
 from django.utils import timezone
-from datetime import timedelta
-from ..models import Holiday, BusinessHours
+from datetime import date, datetime, time, timedelta
+from ..models import Holiday, BusinessHours, Reservation, Resource, ServiceType
+from .utils import LOCAL_CACHES
 
+@override_settings(CACHES=LOCAL_CACHES)
 class DisabledDatesAPITests(APITestCase):
     def setUp(self):
+        cache.clear()
         # Kreiramo BusinessHours samo za radne dane (pon–pet, tj. 0–4)
         for dow in range(5):
             BusinessHours.objects.create(day_of_week=dow, open_time="08:00", close_time="17:00")
@@ -56,3 +61,116 @@ class DisabledDatesAPITests(APITestCase):
         self.assertEqual(bad.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('detail', bad.json())
         self.assertEqual(bad.json()['detail'], 'Parametar must be an int.')
+
+    @override_settings(BOOKY_DISABLED_DATES_MAX_DAYS=30)
+    def test_days_are_capped(self):
+        data = self.client.get(self.url, {'days': 100000}).json()
+        self.assertEqual(data['end_date'], (self.today + timedelta(days=30)).isoformat())
+
+    def test_start_param(self):
+        # 2030-01-07 je ponedjeljak
+        response = self.client.get(self.url, {'start': '2030-01-07', 'days': 6})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['disabled_dates'], ['2030-01-12', '2030-01-13'])
+
+        for bad in ('07.01.2030', '9999-12-31'):
+            response = self.client.get(self.url, {'start': bad})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_compact_matches_full_list(self):
+        # Praznik u petak spaja se s vikendom u jedan period
+        Holiday.objects.create(name="Friday", date=date(2030, 1, 11))
+        Holiday.objects.create(name="Wednesday", date=date(2030, 1, 16))
+        params = {'start': '2030-01-07', 'days': 13}
+
+        data = self.client.get(self.url, {**params, 'compact': 1}).json()
+        self.assertEqual(data['weekday_mask'], 0b1100000)
+        self.assertEqual(data['closed_weekdays'], [5, 6])
+        self.assertEqual(data['periods'], [['2030-01-11', '2030-01-13'], ['2030-01-16', '2030-01-16']])
+
+        # Isti skup dana kao u punoj listi
+        expanded = set()
+        start, end = date.fromisoformat(data['start_date']), date.fromisoformat(data['end_date'])
+        for offset in range((end - start).days + 1):
+            day = start + timedelta(days=offset)
+            if data['weekday_mask'] >> day.weekday() & 1:
+                expanded.add(day.isoformat())
+        for first, last in data['periods']:
+            first, last = date.fromisoformat(first), date.fromisoformat(last)
+            expanded.update((first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1))
+        self.assertEqual(sorted(expanded), self.client.get(self.url, params).json()['disabled_dates'])
+
+    def test_result_is_cached_until_config_changes(self):
+        first = self.client.get(self.url, {'days': 30}).json()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url, {'days': 30}).json(), first)
+
+        with self.captureOnCommitCallbacks(execute=True):  # invalidacija nakon commita
+            Holiday.objects.create(name="New", date=self.today + timedelta(days=2))
+        data = self.client.get(self.url, {'days': 30}).json()
+        self.assertIn((self.today + timedelta(days=2)).isoformat(), data['disabled_dates'])
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class FullyBookedDatesTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        # Pon–pet 08:00–10:00, servis od 60 min, dva resursa
+        for dow in range(5):
+            BusinessHours.objects.create(day_of_week=dow, open_time="08:00", close_time="10:00")
+        self.service = ServiceType.objects.create(name="Wash", duration_minutes=60)
+        self.lifts = [Resource.objects.create(name=f"Lift {i}") for i in range(2)]
+        self.service.resources.add(*self.lifts)
+        self.url = reverse('booking:disabled-dates')
+        self.params = {'service': self.service.pk, 'start': '2030-01-07', 'days': 4}  # pon–pet
+
+    def book(self, day, resource, start, end):
+        start_time = timezone.make_aware(datetime.combine(day, time.fromisoformat(start)))
+        Reservation.objects.create(
+            full_name="Ana", phone="000", email="ana@example.com", service=self.service, resource=resource,
+            start_time=start_time, end_time=timezone.make_aware(datetime.combine(day, time.fromisoformat(end))),
+        )
+
+    def test_fully_booked_days_are_disabled(self):
+        monday, tuesday, wednesday = date(2030, 1, 7), date(2030, 1, 8), date(2030, 1, 9)
+        # Ponedjeljak: oba resursa puna
+        for lift in self.lifts:
+            self.book(monday, lift, "08:00", "10:00")
+        # Utorak: jedan resurs ima još 60 min
+        self.book(tuesday, self.lifts[0], "08:00", "10:00")
+        self.book(tuesday, self.lifts[1], "08:00", "09:00")
+        # Srijeda: rezervacije izvan radnog vremena se ne broje
+        for lift in self.lifts:
+            self.book(wednesday, lift, "10:00", "18:00")
+
+        # snapshot konfiguracije (4) + zauzetost
+        with self.assertNumQueries(5):
+            data = self.client.get(self.url, self.params).json()
+        self.assertEqual(data['fully_booked_dates'], ['2030-01-07'])
+        self.assertEqual(data['disabled_dates'], ['2030-01-07'])
+
+        compact = self.client.get(self.url, {**self.params, 'compact': 1}).json()
+        self.assertEqual(compact['periods'], [['2030-01-07', '2030-01-07']])
+        self.assertEqual(compact['fully_booked_dates'], ['2030-01-07'])
+
+    def test_periods_shorter_than_the_service_do_not_count(self):
+        BusinessHours.objects.filter(day_of_week=0).update(close_time="08:30")
+        data = self.client.get(self.url, self.params).json()
+        self.assertEqual(data['fully_booked_dates'], ['2030-01-07'])
+
+    def test_new_reservation_is_visible_immediately(self):
+        response = self.client.get(self.url, self.params)
+        self.assertNotIn('ETag', response)
+        self.assertEqual(response.json()['fully_booked_dates'], [])
+
+        for lift in self.lifts:
+            self.book(date(2030, 1, 8), lift, "08:00", "10:00")
+        self.assertEqual(self.client.get(self.url, self.params).json()['fully_booked_dates'], ['2030-01-08'])
+
+    def test_without_service_no_fully_booked_dates(self):
+        self.assertNotIn('fully_booked_dates', self.client.get(self.url).json())
+
+    def test_invalid_service(self):
+        for bad in ('abc', '999'):
+            response = self.client.get(self.url, {'service': bad})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -8,6 +8,7 @@ from booking.models import Reservation, ServiceType, Resource, BusinessHours, Lo
 from django.utils import timezone
 from datetime import time, timedelta
 from django.core import mail
+from booking import outbox
 
 User = get_user_model()
 
@@ -47,6 +48,9 @@ class EmailingTests(APITestCase):
         create_response = self.client.post(reverse('booking:reservation-list-create'), reservation_data, format='json')
         self.assertEqual(create_response.status_code, status.HTTP_201_CREATED)
 
+        # Request samo upisuje emailove u outbox; šalje ih worker (run_outbox)
+        self.assertEqual(len(mail.outbox), 0)
+        outbox.drain()
         self.assertGreaterEqual(len(mail.outbox), 2)
 
         # -- Email korisniku o pending statusu --
@@ -68,6 +72,7 @@ class EmailingTests(APITestCase):
         detail_url = reverse('booking:reservation-detail', kwargs={'pk': reservation.pk})
         approve_response = self.client.patch(detail_url, {'is_approved': True}, format='json')
         self.assertEqual(approve_response.status_code, status.HTTP_200_OK)
+        outbox.drain()
 
         # -- Provjera da je poslan email o odobravanju --
         self.assertEqual(len(mail.outbox), 1)
@@ -0,0 +1,92 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone, translation
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from booking.listing import ROW_FIELDS, reservation_rows
+from booking.models import Location, Reservation, Resource, ServiceType
+from booking.renderers import FastJSONRenderer
+from booking.serializers import ReservationListSerializer
+
+User = get_user_model()
+
+
+class LeanListingContractTests(APITestCase):
+    """The lean path must render exactly the bytes ReservationListSerializer renders."""
+
+    def setUp(self):
+        cache.clear()
+        location = Location.objects.create(name='Garage Zürich', address='Bahnhofstrasse 1')
+        self.wash = ServiceType.objects.create(
+            name='Wäsche', name_de='Wäsche', name_en='Wash', duration_minutes=30, location=location,
+        )
+        self.tyres = ServiceType.objects.create(name='Reifen', duration_minutes=60)
+        self.lifts = [
+            Resource.objects.create(name='Lift 1', location=location),
+            Resource.objects.create(name='Lift 2'),
+        ]
+        self.wash.resources.add(*self.lifts)
+        self.tyres.resources.add(self.lifts[1])
+
+        day = timezone.localdate() + timedelta(days=1)
+        rows = [
+            ('Miloš Stanković', self.wash, self.lifts[0], '', False),
+            ('Anna "Ann" Müller', self.tyres, self.lifts[1], 'ZH 123', True),
+            # U+2028 mora biti escapiran kao u DRF JSONRendereru
+            ('Line\u2028Separator', self.wash, self.lifts[1], 'GE-1', False),
+        ]
+        for i, (name, service, resource, plate, approved) in enumerate(rows):
+            start = timezone.make_aware(datetime.combine(day, time(8, 0))) + timedelta(hours=i)
+            Reservation.objects.create(
+                full_name=name, phone='+41 76 000 00 00', email=f'c{i}@example.ch', license_plate=plate,
+                service=service, resource=resource, start_time=start,
+                end_time=start + timedelta(minutes=service.duration_minutes), is_approved=approved,
+            )
+
+    def assert_same_bytes(self):
+        expected = JSONRenderer().render(
+            ReservationListSerializer(Reservation.objects.order_by('start_time'), many=True).data
+        )
+        lean = reservation_rows(Reservation.objects.order_by('start_time').values(*ROW_FIELDS))
+        self.assertEqual(FastJSONRenderer().render(lean), expected)
+        self.assertEqual(JSONRenderer().render(lean), expected)
+
+    def test_lean_rows_match_serializer_bytes(self):
+        self.assert_same_bytes()
+
+    def test_match_in_every_language(self):
+        for code in ('de', 'en'):
+            with translation.override(code):
+                self.assert_same_bytes()
+
+    def test_match_outside_default_timezone(self):
+        with timezone.override('UTC'):
+            self.assert_same_bytes()
+
+    def test_catalog_follows_service_and_resource_changes(self):
+        self.assert_same_bytes()  # napuni cache
+
+        # Katalog se briše nakon commita
+        with self.captureOnCommitCallbacks(execute=True):
+            self.wash.name = 'Premium Wäsche'
+            self.wash.save()
+            self.lifts[1].name = 'Lift B'
+            self.lifts[1].save()
+            self.tyres.resources.add(self.lifts[0])
+        self.assert_same_bytes()
+
+    def test_list_endpoint_renders_serializer_bytes(self):
+        self.client.force_authenticate(User.objects.create_user(email='staff@example.com', password='pass', is_staff=True))
+        response = self.client.get(reverse('booking:reservation-list-create'), {'period': 'all'})
+        expected = JSONRenderer().render(
+            ReservationListSerializer(Reservation.objects.order_by('start_time', 'id'), many=True).data
+        )
+        self.assertEqual(response.content, expected)
+
+        response = self.client.get(reverse('booking:reservation-list-create'), {'period': 'all', 'page_size': 2})
+        self.assertEqual([row['full_name'] for row in response.data['results']], ['Miloš Stanković', 'Anna "Ann" Müller'])
+        self.assertIsNotNone(response.data['next'])
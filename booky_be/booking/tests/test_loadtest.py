@@ -0,0 +1,105 @@
+import re
+from datetime import datetime, time, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from booking.management.commands.loadtest import LOADTEST_EMAIL, find_double_bookings, parse_mix
+from booking.models import BusinessHours, OutboundEmail, Reservation, Resource, ServiceType
+from booking.tests.utils import LOCAL_CACHES
+
+
+class ParseMixTests(TestCase):
+    def test_weights(self):
+        self.assertEqual(parse_mix('availability=6, book=1'), {'availability': 6.0, 'book': 1.0})
+
+    def test_invalid_mix(self):
+        for value in ('search=1', 'book=x', 'book=0,datepicker=0'):
+            with self.subTest(value=value), self.assertRaises(CommandError):
+                parse_mix(value)
+
+
+class FindDoubleBookingsTests(TestCase):
+    def setUp(self):
+        self.service = ServiceType.objects.create(name='Wash', duration_minutes=30)
+        self.lifts = [Resource.objects.create(name=f'Lift {i}') for i in range(2)]
+        self.day = timezone.localdate() + timedelta(days=1)
+
+    def book(self, resource, hour, minutes=60):
+        start = timezone.make_aware(datetime.combine(self.day, time(hour, 0)))
+        return Reservation.objects.create(
+            full_name='Ana', phone='000', email='ana@example.com', service=self.service,
+            resource=resource, start_time=start, end_time=start + timedelta(minutes=minutes),
+        )
+
+    def test_adjacent_and_other_resource_are_not_double_bookings(self):
+        self.book(self.lifts[0], 8)
+        self.book(self.lifts[0], 9)
+        self.book(self.lifts[1], 8)
+        self.assertEqual(find_double_bookings(self.day, self.day), [])
+
+    def test_overlap_is_reported(self):
+        # Trigger bi odbio preklapanje; u testu ga gasimo (rollback ga vraća)
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite trigger')
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER reservation_no_overlap_insert')
+        long = self.book(self.lifts[0], 8, minutes=180)
+        first = self.book(self.lifts[0], 9)
+        second = self.book(self.lifts[0], 10)
+        self.assertEqual(find_double_bookings(self.day, self.day), [(long.pk, first.pk), (long.pk, second.pk)])
+        self.assertEqual(find_double_bookings(self.day + timedelta(days=1), self.day + timedelta(days=2)), [])
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class LoadtestCommandTests(TransactionTestCase):
+    """Cijeli in-process load test; klijenti su threadovi, pa bez testne transakcije."""
+
+    def setUp(self):
+        service = ServiceType.objects.create(name='Wash', duration_minutes=30)
+        service.resources.add(*[Resource.objects.create(name=f'Lift {i}') for i in range(2)])
+        for day_of_week in range(7):
+            BusinessHours.objects.create(day_of_week=day_of_week, open_time=time(8, 0), close_time=time(17, 0))
+        self.customer = Reservation.objects.create(
+            full_name='Ana', phone='000', email='ana@example.com', service=service, resource=service.resources.first(),
+            start_time=timezone.now() + timedelta(days=30), end_time=timezone.now() + timedelta(days=30, minutes=30),
+        )
+        OutboundEmail.objects.create(reservation=self.customer, subject='Hi', body='', from_email='a@b.c', to=['ana@example.com'])
+
+    def loadtest(self, **options):
+        out = StringIO()
+        # Test runner je već pozvao setup_test_environment()
+        with mock.patch('booking.management.commands.loadtest.setup_test_environment'), \
+                mock.patch('booking.management.commands.loadtest.teardown_test_environment'):
+            call_command('loadtest', clients=2, mix='book=1', stdout=out, **options)
+        return out.getvalue()
+
+    def test_requests_counts_http_requests(self):
+        output = self.loadtest(requests=20)
+        self.assertIn('20 requests in', output)  # rezervacija = GET dostupnosti + POST
+
+    def test_cleanup_removes_bookings_and_their_queued_emails(self):
+        output = self.loadtest(requests=20)
+        reservations, emails = map(int, re.search(r'Obrisano (\d+) rezervacija i (\d+) emailova', output).groups())
+        self.assertGreater(reservations, 0)
+        self.assertEqual(emails, 2 * reservations)  # potvrda kupcu + obavijest vlasniku
+
+        self.assertEqual(list(Reservation.objects.all()), [self.customer])
+        self.assertEqual(list(OutboundEmail.objects.values_list('reservation', flat=True)), [self.customer.pk])
+
+
+    def test_keep_leaves_bookings(self):
+        output = self.loadtest(requests=20, keep=True)
+        self.assertNotIn('Obrisano', output)
+        self.assertTrue(Reservation.objects.filter(email=LOADTEST_EMAIL).exists())
+
+    def test_interrupted_run_still_cleans_up(self):
+        with mock.patch('booking.management.commands.loadtest.Command.report', side_effect=KeyboardInterrupt), \
+                self.assertRaises(KeyboardInterrupt):
+            self.loadtest(requests=20)
+        self.assertEqual(list(Reservation.objects.all()), [self.customer])
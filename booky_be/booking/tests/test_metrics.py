@@ -0,0 +1,140 @@
+import json
+import os
+import re
+import tempfile
+import time
+from datetime import time as dtime, timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from booking import metrics
+from booking.models import BusinessHours, Resource, ServiceType
+from config import settings as project_settings
+
+User = get_user_model()
+
+# Prosječno trošenje middlewarea po requestu koje još prihvatamo
+OVERHEAD_BUDGET = 0.0005  # sekunde
+
+
+def sample(text, name, **labels):
+    """Value of one sample in the exposition text, None if missing."""
+    label_text = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    pattern = '^' + re.escape(f'{name}{{{label_text}}}' if labels else name) + r' (\S+)$'
+    match = re.search(pattern, text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+class MetricsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        overrides = override_settings(BOOKY_METRICS_DIR=self.directory.name, BOOKY_METRICS_FLUSH_INTERVAL=3600)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        BusinessHours.objects.create(
+            day_of_week=(timezone.localdate() + timedelta(days=1)).weekday(),
+            open_time=dtime(8, 0), close_time=dtime(12, 0),
+        )
+        self.service = ServiceType.objects.create(name='Wash', duration_minutes=30)
+        self.service.resources.add(Resource.objects.create(name='Lift 1'))
+        self.staff = User.objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+
+    def scrape(self):
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(reverse('booking:metrics'))
+        self.client.force_authenticate(None)
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_staff_only(self):
+        url = reverse('booking:metrics')
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.client.force_authenticate(User.objects.create_user(email='user@example.com', password='pass'))
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        self.assertIn('no-store', response['Cache-Control'])
+
+    def test_requests_latency_queries_and_cache_per_view(self):
+        params = {'service': self.service.pk, 'date': (timezone.localdate() + timedelta(days=1)).isoformat()}
+        for _ in range(2):
+            self.assertEqual(self.client.get(reverse('booking:availability'), params).status_code, 200)
+        self.client.get(reverse('booking:availability'), {'service': self.service.pk, 'date': 'x'})
+        self.client.get('/api/does-not-exist/')
+
+        text = self.scrape()
+        view = 'booking:availability'
+        self.assertEqual(sample(text, 'booky_http_requests_total', view=view, method='GET', status='200'), 2)
+        self.assertEqual(sample(text, 'booky_http_requests_total', view=view, method='GET', status='400'), 1)
+        self.assertEqual(sample(text, 'booky_http_requests_total', view='other', method='GET', status='404'), 1)
+        self.assertEqual(sample(text, 'booky_http_request_duration_seconds_count', view=view), 3)
+        self.assertEqual(sample(text, 'booky_http_request_duration_seconds_bucket', view=view, le='+Inf'), 3)
+        self.assertGreater(sample(text, 'booky_http_request_duration_seconds_sum', view=view), 0)
+        self.assertGreater(sample(text, 'booky_db_queries_total', view=view), 0)
+        self.assertGreater(sample(text, 'booky_db_query_duration_seconds_total', view=view), 0)
+        self.assertEqual(sample(text, 'booky_cache_requests_total', view=view, cache='availability', result='miss'), 1)
+        self.assertEqual(sample(text, 'booky_cache_requests_total', view=view, cache='availability', result='hit'), 1)
+        self.assertIn('# TYPE booky_http_request_duration_seconds histogram', text)
+
+        # Bucketi su kumulativni
+        buckets = [
+            sample(text, 'booky_http_request_duration_seconds_bucket', view=view, le=repr(bound))
+            for bound in metrics.DURATION_BUCKETS
+        ]
+        self.assertEqual(buckets, sorted(buckets))
+
+    def test_values_of_all_processes_are_summed(self):
+        self.client.get(reverse('booking:service-list'))
+        # Drugi gunicorn worker je već upisao svoj fajl
+        other = [['booky_http_requests_total', [['view', 'booking:service-list'], ['method', 'GET'], ['status', '200']], 5]]
+        with open(os.path.join(self.directory.name, f'{os.getpid() + 1}.json'), 'w') as handle:
+            json.dump(other, handle)
+
+        text = self.scrape()
+        self.assertEqual(
+            sample(text, 'booky_http_requests_total', view='booking:service-list', method='GET', status='200'), 6,
+        )
+
+        # Vlastite vrijednosti se ne broje dvaput ni kad je i naš fajl već upisan
+        self.assertTrue(metrics.flush())
+        self.assertEqual(
+            sample(self.scrape(), 'booky_http_requests_total', view='booking:service-list', method='GET', status='200'), 6,
+        )
+
+    def test_overhead_stays_within_budget(self):
+        middleware = metrics.MetricsMiddleware(lambda request: HttpResponse())
+        request = RequestFactory().get('/api/services/')
+        middleware(request)  # zagrijavanje
+        metrics.reset()
+
+        runs = 2000
+        started = time.perf_counter()
+        for _ in range(runs):
+            middleware(request)
+        total = time.perf_counter() - started
+
+        self.assertLess(total / runs, OVERHEAD_BUDGET)
+        # Middleware mjeri i sebe; to je samo dio gornjeg vremena
+        overhead = sample(metrics.render(), 'booky_metrics_overhead_seconds_total')
+        self.assertGreater(overhead, 0)
+        self.assertLess(overhead / runs, OVERHEAD_BUDGET)
+
+
+class TestRunMetricsDirTests(SimpleTestCase):
+    def test_test_run_does_not_write_to_the_real_metrics_dir(self):
+        # booking.tests.runner.TestRunner: drugi procesi ne vide metrike testova
+        self.assertNotEqual(settings.BOOKY_METRICS_DIR, project_settings.BOOKY_METRICS_DIR)
+        self.assertNotEqual(settings.BOOKY_PROFILE_DIR, project_settings.BOOKY_PROFILE_DIR)
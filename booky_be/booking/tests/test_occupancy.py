@@ -0,0 +1,122 @@
+from datetime import datetime, time, timedelta
+from importlib import import_module
+from types import SimpleNamespace
+from unittest import mock
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from booking.availability import occupancy
+from booking.models import BusinessHours, Reservation, Resource, ResourceSlotOccupancy, ServiceType
+from booking.tests.utils import LOCAL_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class ResourceSlotOccupancyTests(APITestCase):
+    def setUp(self):
+        self.staff_user = User.objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        self.service = ServiceType.objects.create(name='Test Service', duration_minutes=60)
+        self.resource = Resource.objects.create(name='Lift 1')
+        self.service.resources.add(self.resource)
+
+        self.test_date = timezone.localdate() + timedelta(days=1)
+        BusinessHours.objects.create(day_of_week=self.test_date.weekday(), open_time=time(8, 0), close_time=time(17, 0))
+        self.tz = timezone.get_current_timezone()
+
+    def create_via_api(self, hour):
+        response = self.client.post(reverse('booking:reservation-list-create'), {
+            'full_name': 'Occupancy User',
+            'phone': '000',
+            'email': 'occupancy@example.com',
+            'service': self.service.id,
+            'start_time': datetime.combine(self.test_date, time(hour, 0), tzinfo=self.tz).isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Reservation.objects.get(pk=response.data['id'])
+
+    def buckets(self, reservation):
+        return sorted(reservation.occupancy.values_list('date', 'bucket'))
+
+    def test_occupied_buckets_round_outwards(self):
+        start = datetime.combine(self.test_date, time(10, 2), tzinfo=self.tz)
+        buckets = list(occupancy.occupied_buckets(start, start + timedelta(minutes=30), self.tz))
+        self.assertEqual(buckets, [(self.test_date, b) for b in range(120, 127)])
+
+        overnight = datetime.combine(self.test_date, time(23, 50), tzinfo=self.tz)
+        buckets = list(occupancy.occupied_buckets(overnight, overnight + timedelta(minutes=20), self.tz))
+        self.assertEqual(buckets, [(self.test_date, 286), (self.test_date, 287), (self.test_date + timedelta(days=1), 0), (self.test_date + timedelta(days=1), 1)])
+
+    def test_migration_backfill_matches_live_algorithm(self):
+        # Migracija 0006 ima svoju kopiju bucket algoritma; mora dati iste redove
+        start = datetime.combine(self.test_date, time(9, 0), tzinfo=self.tz)
+        for offset, minutes in ((0, 60), (150, 7), (24 * 60 - 30, 90)):
+            Reservation.objects.create(
+                full_name='Backfill', service=self.service, resource=self.resource,
+                start_time=start + timedelta(minutes=offset, seconds=offset % 7),
+                end_time=start + timedelta(minutes=offset + minutes),
+            )
+        expected = set(ResourceSlotOccupancy.objects.values_list('reservation_id', 'resource_id', 'date', 'bucket'))
+        ResourceSlotOccupancy.objects.all().delete()
+
+        migration = import_module('booking.migrations.0006_resourceslotoccupancy')
+        with mock.patch.object(migration, 'BATCH_SIZE', 5):
+            migration.populate_occupancy(apps, SimpleNamespace(connection=connection))
+        self.assertEqual(
+            set(ResourceSlotOccupancy.objects.values_list('reservation_id', 'resource_id', 'date', 'bucket')), expected,
+        )
+
+    def test_create_update_delete_keep_table_in_sync(self):
+        reservation = self.create_via_api(10)
+        self.assertEqual(self.buckets(reservation), [(self.test_date, b) for b in range(120, 132)])
+
+        self.client.force_authenticate(self.staff_user)
+        detail_url = reverse('booking:reservation-detail', kwargs={'pk': reservation.pk})
+        new_start = datetime.combine(self.test_date, time(14, 0), tzinfo=self.tz)
+        response = self.client.patch(detail_url, {
+            'start_time': new_start.isoformat(),
+            'end_time': (new_start + timedelta(minutes=60)).isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.buckets(reservation), [(self.test_date, b) for b in range(168, 180)])
+
+        self.assertEqual(self.client.delete(detail_url).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(ResourceSlotOccupancy.objects.exists())
+
+    def test_availability_reads_occupancy_table(self):
+        self.create_via_api(10)
+        url = reverse('booking:availability')
+        # snapshot konfiguracije (4; unutar testne transakcije se ne dijeli) + zauzetost
+        with self.assertNumQueries(5):
+            response = self.client.get(url, {'service': self.service.id, 'date': self.test_date.isoformat()})
+        times = [slot['time'] for slot in response.data]
+        self.assertNotIn('10:00', times)
+        self.assertNotIn('09:30', times)
+        self.assertIn('11:00', times)
+
+    def test_check_and_rebuild_command(self):
+        reservation = self.create_via_api(10)
+        call_command('rebuild_occupancy', '--check', stdout=StringIO())
+
+        ResourceSlotOccupancy.objects.filter(reservation=reservation, bucket=125).delete()
+        Reservation.objects.filter(pk=reservation.pk).update(
+            start_time=reservation.start_time + timedelta(hours=2),
+            end_time=reservation.end_time + timedelta(hours=2),
+        )
+        self.assertEqual(occupancy.find_inconsistencies(), [reservation.pk])
+        with self.assertRaises(CommandError):
+            call_command('rebuild_occupancy', '--check', stdout=StringIO())
+
+        call_command('rebuild_occupancy', '--batch-size', '1', stdout=StringIO())
+        self.assertEqual(occupancy.find_inconsistencies(), [])
+        self.assertEqual(self.buckets(reservation), [(self.test_date, b) for b in range(144, 156)])
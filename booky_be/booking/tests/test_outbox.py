@@ -0,0 +1,191 @@
+from datetime import datetime, time, timedelta
+from io import StringIO
+from smtplib import SMTPException
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import OperationalError, transaction
+from django.db.models import QuerySet
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from booking import outbox
+from booking.models import BusinessHours, OutboundEmail, Reservation, Resource, ServiceType
+
+
+class CountingBackend(EmailBackend):
+    """locmem backend koji broji otvorene konekcije."""
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+
+class FailingBackend(EmailBackend):
+    """Odbija svaku poruku poslanu na fail@example.com."""
+
+    def send_messages(self, messages):
+        if any('fail@example.com' in message.to for message in messages):
+            raise SMTPException('550 mailbox unavailable')
+        return super().send_messages(messages)
+
+
+class BrokenServerBackend(EmailBackend):
+    def open(self):
+        raise ConnectionRefusedError('SMTP server down')
+
+
+def message(to='customer@example.com', subject='Hello'):
+    return EmailMessage(subject=subject, body='Body', from_email='booky@example.com', to=[to])
+
+
+class OutboxTests(TestCase):
+    def test_enqueue_is_part_of_the_transaction(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            outbox.enqueue(message())
+            raise RuntimeError('rollback')
+        self.assertFalse(OutboundEmail.objects.exists())
+
+        outbox.enqueue(message())
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.PENDING)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_roundtrip_keeps_html_and_attachments(self):
+        original = message()
+        original.content_subtype = 'html'
+        original.attach('reservation.ics', b'BEGIN:VCALENDAR\nEND:VCALENDAR', 'text/calendar')
+        outbox.enqueue(original)
+        outbox.drain()
+
+        sent = mail.outbox[0]
+        self.assertEqual(sent.content_subtype, 'html')
+        self.assertEqual(sent.attachments[0][0], 'reservation.ics')
+        self.assertEqual(sent.attachments[0][2], 'text/calendar')
+        self.assertIn('BEGIN:VCALENDAR', sent.attachments[0][1])
+
+    @override_settings(EMAIL_BACKEND='booking.tests.test_outbox.CountingBackend')
+    def test_drain_reuses_one_connection_per_batch(self):
+        CountingBackend.opened = 0
+        outbox.enqueue(*[message(subject=f'Mail {i}') for i in range(25)])
+
+        stats = outbox.drain(batch_size=10)
+        self.assertEqual(stats, {'sent': 25, 'retried': 0, 'dead': 0})
+        self.assertEqual(CountingBackend.opened, 3)
+        self.assertEqual([m.subject for m in mail.outbox], [f'Mail {i}' for i in range(25)])
+        self.assertEqual(OutboundEmail.objects.filter(status=OutboundEmail.SENT).count(), 25)
+
+    @override_settings(EMAIL_BACKEND='booking.tests.test_outbox.FailingBackend', BOOKY_OUTBOX_MAX_ATTEMPTS=3, BOOKY_OUTBOX_RETRY_DELAY=60)
+    def test_failures_back_off_and_dead_letter(self):
+        good, bad = outbox.enqueue(message(), message(to='fail@example.com'))
+
+        self.assertEqual(outbox.drain(), {'sent': 1, 'retried': 1, 'dead': 0})
+        bad.refresh_from_db()
+        self.assertEqual(bad.attempts, 1)
+        self.assertIn('550', bad.last_error)
+        first_retry = bad.next_attempt_at
+        self.assertGreater(first_retry, timezone.now() + timedelta(seconds=50))
+
+        # Nije još na redu: drain ne radi ništa
+        self.assertEqual(outbox.drain(), {'sent': 0, 'retried': 0, 'dead': 0})
+
+        OutboundEmail.objects.filter(pk=bad.pk).update(next_attempt_at=timezone.now())
+        outbox.drain()
+        bad.refresh_from_db()
+        self.assertEqual(bad.attempts, 2)
+        # Eksponencijalni backoff: drugi razmak je duplo duži
+        self.assertGreater(bad.next_attempt_at, timezone.now() + timedelta(seconds=110))
+
+        OutboundEmail.objects.filter(pk=bad.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(outbox.drain(), {'sent': 0, 'retried': 0, 'dead': 1})
+        bad.refresh_from_db()
+        self.assertEqual(bad.status, OutboundEmail.DEAD)
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(EMAIL_BACKEND='booking.tests.test_outbox.BrokenServerBackend')
+    def test_connection_failure_retries_whole_batch(self):
+        outbox.enqueue(message(), message())
+        self.assertEqual(outbox.drain(), {'sent': 0, 'retried': 2, 'dead': 0})
+        self.assertTrue(all('SMTP server down' in row.last_error for row in OutboundEmail.objects.all()))
+
+    def test_run_outbox_command(self):
+        outbox.enqueue(message())
+        out = StringIO()
+        call_command('run_outbox', stdout=out)
+        self.assertIn('1 sent', out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_worker_loop_survives_errors(self):
+        class Stop(Exception):
+            pass
+
+        rounds = [OperationalError('database is locked'), {'sent': 1, 'retried': 0, 'dead': 0}]
+        out = StringIO()
+        with mock.patch.object(outbox, 'drain', side_effect=rounds) as drain, \
+                mock.patch('booking.management.commands.run_outbox.time.sleep', side_effect=[None, Stop]), \
+                self.assertLogs('booking.management.commands.run_outbox', 'ERROR') as logs:
+            with self.assertRaises(Stop):
+                call_command('run_outbox', loop=True, stdout=out)
+        self.assertEqual(drain.call_count, 2)
+        self.assertIn('database is locked', logs.output[0])
+        self.assertIn('1 sent', out.getvalue())
+
+        # Bez --loop greška ide dalje (cron / ručno pokretanje vidi exit kod)
+        with mock.patch.object(outbox, 'drain', side_effect=OperationalError('database is locked')):
+            with self.assertRaises(OperationalError):
+                call_command('run_outbox', stdout=StringIO())
+
+
+class OutboxLockTests(TransactionTestCase):
+    """retry_on_lock radi samo izvan transakcije, kao u workeru."""
+
+    def test_locked_database_while_recording_outcome_is_retried(self):
+        outbox.enqueue(message())
+        real_bulk_update, calls = QuerySet.bulk_update, []
+
+        def flaky_bulk_update(queryset, *args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+            return real_bulk_update(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, 'bulk_update', flaky_bulk_update):
+            self.assertEqual(outbox.drain(), {'sent': 1, 'retried': 0, 'dead': 0})
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.SENT)
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class ReservationOutboxTests(APITestCase):
+    def setUp(self):
+        self.service = ServiceType.objects.create(name='Test Service', duration_minutes=30)
+        self.resource = Resource.objects.create(name='Lift 1')
+        self.service.resources.add(self.resource)
+        self.test_date = timezone.localdate() + timedelta(days=1)
+        BusinessHours.objects.create(day_of_week=self.test_date.weekday(), open_time=time(9, 0), close_time=time(17, 0))
+
+    def post(self):
+        return self.client.post(reverse('booking:reservation-list-create'), {
+            'full_name': 'Outbox User',
+            'phone': '000',
+            'email': 'outbox@example.com',
+            'service': self.service.id,
+            'start_time': timezone.make_aware(datetime.combine(self.test_date, time(10, 0))).isoformat(),
+        }, format='json')
+
+    def test_booking_enqueues_instead_of_sending(self):
+        self.assertEqual(self.post().status_code, status.HTTP_201_CREATED)
+        reservation = Reservation.objects.get()
+        self.assertEqual(reservation.emails.count(), 2)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_rejected_booking_enqueues_nothing(self):
+        self.assertEqual(self.post().status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.post().status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(OutboundEmail.objects.count(), 2)
@@ -0,0 +1,124 @@
+from datetime import datetime, time, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from booking.models import Location, Reservation, Resource, ServiceType
+from booking.tests.utils import LOCAL_CACHES
+from booking.views import ReservationListCreateAPIView
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class ReservationKeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.staff_user = User.objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        self.client.force_authenticate(self.staff_user)
+        self.url = reverse('booking:reservation-list-create')
+
+        location = Location.objects.create(name='Test Garage', address='Teststrasse 1')
+        self.services = [
+            ServiceType.objects.create(name=f'Service {i}', duration_minutes=30, location=location)
+            for i in range(3)
+        ]
+        self.resources = [Resource.objects.create(name=f'Lift {i}', location=location) for i in range(3)]
+        for service in self.services:
+            service.resources.add(*self.resources)
+
+        self.day = timezone.localdate() + timedelta(days=1)
+        # Po dvije rezervacije u istom terminu (na različitim liftovima): isti start_time, različit id
+        for i in range(12):
+            start = timezone.make_aware(datetime.combine(self.day, time(8, 0))) + timedelta(minutes=30 * (i // 2))
+            self.create(start, i)
+
+    def create(self, start, i):
+        return Reservation.objects.create(
+            full_name=f'Customer {i}', email=f'c{i}@example.com', phone='000',
+            service=self.services[i % 3], resource=self.resources[i % 2],
+            start_time=start, end_time=start + timedelta(minutes=30),
+        )
+
+    def walk(self, params):
+        names, url, pages = [], self.url, 0
+        response = self.client.get(url, params)
+        while True:
+            pages += 1
+            names += [row['full_name'] for row in response.data['results']]
+            if not response.data['next']:
+                return names, pages
+            response = self.client.get(response.data['next'])
+
+    def test_without_params_list_is_unpaginated(self):
+        response = self.client.get(self.url, {'period': 'all'})
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 12)
+
+    def test_pages_follow_start_time_then_id(self):
+        names, pages = self.walk({'period': 'all', 'page_size': 5})
+        expected = list(
+            Reservation.objects.order_by('start_time', 'id').values_list('full_name', flat=True)
+        )
+        self.assertEqual(names, expected)
+        self.assertEqual(pages, 3)
+
+    def test_concurrent_insert_does_not_shift_pages(self):
+        first = self.client.get(self.url, {'period': 'all', 'page_size': 4})
+        seen = [row['full_name'] for row in first.data['results']]
+
+        # Nova rezervacija ispred kursora ne smije pomaknuti sljedeću stranicu
+        early = timezone.make_aware(datetime.combine(self.day, time(7, 0)))
+        self.create(early, 99)
+
+        second = self.client.get(first.data['next'])
+        names = [row['full_name'] for row in second.data['results']]
+        self.assertFalse(set(names) & set(seen))
+        self.assertNotIn('Customer 99', names)
+        self.assertEqual(names, ['Customer 4', 'Customer 5', 'Customer 6', 'Customer 7'])
+
+    def test_past_pages_go_backwards_in_time(self):
+        Reservation.objects.all().delete()
+        past_day = timezone.localdate() - timedelta(days=3)
+        for i in range(25):
+            start = timezone.make_aware(datetime.combine(past_day, time(8, 0))) + timedelta(minutes=30 * i)
+            self.create(start, i)
+
+        # Bez paginacije ostaje stari limit od 20
+        self.assertEqual(len(self.client.get(self.url, {'period': 'past'}).data), 20)
+
+        names, _ = self.walk({'period': 'past', 'page_size': 10})
+        self.assertEqual(names, [f'Customer {i}' for i in reversed(range(25))])
+
+    def test_query_count_is_constant_for_any_page_size(self):
+        # Prvi poziv puni cache servisa/resursa (booking/listing.py): stranica + 3 upita
+        cache.clear()
+        with self.assertNumQueries(4):
+            self.client.get(self.url, {'period': 'all', 'page_size': 1})
+
+        # Nakon toga samo 1 upit za stranicu
+        for page_size in (1, 5, 12):
+            with self.assertNumQueries(1):
+                response = self.client.get(self.url, {'period': 'all', 'page_size': page_size})
+            self.assertEqual(len(response.data['results']), page_size)
+            row = response.data['results'][0]
+            self.assertEqual(sorted(row['service']['resources']), sorted(r.id for r in self.resources))
+            self.assertIn('name', row['resource'])
+
+        with self.assertNumQueries(1):
+            self.client.get(self.url, {'period': 'all'})
+
+    def test_list_reads_get_queryset(self):
+        view = ReservationListCreateAPIView
+        with mock.patch.object(view, 'get_queryset', autospec=True, side_effect=view.get_queryset) as get_queryset:
+            self.client.get(self.url, {'period': 'all', 'page_size': 5})
+            self.client.get(self.url, {'period': 'all'})
+        self.assertEqual(get_queryset.call_count, 2)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'period': 'all', 'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
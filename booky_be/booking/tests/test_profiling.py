@@ -0,0 +1,93 @@
+import tempfile
+from datetime import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from booking import profiling
+from booking.models import BusinessHours, Resource, ServiceType
+
+User = get_user_model()
+
+
+class ProfilingTests(APITestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        overrides = override_settings(BOOKY_PROFILE_DIR=self.directory.name, BOOKY_PROFILE_KEEP=3)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        BusinessHours.objects.create(day_of_week=0, open_time=time(8, 0), close_time=time(12, 0))
+        self.service = ServiceType.objects.create(name='Wash', duration_minutes=30)
+        self.service.resources.add(Resource.objects.create(name='Lift 1'))
+        self.staff = User.objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        self.url = reverse('booking:service-list')
+
+    def bearer(self, user):
+        return {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(user).access_token}'}
+
+    def test_staff_request_with_header_is_profiled(self):
+        response = self.client.get(self.url, HTTP_X_BOOKY_PROFILE='1', **self.bearer(self.staff))
+        self.assertEqual(response.status_code, 200)
+        summary = dict(part.split('=', 1) for part in response['X-Booky-Profile'].split('; '))
+        self.assertIn('sql=', response['X-Booky-Profile'])
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+        # Izvještaj je dostupan samo staffu
+        self.assertEqual(self.client.get(summary['url']).status_code, 401)
+        self.client.force_authenticate(self.staff)
+        report = self.client.get(summary['url']).data
+        self.assertEqual(report['id'], summary['id'])
+        self.assertEqual(report['path'], self.url)
+        self.assertEqual(report['status'], 200)
+        self.assertEqual(report['user'], 'staff@example.com')
+        self.assertEqual(report['sql']['count'], int(summary['sql']))
+        self.assertTrue(all('duration_ms' in statement for statement in report['sql']['statements']))
+        self.assertTrue(report['functions'])
+        self.assertTrue(any('views.py' in row['function'] for row in report['functions']))
+
+    def test_admin_session_counts_as_staff(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url, HTTP_X_BOOKY_PROFILE='1')
+        self.assertIn('X-Booky-Profile', response)
+
+    def test_anonymous_and_non_staff_are_never_profiled(self):
+        user = User.objects.create_user(email='user@example.com', password='pass')
+        for headers in ({}, self.bearer(user), {'HTTP_AUTHORIZATION': 'Bearer invalid'}):
+            with self.subTest(headers=headers), mock.patch('cProfile.Profile') as profile:
+                response = self.client.get(self.url, HTTP_X_BOOKY_PROFILE='1', **headers)
+                self.assertNotIn('X-Booky-Profile', response)
+                profile.assert_not_called()
+
+    def test_without_header_nothing_happens(self):
+        with mock.patch.object(profiling, 'staff_user') as staff_user:
+            response = self.client.get(self.url, **self.bearer(self.staff))
+        self.assertNotIn('X-Booky-Profile', response)
+        staff_user.assert_not_called()
+
+    def test_duplicate_and_similar_queries(self):
+        statements = [
+            {'sql': 'SELECT a WHERE id = %s', 'params': '(1,)', 'duration_ms': 1.0},
+            {'sql': 'SELECT a WHERE id = %s', 'params': '(1,)', 'duration_ms': 2.0},
+            {'sql': 'SELECT a WHERE id = %s', 'params': '(2,)', 'duration_ms': 1.0},
+            {'sql': 'SELECT b', 'params': '()', 'duration_ms': 5.0},
+        ]
+        duplicates, similar = profiling.duplicate_queries(statements)
+        self.assertEqual(duplicates, [{'sql': 'SELECT a WHERE id = %s', 'params': '(1,)', 'count': 2, 'total_ms': 3.0}])
+        self.assertEqual(similar, [{'sql': 'SELECT a WHERE id = %s', 'count': 3, 'total_ms': 4.0}])
+
+    def test_only_newest_reports_are_kept(self):
+        ids = []
+        for _ in range(5):
+            response = self.client.get(self.url, HTTP_X_BOOKY_PROFILE='1', **self.bearer(self.staff))
+            ids.append(response['X-Booky-Profile'].split(';')[0].removeprefix('id='))
+        self.assertEqual(sum(profiling.load(profile_id) is not None for profile_id in ids), 3)
+
+        self.client.force_authenticate(self.staff)
+        missing = reverse('booking:profile-detail', args=['00000000-0000-0000-0000-000000000000'])
+        self.assertEqual(self.client.get(missing).status_code, 404)
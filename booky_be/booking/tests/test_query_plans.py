@@ -0,0 +1,53 @@
+from datetime import datetime, time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from booking.management.commands.explain_hot_queries import full_scans
+from booking.models import Reservation, Resource, ServiceType
+from booking.queries import filter_by_period
+
+
+class HotQueryPlanTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command('explain_hot_queries', stdout=out)
+        self.assertIn('All hot queries use an index.', out.getvalue())
+
+    def test_full_scan_detection(self):
+        tables = {'booking_reservation'}
+        self.assertEqual(full_scans('2 0 0 SCAN booking_reservation', 'sqlite', tables), ['booking_reservation'])
+        self.assertEqual(full_scans('2 0 0 SCAN TABLE booking_reservation', 'sqlite', tables), ['booking_reservation'])
+        self.assertEqual(full_scans('4 0 0 SCAN booking_reservation USING INDEX reservation_pending_idx', 'sqlite', tables), [])
+        self.assertEqual(full_scans('2 0 0 SCAN CONSTANT ROW', 'sqlite', tables), [])
+        self.assertEqual(full_scans('Seq Scan on booking_reservation  (cost=0.00..1.01 rows=1)', 'postgresql', tables), ['booking_reservation'])
+
+
+class PeriodRangeBoundaryTests(TestCase):
+    """Range predikati moraju dati iste granice kao stari start_time__date filteri."""
+
+    def setUp(self):
+        self.service = ServiceType.objects.create(name='Test Service', duration_minutes=30)
+        self.resource = Resource.objects.create(name='Test Resource')
+        self.today = timezone.localdate()
+
+    def create(self, name, day, at):
+        start = timezone.make_aware(datetime.combine(day, at))
+        Reservation.objects.create(service=self.service, resource=self.resource, full_name=name, start_time=start, end_time=start + timedelta(minutes=30))
+
+    def names(self, period):
+        return {r.full_name for r in filter_by_period(Reservation.objects.all(), period, self.today)}
+
+    def test_boundaries_follow_local_days(self):
+        self.create('Yesterday late', self.today - timedelta(days=1), time(23, 29))
+        self.create('Today first', self.today, time(0, 0))
+        self.create('Today last', self.today, time(23, 29))
+        self.create('3w last day', self.today + timedelta(weeks=3), time(23, 29))
+        self.create('3w + 1', self.today + timedelta(weeks=3, days=1), time(0, 0))
+
+        self.assertEqual(self.names('today'), {'Today first', 'Today last'})
+        self.assertEqual(self.names('3w'), {'Today first', 'Today last', '3w last day'})
+        self.assertEqual(self.names('past'), {'Yesterday late'})
+        self.assertEqual(self.names('all'), {'Today first', 'Today last', '3w last day', '3w + 1'})
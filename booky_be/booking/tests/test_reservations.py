@@ -1,3 +1,6 @@
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -8,6 +11,7 @@ from django.utils import timezone
 from django.core import mail
 from datetime import timedelta
 from .utils import *
+from booking import config_version, outbox
 
 User = get_user_model()
 
@@ -141,6 +145,7 @@ class BookingLogicTests(APITestCase):
         create_response = self.client.post(self.reservations_url, reservation_data, format='json')
         self.assertEqual(create_response.status_code, status.HTTP_201_CREATED)
 
+        outbox.drain()
         mail.outbox = []
 
         reservation = Reservation.objects.get(email="approve.user@test.com")
@@ -152,6 +157,7 @@ class BookingLogicTests(APITestCase):
         reservation.refresh_from_db()
         self.assertTrue(reservation.is_approved)
 
+        outbox.drain()
         self.assertEqual(len(mail.outbox), 1)
         approval_email = mail.outbox[0]
         self.assertEqual(approval_email.to, ["approve.user@test.com"])
@@ -179,7 +185,23 @@ class BookingLogicTests(APITestCase):
         expected_end_time = start_time + timedelta(minutes=self.service.duration_minutes)
         self.assertEqual(created_reservation.end_time, expected_end_time)
 
-    
+    def test_booking_transaction_does_not_write_to_the_cache(self):
+        """Invalidacija (availability, feedovi) piše u database cache tek nakon commita."""
+        start_time = timezone.make_aware(datetime.combine(self.test_date, time(10, 0)))
+        data = {'full_name': 'Cache User', 'email': 'c@test.com', 'phone': '1', 'service': self.service.pk, 'start_time': start_time.isoformat()}
+
+        config_version.current()  # prazan cache jednom upiše verziju konfiguracije
+        with self.captureOnCommitCallbacks() as callbacks, CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.reservations_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        cache_table = settings.CACHES['default']['LOCATION']
+        writes = [
+            query['sql'] for query in queries.captured_queries
+            if cache_table in query['sql'] and not query['sql'].lstrip().upper().startswith('SELECT')
+        ]
+        self.assertEqual(writes, [])
+        self.assertTrue(callbacks)
+
     def test_all_resources_busy_block_slot(self):
         slot_start = timezone.now().replace(hour=8, minute=0, second=0, microsecond=0)
         slot_end = slot_start + timedelta(minutes=self.service.duration_minutes)
@@ -0,0 +1,111 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from booking import search
+from booking.models import ArchivedReservation, Reservation, Resource, ServiceType
+
+User = get_user_model()
+
+
+class NormalizationTests(TestCase):
+    def test_normalizers(self):
+        self.assertEqual(search.normalize_name('  Miloš   Stanković '), 'milos stankovic')
+        self.assertEqual(search.normalize_name('Đorđe Weiß'), 'djordje weiss')
+        self.assertEqual(search.normalize_name('Élise Müller'), 'elise muller')
+        self.assertEqual(search.normalize_phone('+41 76 123 45 67'), '41761234567')
+        self.assertEqual(search.normalize_plate('zh-123 45'), 'ZH12345')
+        self.assertEqual(search.normalize_plate('ZH.12'), 'ZH12')
+        self.assertEqual(search.prefix_range('ZH12'), ('ZH12', 'ZH13'))
+
+
+class ReservationSearchTests(TestCase):
+    def setUp(self):
+        self.service = ServiceType.objects.create(name='Test Service', duration_minutes=30)
+        self.resource = Resource.objects.create(name='Lift 1')
+        self.start = timezone.make_aware(datetime.combine(timezone.localdate() + timedelta(days=1), time(8, 0)))
+        self.count = 0
+
+    def create(self, full_name, phone='', email='someone@example.com', plate=''):
+        start = self.start + timedelta(minutes=30 * self.count)
+        self.count += 1
+        return Reservation.objects.create(
+            full_name=full_name, phone=phone, email=email, license_plate=plate,
+            service=self.service, resource=self.resource, start_time=start, end_time=start + timedelta(minutes=30),
+        )
+
+    def names(self, query):
+        return sorted(search.search_reservations(Reservation.objects.all(), query).values_list('full_name', flat=True))
+
+    def test_fts_index_is_used_on_sqlite(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('FTS5 is SQLite-specific')
+        for model in (Reservation, ArchivedReservation):
+            self.assertTrue(search.fts_available(search.fts_table(model)))
+
+    def test_save_fills_search_columns(self):
+        reservation = self.create('Jelena Ilić', phone='+41 79 555 12 34', plate='sg 4711')
+        self.assertEqual(
+            (reservation.search_name, reservation.search_phone, reservation.search_plate),
+            ('jelena ilic', '41795551234', 'SG4711'),
+        )
+
+    def test_search_columns_fit_when_normalization_lengthens(self):
+        # 'ß' -> 'ss': ime od 100 znakova bi inače prešlo max_length (DataError na Postgresu)
+        reservation = self.create('ß' * 100, plate='ß' * 20)
+        self.assertEqual(reservation.search_name, 'ss' * 50)
+        self.assertEqual(reservation.search_plate, 'SS' * 10)
+
+    def test_matches_each_column_in_normalized_form(self):
+        self.create('Johann Müller', phone='+41 76 123 45 67', email='johann@mail.ch', plate='ZH-123456')
+        self.create('Luca Bianchi', phone='+41 78 999 00 11', email='luca@testmail.ch', plate='TI 5555')
+
+        self.assertEqual(self.names('muller'), ['Johann Müller'])
+        self.assertEqual(self.names('MÜLL'), ['Johann Müller'])
+        self.assertEqual(self.names('76 123'), ['Johann Müller'])
+        self.assertEqual(self.names('zh 1234'), ['Johann Müller'])
+        self.assertEqual(self.names('ti-55'), ['Luca Bianchi'])
+        self.assertEqual(self.names('testmail'), ['Luca Bianchi'])
+        self.assertEqual(self.names('.ch'), ['Johann Müller', 'Luca Bianchi'])
+        self.assertEqual(self.names('nobody'), [])
+
+    def test_short_terms_fall_back_to_like(self):
+        self.create('Ana Jovanović', plate='BE 12')
+        self.create('Hugo Renault', plate='GE 99')
+        self.assertEqual(self.names('BE'), ['Ana Jovanović'])
+        self.assertEqual(self.names('ov'), ['Ana Jovanović'])
+
+    def test_index_follows_updates_and_deletes(self):
+        reservation = self.create('Marko Petrović', plate='ZH 1')
+        reservation.full_name = 'Marko Nikolić'
+        reservation.license_plate = 'AG 777'
+        reservation.save()
+
+        self.assertEqual(self.names('petrov'), [])
+        self.assertEqual(self.names('nikol'), ['Marko Nikolić'])
+        self.assertEqual(self.names('AG777'), ['Marko Nikolić'])
+
+        reservation.delete()
+        self.assertEqual(self.names('nikol'), [])
+
+
+class ReservationSearchAPITests(APITestCase):
+    def test_search_param_uses_search_subsystem(self):
+        self.client.force_authenticate(User.objects.create_user(email='staff@example.com', password='pass', is_staff=True))
+        service = ServiceType.objects.create(name='Test Service', duration_minutes=30)
+        resource = Resource.objects.create(name='Lift 1')
+        start = timezone.make_aware(datetime.combine(timezone.localdate() + timedelta(days=1), time(8, 0)))
+        Reservation.objects.create(
+            full_name='Élise Martin', phone='000', email='elise@example.ch', license_plate='VD-4242',
+            service=service, resource=resource, start_time=start, end_time=start + timedelta(minutes=30),
+        )
+
+        response = self.client.get(reverse('booking:reservation-list-create'), {'period': 'all', 'search': 'elise mar'})
+        self.assertEqual([row['full_name'] for row in response.data], ['Élise Martin'])
+        response = self.client.get(reverse('booking:reservation-list-create'), {'period': 'all', 'search': 'vd 42'})
+        self.assertEqual(len(response.data), 1)
@@ -0,0 +1,85 @@
+from datetime import datetime, time, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from booking.availability import occupancy
+from booking.models import BusinessHours, OutboundEmail, Reservation, Resource, ResourceSlotOccupancy, ServiceType
+from booking.search import normalize_name
+
+
+class SeedReservationsTests(TestCase):
+    def setUp(self):
+        for dow in range(5):
+            BusinessHours.objects.create(day_of_week=dow, open_time=time(8, 0), close_time=time(12, 0))
+        lifts = [Resource.objects.create(name=f'Lift {i}') for i in range(3)]
+        ServiceType.objects.create(name='Wheel change', duration_minutes=30).resources.add(*lifts)
+        ServiceType.objects.create(name='Service', duration_minutes=90).resources.add(*lifts[:2])
+
+        # Postojeća rezervacija: seed je ne smije preklopiti
+        start = timezone.make_aware(datetime.combine(self.next_weekday(), time(9, 0)))
+        self.existing = Reservation.objects.create(
+            full_name='Ana', phone='000', email='ana@example.com', service=ServiceType.objects.first(),
+            resource=lifts[0], start_time=start, end_time=start + timedelta(hours=3),
+        )
+
+    def next_weekday(self):
+        day = timezone.localdate() + timedelta(days=1)
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        return day
+
+    def seed(self, number, seed):
+        call_command('seed_reservations', number=number, seed=seed, stdout=StringIO())
+        return list(
+            Reservation.objects.exclude(pk=self.existing.pk)
+                               .order_by('start_time', 'resource_id')
+                               .values_list('resource_id', 'start_time', 'end_time', 'full_name', 'license_plate')
+        )
+
+    def test_same_seed_same_reservations(self):
+        first = self.seed(150, seed=7)
+        self.assertEqual(len(first), 150)
+        Reservation.objects.exclude(pk=self.existing.pk).delete()
+        self.assertEqual(self.seed(150, seed=7), first)
+        Reservation.objects.exclude(pk=self.existing.pk).delete()
+        self.assertNotEqual(self.seed(150, seed=8), first)
+
+    def test_no_overlaps_working_hours_and_derived_data(self):
+        self.seed(400, seed=1)  # ne stane u default horizont: produžava se unazad
+
+        by_resource = {}
+        for reservation in Reservation.objects.order_by('resource_id', 'start_time'):
+            previous = by_resource.get(reservation.resource_id)
+            if previous:
+                self.assertLessEqual(previous.end_time, reservation.start_time)
+            by_resource[reservation.resource_id] = reservation
+
+            local = timezone.localtime(reservation.start_time)
+            self.assertLess(local.weekday(), 5)
+            self.assertGreaterEqual(local.time(), time(8, 0))
+            self.assertLessEqual(timezone.localtime(reservation.end_time).time(), time(12, 0))
+            self.assertIn(reservation.resource, reservation.service.resources.all())
+            self.assertEqual(reservation.search_name, normalize_name(reservation.full_name))
+
+        self.assertEqual(occupancy.find_inconsistencies(), [])
+
+    def test_delete_is_one_bulk_statement_per_table(self):
+        self.seed(60, seed=3)
+        OutboundEmail.objects.create(reservation=self.existing, subject='Hi', body='', from_email='a@b.c', to=['ana@example.com'])
+
+        out = StringIO()
+        with mock.patch('booking.signals.feeds.touch') as touch, \
+                mock.patch('booking.management.commands.seed_reservations.availability_cache.invalidate_all') as invalidate_all:
+            call_command('seed_reservations', delete=True, stdout=out)
+        self.assertIn('61', out.getvalue())
+        touch.assert_not_called()  # nijedan post_delete signal po redu
+        invalidate_all.assert_called_once()
+
+        self.assertFalse(Reservation.objects.exists())
+        self.assertFalse(ResourceSlotOccupancy.objects.exists())
+        self.assertIsNone(OutboundEmail.objects.get().reservation_id)
+
@@ -0,0 +1,119 @@
+import itertools
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from booking import search
+from booking.migrations import _sqlite_triggers
+from booking.models import ArchivedReservation, Reservation
+
+ALIASES = (f'sqlite_setup_{n}' for n in itertools.count())
+
+
+class SqliteConnectionSetupTests(SimpleTestCase):
+    """configure_sqlite (booking/db.py) na novoj konekciji na SQLite fajl."""
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite-specific connection setup')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'setup.sqlite3')
+
+    def connect(self):
+        # Test baza je in-memory (journal_mode je tamo uvijek 'memory'), pa zasebna konekcija na fajl
+        default = connections[DEFAULT_DB_ALIAS]
+        wrapper = type(default)({**default.settings_dict, 'NAME': self.path}, alias=next(ALIASES))
+        connections[wrapper.alias] = wrapper  # za transaction.atomic(using=...)
+        self.addCleanup(connections.__delitem__, wrapper.alias)
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_default_pragmas_are_applied(self):
+        wrapper = self.connect()
+        self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 5000)
+        self.assertEqual(self.pragma(wrapper, 'cache_size'), -20000)
+        self.assertEqual(self.pragma(wrapper, 'temp_store'), 2)  # MEMORY
+        self.assertEqual(self.pragma(wrapper, 'mmap_size'), 128 * 1024 * 1024)
+        # journal_mode je trajan u fajlu: bez SQLITE_JOURNAL_MODE se ne dira
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'delete')
+        self.assertEqual(self.pragma(wrapper, 'synchronous'), 2)  # FULL
+
+    def test_wal_is_opt_in(self):
+        pragmas = {**settings.BOOKY_SQLITE_PRAGMAS, 'journal_mode': 'WAL', 'synchronous': 'NORMAL'}
+        with override_settings(BOOKY_SQLITE_PRAGMAS=pragmas):
+            wrapper = self.connect()
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)  # NORMAL
+
+    def test_pragmas_are_configurable_and_empty_ones_skipped(self):
+        with override_settings(BOOKY_SQLITE_PRAGMAS={'journal_mode': '', 'cache_size': '-1000'}):
+            wrapper = self.connect()
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'delete')
+        self.assertEqual(self.pragma(wrapper, 'cache_size'), -1000)
+
+    def test_invalid_pragma_is_rejected(self):
+        for pragmas in ({'journal_mode': 'WAL; DROP TABLE x'}, {'cache size': '1'}):
+            with self.subTest(pragmas=pragmas), override_settings(BOOKY_SQLITE_PRAGMAS=pragmas):
+                with self.assertRaises(ImproperlyConfigured):
+                    self.connect()
+
+    def test_atomic_begins_immediate(self):
+        for mode, begin in (('IMMEDIATE', 'BEGIN IMMEDIATE'), ('', 'BEGIN')):
+            statements = []
+
+            def record(execute, sql, params, many, context):
+                statements.append(sql)
+                return execute(sql, params, many, context)
+
+            with self.subTest(mode=mode), override_settings(BOOKY_SQLITE_TRANSACTION_MODE=mode):
+                wrapper = self.connect()
+                with wrapper.execute_wrapper(record), transaction.atomic(using=wrapper.alias):
+                    pass
+                self.assertEqual(statements[:1], [begin])
+                wrapper.close()
+
+        with override_settings(BOOKY_SQLITE_TRANSACTION_MODE='SOMETIMES'):
+            with self.assertRaises(ImproperlyConfigured):
+                self.connect()
+
+
+class MigratedTriggerTests(TestCase):
+    """
+    Triggers from booking/migrations/_sqlite_triggers.py are not in migration
+    state, and a table remake on SQLite drops them; this fails if a migration
+    forgets to call `_sqlite_triggers.reinstall` afterwards.
+    """
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite triggers')
+
+    def triggers(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s", [table])
+            return {name for (name,) in cursor.fetchall()}
+
+    def test_overlap_triggers_exist(self):
+        name = _sqlite_triggers.OVERLAP_NAME
+        self.assertLessEqual({f'{name}_insert', f'{name}_update'}, self.triggers(Reservation._meta.db_table))
+
+    def test_search_index_triggers_exist(self):
+        for model in (Reservation, ArchivedReservation):
+            table = search.fts_table(model)
+            if not search.fts_available(table):
+                continue  # SQLite bez FTS5/trigram: migracije ga preskaču
+            with self.subTest(table=table):
+                self.assertLessEqual(
+                    {f'{table}_ai', f'{table}_ad', f'{table}_au'}, self.triggers(model._meta.db_table),
+                )
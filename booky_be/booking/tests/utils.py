@@ -1,6 +1,11 @@
 # booking/utils.py
 
+from contextlib import contextmanager
 from datetime import timedelta
+
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+
 from booking.models import Reservation
 
 def is_slot_available(service, start_time):
@@ -26,3 +31,37 @@ def is_resource_available(service, resource, start_time):
 
 
 
+
+
+# Default cache je DatabaseCache (dijeljen između workera). Testovi koji broje
+# upite (assertNumQueries) ili pucaju paralelnim threadovima koriste LocMem:
+# DatabaseCache dodaje svoj upit za svaki cache get/set, a in-memory testna baza
+# (shared cache) odmah javlja "table is locked" umjesto da čeka.
+LOCAL_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'booky-tests',
+    }
+}
+
+
+@contextmanager
+def sqlite_file_database(path):
+    """
+    Points the default database (also for connections that other threads
+    open) at a freshly migrated SQLite file for the duration of the block.
+    Unlike the shared-cache in-memory test database, a file waits for locks
+    (busy_timeout, BEGIN IMMEDIATE) the way production does.
+    """
+    connection = connections[DEFAULT_DB_ALIAS]
+    memory_name, memory_connection = connection.settings_dict['NAME'], connection.connection
+    # Ne zatvaramo in-memory konekciju: zatvaranje bi obrisalo testnu bazu
+    connection.connection = None
+    connection.settings_dict['NAME'] = path
+    try:
+        call_command('migrate', verbosity=0, interactive=False)
+        yield
+    finally:
+        connection.close()
+        connection.settings_dict['NAME'] = memory_name
+        connection.connection = memory_connection
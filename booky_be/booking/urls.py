@@ -2,11 +2,18 @@ from django.urls import path
 from .views import (
     ServiceTypeListAPIView,
     AvailabilityAPIView,
+    AvailabilityRangeAPIView,
+    AvailabilityCacheStatsView,
     ReservationListCreateAPIView,
     ReservationDetailView,
+    ReservationBulkActionView,
+    ReservationExportView,
     HolidayViewSet,
     LoginAPIView,
     DisabledDatesView,
+    CalendarFeedView,
+    MetricsView,
+    ProfileReportView,
 )
 
 
@@ -15,10 +22,17 @@ app_name = 'booking'
 urlpatterns = [
     path('services/', ServiceTypeListAPIView.as_view(), name='service-list'),
     path('availability/', AvailabilityAPIView.as_view(), name='availability'),
+    path('availability/range/', AvailabilityRangeAPIView.as_view(), name='availability-range'),
+    path('availability/cache-stats/', AvailabilityCacheStatsView.as_view(), name='availability-cache-stats'),
     path('reservations/', ReservationListCreateAPIView.as_view(), name='reservation-list-create'),
     path('reservations/<int:pk>/', ReservationDetailView.as_view(), name='reservation-detail'),
+    path('reservations/bulk/', ReservationBulkActionView.as_view(), name='reservation-bulk'),
+    path('reservations/export/', ReservationExportView.as_view(), name='reservation-export'),
     path('holidays/', HolidayViewSet.as_view({'get': 'list', 'post': 'create'}), name='holiday-list-create'),
     path('holidays/<int:pk>/', HolidayViewSet.as_view({'get': 'retrieve', 'delete': 'destroy'}), name='holiday-detail'),
     path('auth/login/', LoginAPIView.as_view(), name='token_obtain_pair'),
     path('disabled-dates/', DisabledDatesView.as_view(), name='disabled-dates'),
+    path('calendar/<str:token>.ics', CalendarFeedView.as_view(), name='calendar-feed'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    path('debug/profiles/<uuid:profile_id>/', ProfileReportView.as_view(), name='profile-detail'),
 ]
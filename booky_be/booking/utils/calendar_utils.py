@@ -1,26 +1,101 @@
 # calendar_utils.py
+"""
+iCalendar (RFC 5545) helpers: the .ics email attachment and the subscribable
+feeds in booking/feeds.py share them.
+"""
+from datetime import timezone as dt_timezone
 from io import BytesIO
 
+CRLF = '\r\n'
+PRODID = '-//Booky//EN'
+MAX_LINE_OCTETS = 75
+
+
+def ics_datetime(value):
+    """UTC form (YYYYMMDDTHHMMSSZ): calendar apps convert it to their own timezone."""
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def escape_text(value):
+    """Escapes a TEXT value (backslash, ';', ',' and newlines)."""
+    return (
+        (value or '')
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """
+    Folds a content line to at most 75 octets per physical line (CRLF + space
+    before each continuation), never splitting a UTF-8 character.
+    """
+    if len(line.encode('utf-8')) <= MAX_LINE_OCTETS:
+        return line
+    parts, current, size, limit = [], [], 0, MAX_LINE_OCTETS
+    for char in line:
+        octets = len(char.encode('utf-8'))
+        if size + octets > limit:
+            parts.append(''.join(current))
+            # Nastavak počinje razmakom, koji se broji u 75 okteta
+            current, size, limit = [], 0, MAX_LINE_OCTETS - 1
+        current.append(char)
+        size += octets
+    parts.append(''.join(current))
+    return (CRLF + ' ').join(parts)
+
+
+def content_lines(properties):
+    """[(name, value), ...] -> folded lines, each ending with CRLF."""
+    return ''.join(fold(f'{name}:{value}') + CRLF for name, value in properties)
+
+
+def vevent(uid, dtstamp, start, end, summary, description='', location='', status=None):
+    properties = [
+        ('BEGIN', 'VEVENT'),
+        ('UID', uid),
+        ('DTSTAMP', ics_datetime(dtstamp)),
+        ('DTSTART', ics_datetime(start)),
+        ('DTEND', ics_datetime(end)),
+        ('SUMMARY', escape_text(summary)),
+    ]
+    if description:
+        properties.append(('DESCRIPTION', escape_text(description)))
+    if location:
+        properties.append(('LOCATION', escape_text(location)))
+    if status:
+        properties.append(('STATUS', status))
+    properties.append(('END', 'VEVENT'))
+    return content_lines(properties)
+
+
+def reservation_uid(reservation_id):
+    """Stable UID: an event keeps it across updates, so calendar apps update instead of duplicating."""
+    return f'reservation-{reservation_id}@booky'
+
+
 def generate_ics_file(reservation):
     """
     Vraća .ics fajl kao BytesIO objekat za attach u email.
     """
-    start = reservation.start_time.strftime('%Y%m%dT%H%M%S')
-    end = reservation.end_time.strftime('%Y%m%dT%H%M%S')
     summary = reservation.service.name_en or reservation.service.name
 
-    ics_content = f"""BEGIN:VCALENDAR
-VERSION:2.0
-PRODID:-//Booky//EN
-BEGIN:VEVENT
-SUMMARY:{summary}
-DTSTART:{start}
-DTEND:{end}
-DESCRIPTION:Reservation for {reservation.full_name}, {reservation.license_plate}
-LOCATION:Schmidicars Zurich
-END:VEVENT
-END:VCALENDAR
-""".strip()
+    ics_content = (
+        content_lines([('BEGIN', 'VCALENDAR'), ('VERSION', '2.0'), ('PRODID', PRODID)])
+        + vevent(
+            uid=reservation_uid(reservation.pk),
+            dtstamp=reservation.created_at or reservation.start_time,
+            start=reservation.start_time,
+            end=reservation.end_time,
+            summary=summary,
+            description=f"Reservation for {reservation.full_name}, {reservation.license_plate}",
+            location='Schmidicars Zurich',
+        )
+        + content_lines([('END', 'VCALENDAR')])
+    )
 
     buffer = BytesIO()
     buffer.write(ics_content.encode('utf-8'))
@@ -1,17 +1,20 @@
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from django.conf import settings
 from django.core.cache import cache
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from datetime import datetime, time, timedelta
-from django.db.models import Q
 from rest_framework import serializers
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework.permissions import IsAuthenticated
-from .models import ServiceType, Reservation, Resource, BusinessHours, Holiday
+from .models import ServiceType, Reservation, ArchivedReservation, Resource, BusinessHours, Holiday, OutboundEmail, CalendarFeed
 from .serializers import (
     ServiceTypeSerializer, 
     ReservationSerializer,
@@ -19,13 +22,26 @@ from .serializers import (
     HolidaySerializer,
     MyTokenObtainPairSerializer,
     DisabledDatesSerializer,
+    CompactDisabledDatesSerializer,
+    ReservationBulkActionSerializer,
 )
-from django.core.mail import send_mail
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly, IsAdminUser, AllowAny, BasePermission
-from booking.utils.calendar_utils import generate_ics_file
-from booking.utils.email_templates import email_templates
-from django.core.mail import EmailMessage
+from booking.availability import cache as availability_cache
+from booking.availability import occupancy
+from booking.availability import disabled_dates
+from booking import archive, config_snapshot, metrics, profiling
+from booking.availability.engine import slots_for_minute_periods
+from booking.availability.window import MAX_RANGE_DAYS, availability_for_range
+from booking.allocation import allocate, is_overlap_violation
+from booking.pagination import KeysetPagination
+from booking.queries import filter_by_period, local_midnight
+from booking.search import search_reservations
+from booking.listing import EXPORT_FIELDS, ROW_FIELDS, export_rows, reservation_rows
+from booking.renderers import CSVRenderer, FastJSONRenderer, NDJSONRenderer
+from rest_framework.renderers import BrowsableAPIRenderer
+from booking import emails, feeds, outbox
+from booking.conditional import ConfigConditionalGetMixin
 
 
 class IsAdminOrCreateOnly(BasePermission):
@@ -43,7 +59,7 @@ class LoginAPIView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
 
 
-class ServiceTypeListAPIView(generics.ListAPIView):
+class ServiceTypeListAPIView(ConfigConditionalGetMixin, generics.ListAPIView):
     """Lists all available service types."""
     permission_classes = [AllowAny]
     queryset = ServiceType.objects.all()
@@ -77,97 +93,185 @@ class AvailabilityAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # Keširamo samo buduće dane; današnji rezultat ovisi o trenutnom vremenu (sada + 1h)
+        cacheable = service_id.isdigit() and date_obj > timezone.localdate()
+        if cacheable:
+            cached_slots = availability_cache.get_slots(int(service_id), date_obj)
+            if cached_slots is not None:
+                return Response(cached_slots, status=status.HTTP_200_OK, headers={'X-Cache': 'HIT'})
+
+        response = self.compute_slots(service_id, date_obj)
+        if cacheable and response.status_code == status.HTTP_200_OK:
+            availability_cache.set_slots(int(service_id), date_obj, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def compute_slots(self, service_id, date_obj):
+        # Praznici, radno vrijeme i resursi servisa dolaze iz snapshota konfiguracije
+        snapshot = config_snapshot.get()
+
         # 3. Ako je praznik, nema termina (return prazna lista)
-        if Holiday.objects.filter(date=date_obj).exists():
+        if snapshot.is_holiday(date_obj):
             return Response([], status=status.HTTP_200_OK)
 
         # 4. Provjeri servis i dan u sedmici
         try:
-            service = get_object_or_404(ServiceType, pk=service_id)
-            day_of_week = date_obj.weekday()
-        except (ValueError, ServiceType.DoesNotExist):
+            service = snapshot.services[int(service_id)]
+        except (ValueError, KeyError):
             return Response(
                 {"error": "Invalid service ID or date format."},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # 5. Dohvati SVE periode za taj dan (može biti više za radne dane s pauzom!)
-        business_hours_list = BusinessHours.objects.filter(day_of_week=day_of_week).order_by('open_time')
-        if not business_hours_list.exists():
+        # 5. SVI periodi za taj dan (može biti više za radne dane s pauzom!)
+        periods = snapshot.periods[date_obj.weekday()]
+        if not periods:
             # Neradni dan (npr. vikend) ili nije definisano radno vrijeme
             return Response([], status=status.HTTP_200_OK)
 
-        # 6. Pripremi timezone-aware interval za cijeli dan
-        tz = timezone.get_current_timezone()
-        start_of_day = datetime.combine(date_obj, time.min, tzinfo=tz)
-        end_of_day = datetime.combine(date_obj, time.max, tzinfo=tz)
-
-        # 7. Nađi sve resurse koji su povezani s ovim servisom
-        service_resources = list(Resource.objects.filter(services=service))
-        if not service_resources:
+        # 6. Resursi koji su povezani s ovim servisom
+        if not service.resource_ids:
             return Response(
                 {"error": "No resources are configured for this specific service."},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        total_resources = len(service_resources)
-
-        # 8. Nađi sve rezervacije za te resurse u datom danu
-        existing_reservations = Reservation.objects.filter(
-            resource__in=service_resources,
-            start_time__lt=end_of_day,
-            end_time__gt=start_of_day
-        ).select_related('resource')
-
-        # 9. Definiši trajanje servisa i korak za generisanje slotova
-        service_duration = timedelta(minutes=service.duration_minutes)
-        step = timedelta(minutes=30)  # Svaki slot počinje na 30min razmaka (možeš mijenjati)
-
-        available_slots = []  # Lista svih slotova koji će se vratiti FE-u
-
-        # 10. PETLJA kroz SVE radne periode tog dana (omogućava pauze!)
-        for business_hours in business_hours_list:
-            start_work_time = datetime.combine(date_obj, business_hours.open_time, tzinfo=tz)
-            end_work_time = datetime.combine(date_obj, business_hours.close_time, tzinfo=tz)
-            current_time = start_work_time
-
-            while current_time + service_duration <= end_work_time:
-                # Ako je traženi dan danas i slot je u prošlosti — preskoči
-                if date_obj == timezone.localdate():
-                    now_plus_1h = timezone.localtime() + timedelta(hours=1)
-                    # Preskoči slotove koji su prije "sada + 1h"
-                    if current_time < now_plus_1h:
-                        current_time += step
-                        continue    
-
-                slot_end_time = current_time + service_duration
-
-                # Pronađi sve rezervacije koje se preklapaju sa ovim slotom
-                overlapping_reservations = [
-                    res for res in existing_reservations
-                    if res.start_time < slot_end_time and res.end_time > current_time
-                ]
-
-                # Koliko resursa je zauzeto u ovom slotu?
-                occupied_resource_ids = {res.resource_id for res in overlapping_reservations}
-                available_count = total_resources - len(occupied_resource_ids)
-
-                # Ako ima slobodnih resursa — dodaj slot
-                if available_count > 0:
-                    available_slots.append({
-                        "time": current_time.strftime('%H:%M'),
-                        "available_count": available_count
-                    })
-
-                current_time += step  # Pomjeri se na sljedeći potencijalni slot
+
+        # 7-8. Zauzetost resursa tog dana, direktno iz ResourceSlotOccupancy indeksa
+        busy = occupancy.busy_by_day(service.resource_ids, date_obj, date_obj).get(date_obj, {})
+
+        # 9-10. Sweep-line kroz SVE radne periode tog dana (omogućava pauze!)
+        available_slots = slots_for_minute_periods(
+            date_obj,
+            periods,
+            len(service.resource_ids),
+            busy,
+            service.duration_minutes,
+            timezone.get_current_timezone(),
+            now=timezone.now(),
+        )
 
         # 11. Vrati sve raspoložive slotove za taj dan (svi periodi, bez pauza)
         return Response(available_slots, status=status.HTTP_200_OK)
 
 
-class ReservationListCreateAPIView(generics.ListCreateAPIView):
+class AvailabilityCacheStatsView(APIView):
+    """Hit/miss counters of the availability cache (shared by all workers)."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(availability_cache.stats())
+
+
+class MetricsView(APIView):
+    """Per-endpoint request metrics of all workers in the Prometheus text format (booking/metrics.py)."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        response = HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
+        patch_cache_control(response, no_store=True)
+        return response
+
+
+class ProfileReportView(APIView):
+    """A stored request profile (booking/profiling.py): top functions and every SQL statement."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, profile_id):
+        report = profiling.load(profile_id)
+        if report is None:
+            return Response({"detail": "Profile not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(report)
+
+
+class AvailabilityRangeAPIView(APIView):
+    """
+    Returns available start times for every day between `start` and `end`
+    (inclusive), keyed by date. Holidays, business hours and reservations are
+    loaded once for the whole window instead of once per day.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        service_id = request.query_params.get('service')
+        start_str = request.query_params.get('start')
+        end_str = request.query_params.get('end')
+
+        if not service_id or not start_str or not end_str:
+            return Response(
+                {"error": "'service', 'start' and 'end' parameters are required."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            start_date = datetime.strptime(start_str, "%Y-%m-%d").date()
+            end_date = datetime.strptime(end_str, "%Y-%m-%d").date()
+        except ValueError:
+            return Response(
+                {"error": "Invalid date format. Use YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if end_date < start_date:
+            return Response(
+                {"error": "'end' must not be before 'start'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (end_date - start_date).days + 1 > MAX_RANGE_DAYS:
+            return Response(
+                {"error": f"The range can span at most {MAX_RANGE_DAYS} days."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        snapshot = config_snapshot.get()
+        try:
+            service = snapshot.services[int(service_id)]
+        except (ValueError, KeyError):
+            return Response(
+                {"error": "Invalid service ID or date format."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not service.resource_ids:
+            return Response(
+                {"error": "No resources are configured for this specific service."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        slots_by_day = availability_for_range(snapshot, service, start_date, end_date)
+        return Response(
+            {day.isoformat(): slots for day, slots in slots_by_day.items()},
+            status=status.HTTP_200_OK
+        )
+
+
+class ReservationFilterMixin:
+    """'search' and 'period' query params, shared by the reservation list and export."""
+
+    def filter_reservations(self, queryset, limit_past=True):
+        """Applies the 'search' and 'period' query params to `queryset`."""
+        period = self.request.query_params.get('period', '3w')
+        search_query = self.request.query_params.get('search', None)
+
+        def search(queryset):
+            # Ime, email, telefon, tablice preko indeksiranih normaliziranih kolona (booking/search.py)
+            return search_reservations(queryset, search_query) if search_query else queryset
+
+        if period in archive.ARCHIVE_PERIODS:
+            # Prošle rezervacije: živa tabela i arhiva, svaka sa svojim indeksima (booking/archive.py)
+            queryset = archive.with_archive(queryset, search)
+        else:
+            queryset = search(queryset)
+
+        # Filtriranje po periodu i sortiranje (range predikati, vidi booking/queries.py)
+        return filter_by_period(queryset, period, limit_past=limit_past)
+
+
+class ReservationListCreateAPIView(ReservationFilterMixin, generics.ListCreateAPIView):
     # permission_classes = [IsAuthenticated]    #online version does not work
     # permission_classes = [AllowAny]           # not secure but local and online works
     permission_classes = [IsAdminOrCreateOnly]
+    pagination_class = KeysetPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
 
     def get_queryset(self):
         """
@@ -177,42 +281,27 @@ class ReservationListCreateAPIView(generics.ListCreateAPIView):
         - 'all': Prikazuje sve rezervacije.
         - 'pending': Prikazuje sve neodobrene rezervacije.
         - 'today': Prikazuje sve rezervacije za današnji dan.
+
+        Sa 'page_size'/'cursor' parametrima lista je paginirana (booking/pagination.py).
+
+        Redovi su `.values(*ROW_FIELDS)` dictovi (jedan upit, bez JOIN-ova);
+        servise i resurse list() dodaje iz keširanog kataloga (booking/listing.py).
         """
-        period = self.request.query_params.get('period', '3w')
-        search_query = self.request.query_params.get('search', None)
-        
-        queryset = Reservation.objects.all()
-        today = timezone.now().date()
-
-        if search_query:
-            queryset = queryset.filter(
-                Q(full_name__icontains=search_query) |
-                Q(email__icontains=search_query) |
-                Q(phone__icontains=search_query) |
-                Q(license_plate__icontains=search_query)
-            )
+        return self.filter_reservations(
+            Reservation.objects.values(*ROW_FIELDS),
+            limit_past=not self.paginator.is_requested(self.request),
+        )
 
-        # Logika filtriranja po periodu
-        if period == 'pending':
-            queryset = queryset.filter(is_approved=False)
-        elif period == 'past':
-            queryset = queryset.filter(start_time__date__lt=today)
-        else: # '3w', 'all', 'today' i default
-            queryset = queryset.filter(start_time__date__gte=today)
-            if period == '3w':
-                three_weeks_from_now = today + timedelta(weeks=3)
-                queryset = queryset.filter(start_time__date__lte=three_weeks_from_now)
-            elif period == '6w':
-                six_weeks_from_now = today + timedelta(weeks=6)
-                queryset = queryset.filter(start_time__date__lte=six_weeks_from_now)    
-            elif period == 'today':
-                queryset = queryset.filter(start_time__date=today)
-        
-        # Sortiranje primjenjujemo na kraju
-        if period == 'past':
-            # filter only last 20 past reservations
-            return queryset.order_by('-start_time')[:20] # Prošle sortiramo od najnovijih
-        return queryset.order_by('start_time') # Buduće sortiramo od najranijih
+    def list(self, request, *args, **kwargs):
+        """
+        Same JSON as ReservationListSerializer, built from the get_queryset()
+        rows and cached service/resource dicts (booking/listing.py).
+        """
+        rows = self.get_queryset()
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(reservation_rows(page))
+        return Response(reservation_rows(rows))
 
     def get_serializer_class(self):
         """Odabire serializer ovisno o akciji (GET vs POST)."""
@@ -229,113 +318,171 @@ class ReservationListCreateAPIView(generics.ListCreateAPIView):
         # 1. Calculate end_time
         end_time = start_time + timedelta(minutes=service.duration_minutes)
 
-        # 2. Find an available resource
-        resources_for_service = service.resources.all()
-        booked_resources_ids = Reservation.objects.filter(
-            resource__in=resources_for_service,
-            start_time__lt=end_time,
-            end_time__gt=start_time
-        ).values_list('resource_id', flat=True)
-
-        available_resources = resources_for_service.exclude(id__in=booked_resources_ids)
-        
-        if not available_resources.exists():
+        # 2-3. Find an available resource and save, under a (resource, day) lock.
+        # ResourceSlotOccupancy (signal) i emailovi (outbox) se upisuju u istoj transakciji.
+        def create(resource):
+            serializer.instance = None  # ponovni pokušaj nakon rollbacka kreira iznova
+            instance = serializer.save(end_time=end_time, resource_id=resource.id)
+            # 4. Email vlasniku i potvrda korisniku (PENDING); šalje ih run_outbox, ne ovaj request
+            outbox.enqueue(emails.owner_notification(instance), emails.pending_confirmation(instance), reservation=instance)
+            return instance
+
+        # Kandidati (po id-u) iz snapshota konfiguracije, bez upita na M2M tablicu;
+        # servis kojeg snapshot još ne zna (cache drugog procesa) čitamo iz baze
+        configured = config_snapshot.get().services.get(service.pk)
+        candidates = configured.resources if configured else service.resources.order_by('id')
+        instance = allocate(candidates, start_time, end_time, create)
+        if instance is None:
             # This should ideally not be reached if frontend checks availability first,
             # but it's a crucial server-side validation.
             raise serializers.ValidationError("This time slot is already fully booked.")
 
-        # 3. Assign the first available resource and save
-        assigned_resource = available_resources.first()
-        instance = serializer.save(end_time=end_time, resource=assigned_resource)
 
-        # 4. Send email notification to owner AFTER saving the instance
-        try:
-            from django.conf import settings
-
-            subject = f"New reservation for {instance.service.name}"
-            message = f"""
-            A new reservation has been created.
-
-            Details:
-            Name: {instance.full_name}
-            Phone: {instance.phone}
-            Email: {instance.email}
-            Plates: {instance.license_plate}
-            Service: {instance.service.name}
-            Time Slot: {instance.start_time.strftime('%d.%m.%Y at %H:%M')}
-
-            Please approve it in the administration/dashboard panel.
-            """
-            from_email = settings.DEFAULT_FROM_EMAIL # This can be anything
-            recipient_list = [settings.BOOKY_OWNER_EMAIL] # Change to your email
-
-            send_mail(subject, message, from_email, recipient_list, fail_silently=False)
-
-            # --- START: Send confirmation to user (PENDING) ---
-            template = email_templates["confirmation"]
-            subject_user = template["subject"]
-            html_message = template["html"](instance)
-            recipient_list_user = [instance.email]
-            email = EmailMessage(
-                subject=subject_user,
-                body=html_message,
-                from_email=from_email,
-                to=recipient_list_user,
-            )
-            email.content_subtype = "html"
-
-            # no need for ics icon during the approval proccess
-            # ics_file = generate_ics_file(instance)
-            # email.attach('reservation.ics', ics_file.read(), 'text/calendar')
+class ReservationExportView(ReservationFilterMixin, APIView):
+    """
+    GET /reservations/export/?format=csv|ndjson&from=YYYY-MM-DD&to=YYYY-MM-DD
 
-            email.send()    
-            # --- END: Send confirmation to user (PENDING) ---
+    Streams every matching reservation (same 'search'/'period' params as the
+    list, 'past' without the 20-row limit). Rows come from
+    `queryset.iterator()` and leave as chunks of StreamingHttpResponse, so
+    memory stays flat no matter how many rows are exported.
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [CSVRenderer, NDJSONRenderer]
+    chunk_size = 2000
 
-        except Exception as e:
-            # If email sending fails, we don't want to crash the whole process.
-            # We'll just print the error to the console.
-            print(f"Error sending email: {e}")
+    def get(self, request):
+        queryset = self.filter_reservations(Reservation.objects.values(*ROW_FIELDS), limit_past=False)
+
+        # 'from' i 'to' su uključivi dani po lokalnom vremenu
+        bounds = {}
+        for param, lookup, offset in (('from', 'start_time__gte', 0), ('to', 'start_time__lt', 1)):
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            try:
+                day = datetime.strptime(value, "%Y-%m-%d").date()
+            except ValueError:
+                return Response(
+                    {"error": f"Invalid '{param}' date format. Use YYYY-MM-DD."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            bounds[lookup] = local_midnight(day + timedelta(days=offset))
+        queryset = queryset.filter(**bounds)
+
+        renderer = request.accepted_renderer
+        rows = export_rows(queryset.iterator(chunk_size=self.chunk_size))
+        response = StreamingHttpResponse(
+            renderer.stream(rows, EXPORT_FIELDS),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        filename = f'reservations-{timezone.localdate().isoformat()}.{renderer.format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
 
 class ReservationDetailView(generics.RetrieveUpdateDestroyAPIView):
+    """
+    Live reservations, plus the archived ids that the 'past' list and search
+    return (booking/archive.py): those can be read and deleted, not changed.
+    """
     queryset = Reservation.objects.all()
     serializer_class = ReservationListSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            instance = get_object_or_404(ArchivedReservation, pk=self.kwargs['pk'])
+        self.check_object_permissions(self.request, instance)
+        if self.request.method not in ('GET', 'HEAD', 'OPTIONS', 'DELETE'):
+            raise serializers.ValidationError("Archived reservations can only be viewed or deleted.")
+        return instance
+
     def partial_update(self, request, *args, **kwargs):
         instance = self.get_object()
-        
-        # Ako se mijenja status na odobren
-        if 'is_approved' in request.data and request.data['is_approved'] == True and not instance.is_approved:
-            try:
-                from django.conf import settings
 
-                template = email_templates["approved"]
-                subject = template["subject"]
-                html_message = template["html"](instance)
-
-                from_email = settings.DEFAULT_FROM_EMAIL
-                recipient_list = [instance.email]
+        # Ako se mijenja status na odobren, perform_update stavlja email u outbox
+        self.approving = (
+            'is_approved' in request.data and request.data['is_approved'] == True and not instance.is_approved
+        )
+        return super().partial_update(request, *args, **kwargs)
 
-                email = EmailMessage(
-                    subject=subject,
-                    body=html_message,
-                    from_email=from_email,
-                    to=recipient_list,
-                )
-                email.content_subtype = "html"
+    def perform_update(self, serializer):
+        # Rezervacija, ResourceSlotOccupancy (signal) i email (outbox) u istoj transakciji
+        try:
+            with transaction.atomic():
+                instance = serializer.save()
+                if getattr(self, 'approving', False):
+                    outbox.enqueue(emails.approval(instance), reservation=instance)
+        except IntegrityError as error:
+            if not is_overlap_violation(error):
+                raise
+            raise serializers.ValidationError("This time slot is already booked on this resource.")
 
-                ics_file = generate_ics_file(instance)
-                email.attach('reservation.ics', ics_file.read(), 'text/calendar')
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
 
-                email.send()
-            except Exception as e:
-                print(f"Error sending approval email: {e}")
 
-        return super().partial_update(request, *args, **kwargs)
+class ReservationBulkActionView(APIView):
+    """
+    POST {"ids": [...], "action": "approve" | "decline"}
 
+    approve: one UPDATE for all pending ids; approval emails (with .ics) are
+             rendered in one pass and stored in the outbox with one INSERT,
+             run_outbox then sends them over one SMTP connection.
+    decline: deletes the reservations (same as DELETE on the detail view).
 
-class HolidayViewSet(viewsets.ModelViewSet):
+    Response: {"results": [{"id": 1, "status": "approved"}, ...]} in input
+    order; status is approved, already_approved, declined or not_found.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        serializer = ReservationBulkActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data['ids']))  # bez duplikata, redoslijed ostaje
+        action = serializer.validated_data['action']
+
+        with transaction.atomic():
+            reservations = {
+                reservation.id: reservation
+                for reservation in Reservation.objects.filter(id__in=ids)
+                                                      .select_related('service__location')
+                                                      .select_for_update(of=('self',))
+            }
+            if action == ReservationBulkActionSerializer.APPROVE:
+                statuses = self.approve(reservations)
+            else:
+                statuses = self.decline(reservations)
+
+        return Response({'results': [{'id': pk, 'status': statuses.get(pk, 'not_found')} for pk in ids]})
+
+    def approve(self, reservations):
+        pending = [reservation for reservation in reservations.values() if not reservation.is_approved]
+        Reservation.objects.filter(id__in=[reservation.id for reservation in pending]).update(is_approved=True)
+        feeds.touch({reservation.resource_id for reservation in pending})  # update() ne šalje signale
+
+        for reservation in pending:
+            reservation.is_approved = True
+        OutboundEmail.objects.bulk_create([
+            outbox.outbound_email(emails.approval(reservation), reservation)
+            for reservation in pending
+        ])
+
+        statuses = {pk: 'already_approved' for pk in reservations}
+        statuses.update({reservation.id: 'approved' for reservation in pending})
+        return statuses
+
+    def decline(self, reservations):
+        # QuerySet.delete šalje post_delete signale (occupancy i cache ostaju usklađeni)
+        Reservation.objects.filter(id__in=list(reservations)).delete()
+        return {pk: 'declined' for pk in reservations}
+
+
+class HolidayViewSet(ConfigConditionalGetMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows holidays to be viewed, created, or deleted.
     """
@@ -352,13 +499,21 @@ class HolidayViewSet(viewsets.ModelViewSet):
             serializer.save()
 
 
-class DisabledDatesView(APIView):
+class DisabledDatesView(ConfigConditionalGetMixin, APIView):
     """
     Vraća sve "disabled" datume (praznici i neradni dani) u zadanom periodu.
-    Query param: days (int, optional, default=90)
+    Query params:
+    - days (int, optional, default=90, najviše BOOKY_DISABLED_DATES_MAX_DAYS)
+    - start (YYYY-MM-DD, optional, default=danas)
+    - compact=1: maska zatvorenih dana u tjednu + periodi praznika umjesto liste
+    - service (id, optional): dodaje i potpuno popunjene dane tog servisa
     """
     permission_classes = [AllowAny]
 
+    def is_config_only(self, request):
+        # Popunjeni dani ovise o rezervacijama, ne samo o konfiguraciji
+        return "service" not in request.GET
+
     def get(self, request):
         # 1) Parsamo koliko dana unaprijed
         try:
@@ -366,37 +521,56 @@ class DisabledDatesView(APIView):
         except ValueError:
             return Response({"detail": "Parametar must be an int."}, status=400)
 
-        # 2) Racunamo period
-        today = timezone.localdate()
-        end = today + timedelta(days=days)
+        # 2) Početak perioda
+        start_param = request.query_params.get("start")
+        if start_param:
+            try:
+                start = datetime.strptime(start_param, "%Y-%m-%d").date()
+                start + timedelta(days=disabled_dates.max_days())  # kraj mora biti validan datum
+            except (ValueError, OverflowError):
+                return Response({"detail": "Invalid start date. Use YYYY-MM-DD."}, status=400)
+        else:
+            start = timezone.localdate()
 
-        # 3) Dohvat praznika
-        holiday_dates = set(
-            Holiday.objects
-                   .filter(date__range=(today, end))
-                   .values_list("date", flat=True)
-        )
+        compact = request.query_params.get("compact") in ("1", "true")
+        serializer_class = CompactDisabledDatesSerializer if compact else DisabledDatesSerializer
 
-        # 4) Koji su dani u tjednu radni?
-        working_days = set(
-            BusinessHours.objects
-                         .values_list("day_of_week", flat=True)
-                         .distinct()
-        )
+        # 3) Sa servisom: računamo svaki put (rezervacije se stalno mijenjaju)
+        service_id = request.query_params.get("service")
+        if service_id is not None:
+            snapshot = config_snapshot.get()
+            try:
+                service = snapshot.services[int(service_id)]
+            except (ValueError, KeyError):
+                return Response({"detail": "Invalid service ID."}, status=400)
+            end = start + timedelta(days=disabled_dates.clamp_days(days))
+            return Response(serializer_class(disabled_dates.compute(snapshot, start, end, compact, service)).data)
 
-        # 5) Generiramo listu disabled datuma
-        disabled = []
-        total_days = (end - today).days
-        for i in range(total_days + 1):
-            d = today + timedelta(days=i)
-            # ako je praznik ili taj dan u tjednu nije radni
-            if d in holiday_dates or d.weekday() not in working_days:
-                disabled.append(d)
-
-        # 6) Serijaliziramo i šaljemo
-        serializer = DisabledDatesSerializer({
-            "start_date": today,
-            "end_date":   end,
-            "disabled_dates": disabled,
-        })
-        return Response(serializer.data)
\ No newline at end of file
+        # 4) Bez servisa: iz cachea po verziji konfiguracije
+        data = disabled_dates.cached(start, days, compact, lambda result: serializer_class(result).data)
+        return Response(data)
+
+
+class CalendarFeedView(APIView):
+    """
+    GET /calendar/<token>.ics: iCalendar feed of a CalendarFeed (one resource
+    or one location) for calendar apps to subscribe to.
+
+    The token is the credential. ETag/Last-Modified come from cache stamps
+    (booking/feeds.py), so polling with If-None-Match / If-Modified-Since
+    gets a 304 without reading reservations.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, token):
+        feed = get_object_or_404(CalendarFeed, token=token)
+        resource_ids, etag, last_modified = feeds.feed_state(feed)
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = HttpResponse(feeds.render_feed(feed, resource_ids), content_type='text/calendar; charset=utf-8')
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, private=True, max_age=settings.BOOKY_CALENDAR_MAX_AGE)
+        return response
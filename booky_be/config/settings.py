@@ -1,5 +1,7 @@
 import os
+import tempfile
 import dj_database_url
+from corsheaders.defaults import default_headers
 from pathlib import Path
 from datetime import timedelta
 import dotenv
@@ -68,6 +70,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'booking.metrics.MetricsMiddleware', # prvi, da mjeri cijeli request
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware', # WhiteNoise should be high up
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -75,6 +78,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'booking.profiling.ProfilingMiddleware', # samo staff s headerom X-Booky-Profile
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -110,6 +114,92 @@ DATABASES = {
     )
 }
 
+# SQLite: PRAGMA-e za svaku novu konekciju (booking/db.py, configure_sqlite), redom;
+# prazna vrijednost (npr. SQLITE_MMAP_SIZE=) preskače PRAGMA-u. Na drugim bazama se ignorira.
+# journal_mode se upisuje u sam fajl baze, pa je WAL opt-in: start.sh (produkcija) ga
+# uključuje, a lokalni manage.py ne mijenja data/db.sqlite3 iz gita.
+SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', '')
+BOOKY_SQLITE_PRAGMAS = {
+    'busy_timeout': os.environ.get('SQLITE_BUSY_TIMEOUT', '5000'),  # ms čekanja na lock prije "database is locked"
+    'journal_mode': SQLITE_JOURNAL_MODE,  # WAL: čitanja ne čekaju pisanje
+    # NORMAL je siguran samo uz WAL; s rollback journalom ostaje SQLite default (FULL)
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL' if SQLITE_JOURNAL_MODE.upper() == 'WAL' else ''),
+    'mmap_size': os.environ.get('SQLITE_MMAP_SIZE', str(128 * 1024 * 1024)),  # bajtovi
+    'cache_size': os.environ.get('SQLITE_CACHE_SIZE', '-20000'),  # negativno = KiB po konekciji
+    'temp_store': os.environ.get('SQLITE_TEMP_STORE', 'MEMORY'),
+}
+# Način otvaranja transaction.atomic() blokova na SQLite. IMMEDIATE uzima write lock
+# na BEGIN, pa se čeka kroz busy_timeout umjesto da nadogradnja read -> write locka
+# odmah padne s "database is locked". Prazno = Django default (DEFERRED).
+BOOKY_SQLITE_TRANSACTION_MODE = os.environ.get('SQLITE_TRANSACTION_MODE', 'IMMEDIATE')
+
+
+# Cache
+# Mora biti dijeljen između gunicorn workera: u njemu su verzija konfiguracije
+# (ETag/Last-Modified, config snapshot) i generacije availability cachea, pa bi
+# per-process LocMem ostale workere ostavio na starim podacima. Default je
+# DatabaseCache (tabela iz `createcachetable`, start.sh); Redis i sl. preko
+# CACHE_BACKEND/CACHE_LOCATION. LocMem je siguran samo s jednim procesom.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'booky_cache'),
+        'OPTIONS': {
+            # DatabaseCache default (300) bi stalno izbacivao unose dostupnosti
+            'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 20000)),
+        },
+    }
+}
+
+# Koliko dugo (sekunde) se drži keširana dostupnost za (servis, datum)
+BOOKY_AVAILABILITY_CACHE_TIMEOUT = int(os.environ.get('AVAILABILITY_CACHE_TIMEOUT', 300))
+
+# Dodjela resursa kod nove rezervacije (booking/allocation.py):
+# 'optimistic' = insert po resursu, baza odbija preklapanja; 'locking' = zaključavanje (resurs, dan)
+BOOKY_ALLOCATION_STRATEGY = os.environ.get('ALLOCATION_STRATEGY', 'optimistic')
+
+# Email outbox (booking/outbox.py, `manage.py run_outbox`): broj pokušaja prije
+# dead-lettera i početni razmak između pokušaja u sekundama (udvostručuje se)
+BOOKY_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 5))
+BOOKY_OUTBOX_RETRY_DELAY = int(os.environ.get('OUTBOX_RETRY_DELAY', 60))
+
+# Kalendarski feedovi (/api/calendar/<token>.ics): koliko dana unazad ulazi u feed
+# i koliko sekundi klijent smije držati feed prije ponovne provjere (ETag → 304)
+BOOKY_CALENDAR_PAST_DAYS = int(os.environ.get('CALENDAR_PAST_DAYS', 30))
+BOOKY_CALENDAR_MAX_AGE = int(os.environ.get('CALENDAR_MAX_AGE', 300))
+
+# `manage.py archive_reservations` (booking/archive.py): default za --older-than, u danima;
+# mora biti barem CALENDAR_PAST_DAYS jer feedovi čitaju samo živu tabelu
+BOOKY_ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 365))
+
+# Javni referentni endpointi (services, holidays, disabled-dates): Cache-Control za
+# browser/CDN; nakon max-age se smije još stale-while-revalidate sekundi vraćati stara kopija
+BOOKY_CONFIG_MAX_AGE = int(os.environ.get('CONFIG_MAX_AGE', 60))
+BOOKY_CONFIG_STALE_WHILE_REVALIDATE = int(os.environ.get('CONFIG_STALE_WHILE_REVALIDATE', 600))
+# Verziju konfiguracije (booking/config_version.py) svaki worker pamti toliko sekundi:
+# 304 odgovori su bez upita, a izmjena u drugom workeru se vidi najkasnije nakon toga
+BOOKY_CONFIG_VERSION_CHECK_INTERVAL = float(os.environ.get('CONFIG_VERSION_CHECK_INTERVAL', 5))
+# Config snapshot (booking/config_snapshot.py) se u svakom workeru najkasnije nakon toliko
+# sekundi učita iznova, i kad verzija konfiguracije u cacheu nije promijenjena
+BOOKY_CONFIG_SNAPSHOT_TTL = float(os.environ.get('CONFIG_SNAPSHOT_TTL', 30))
+
+# Najveći 'days' za /api/disabled-dates/ (veći se skraćuje)
+BOOKY_DISABLED_DATES_MAX_DAYS = int(os.environ.get('DISABLED_DATES_MAX_DAYS', 731))
+
+# Metrike po endpointu (/api/metrics/, booking/metrics.py): svaki proces upisuje svoje
+# brojače u METRICS_DIR najviše svakih METRICS_FLUSH_INTERVAL sekundi, endpoint ih sabira
+BOOKY_METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'booky-metrics'))
+BOOKY_METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+
+# Testovi pišu metrike i profile u svoj privremeni direktorij, ne u gornje
+TEST_RUNNER = 'booking.tests.runner.TestRunner'
+
+# Profiliranje pojedinačnih requestova (header X-Booky-Profile, samo staff; booking/profiling.py):
+# gdje se čuvaju izvještaji za /api/debug/profiles/<id>/, koliko najnovijih i koliko funkcija po izvještaju
+BOOKY_PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'booky-profiles'))
+BOOKY_PROFILE_KEEP = int(os.environ.get('PROFILE_KEEP', 50))
+BOOKY_PROFILE_TOP_FUNCTIONS = int(os.environ.get('PROFILE_TOP_FUNCTIONS', 40))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -167,6 +257,9 @@ CORS_ALLOWED_ORIGINS_str = os.environ.get('CORS_ALLOWED_ORIGINS', '')
 CORS_ALLOWED_ORIGINS = [origin.strip() for origin in CORS_ALLOWED_ORIGINS_str.split(',') if origin.strip()]
 
 CORS_ALLOW_CREDENTIALS = True
+# Frontend smije poslati X-Booky-Profile i pročitati sažetak iz odgovora (booking/profiling.py)
+CORS_ALLOW_HEADERS = (*default_headers, 'x-booky-profile')
+CORS_EXPOSE_HEADERS = ['X-Booky-Profile', 'Server-Timing']
 
 # CSRF Configuration
 # Trusted origins are read from a comma-separated environment variable.
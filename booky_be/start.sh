@@ -5,10 +5,27 @@ echo "🚀 Pokreće se start.sh..."
 # Kreiraj folder za SQLite bazu (ako koristiš persistent disk)
 mkdir -p /persistent/data
 
+# SQLite u WAL modu (booking/db.py, configure_sqlite): čitanja ne čekaju upise
+export SQLITE_JOURNAL_MODE="${SQLITE_JOURNAL_MODE:-WAL}"
+
 # Pokreni migracije
 echo "🛠 Pokrećem migracije..."
 python manage.py migrate --noinput
 
+# Metrike workera iz prethodnog pokretanja (booking/metrics.py) ne prenosimo
+rm -rf "${METRICS_DIR:-/tmp/booky-metrics}"
+
+# Outbox worker šalje emailove u pozadini (API ih samo upisuje u bazu).
+# Greške u krugu worker sam logira i nastavlja; ako proces ipak izađe, ponovo ga pokrećemo.
+echo "📨 Pokrećem outbox worker..."
+(
+  while true; do
+    python manage.py run_outbox --loop
+    echo "⚠️ Outbox worker je izašao (kod $?), ponovno pokretanje za 5 s..."
+    sleep 5
+  done
+) &
+
 # Pokreni gunicorn server
 echo "🌐 Pokrećem gunicorn..."
-gunicorn config.wsgi:application --workers 2 --preload --bind 0.0.0.0:8000
+gunicorn config.wsgi:application --workers 2 --preload --bind 0.0.0.0:${PORT:-8000}